@@ -0,0 +1,87 @@
+import time
+
+from django.contrib.auth import authenticate, user_logged_in
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.models import CustomUser
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+PASSWORD = 'benchmark-pass-123'
+
+
+def _legacy_profile_save(sender, instance, created, **kwargs):
+    """The old receiver's extra write on every save of an existing user"""
+    if not created:
+        instance.userprofile.save()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare registration and login throughput with and without the per-save profile write"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help="Users registered per run")
+        parser.add_argument('--logins', type=int, default=1000, help="Logins per run")
+        parser.add_argument('--real-hashing', action='store_true',
+                            help="Keep the configured password hasher (by default a fast one isolates database cost)")
+
+    def _timed(self, label, count, operation):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            operation()
+            elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(
+            f"  {label:<12} {count / elapsed:>9,.0f}/s  {len(queries) / count:.2f} queries each"
+        )
+
+    def _run(self, prefix, options):
+        emails = [f"{prefix}-{i}@benchmark.invalid" for i in range(options['users'])]
+
+        def register():
+            for email in emails:
+                CustomUser.objects.create_user(email, PASSWORD)
+
+        def login():
+            for i in range(options['logins']):
+                user = authenticate(email=emails[i % len(emails)], password=PASSWORD)
+                # What django.contrib.auth.login sends; update_last_login saves the user
+                user_logged_in.send(sender=CustomUser, request=None, user=user)
+
+        def bulk_import():
+            CustomUser.objects.bulk_create_users(
+                {'email': f"bulk-{email}", 'password': PASSWORD} for email in emails
+            )
+
+        self._timed('register', len(emails), register)
+        self._timed('login', options['logins'], login)
+        self._timed('bulk import', len(emails), bulk_import)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['logins'] < 1:
+            raise CommandError("--users and --logins must be positive")
+        hashers = None if options['real_hashing'] else FAST_HASHERS
+        self.stdout.write(
+            f"{options['users']} registrations, {options['logins']} logins, "
+            f"{'configured' if hashers is None else 'fast'} password hashing"
+        )
+
+        for name, legacy in (('per-save profile write', True), ('create-only', False)):
+            self.stdout.write(name)
+            if legacy:
+                post_save.connect(_legacy_profile_save, sender=CustomUser, dispatch_uid='benchmark_legacy_profile')
+            try:
+                # Everything is rolled back, so the benchmark leaves no users behind
+                with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+                    with transaction.atomic():
+                        self._run(name.split()[0], options)
+                        raise Rollback
+            except Rollback:
+                pass
+            finally:
+                post_save.disconnect(sender=CustomUser, dispatch_uid='benchmark_legacy_profile')
@@ -0,0 +1,57 @@
+import csv
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser
+
+FIELDS = ('email', 'password', 'first_name', 'last_name', 'is_student', 'is_recruiter')
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+class Command(BaseCommand):
+    help = "Import users from a CSV file, creating their profiles in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help=f"CSV with a header row; known columns: {', '.join(FIELDS)}")
+        parser.add_argument('--batch-size', type=int, default=500, help="Users inserted per batch")
+
+    def _rows(self, reader):
+        for line, record in enumerate(reader, start=2):
+            row = {field: (record.get(field) or '').strip() for field in FIELDS if field in record}
+            if not row.get('email'):
+                raise CommandError(f"Line {line}: email is required")
+            row['password'] = row.get('password') or None
+            for flag in ('is_student', 'is_recruiter'):
+                if flag in row:
+                    row[flag] = row[flag].lower() in TRUE_VALUES
+            yield row
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+        try:
+            handle = open(options['csv_file'], newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        started = time.monotonic()
+        read = created = 0
+        with handle:
+            reader = csv.DictReader(handle)
+            if 'email' not in (reader.fieldnames or []):
+                raise CommandError("The CSV needs an email column")
+            rows = self._rows(reader)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                read += len(batch)
+                created += len(CustomUser.objects.bulk_create_users(batch, batch_size=options['batch_size']))
+                elapsed = max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f"{read} rows: {created} created ({read / elapsed:,.0f} rows/s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} users ({read - created} already existed) in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:28
+
+from django.db import migrations, models
+
+COUNTERS = ('applications', 'interviews', 'offers')
+# (points per event, cap) as of this migration
+WEIGHTS = {'applications': (2, 20), 'interviews': (5, 30), 'offers': (10, 30)}
+
+
+def backfill_counters(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    for name in COUNTERS:
+        UserProfile.objects.filter(**{f"{name}__isnull": True}).update(**{name: 0})
+    profiles = list(UserProfile.objects.only('id', *COUNTERS))
+    for profile in profiles:
+        score = 20 + sum(min(getattr(profile, name) * points, cap) for name, (points, cap) in WEIGHTS.items())
+        profile.readiness_score = min(score, 100)
+    UserProfile.objects.bulk_update(profiles, ['readiness_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='applications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='interviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='offers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='readiness_score',
+            field=models.DecimalField(decimal_places=1, default=20, max_digits=5),
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
 from django.db.models.signals import post_save
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Least
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
 from django.dispatch import receiver
 from django.conf import settings
 
@@ -27,6 +33,36 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, rows: Iterable[Dict], batch_size: int = 500) -> List['CustomUser']:
+        """Create users and their profiles with one INSERT per batch each.
+
+        ``rows`` are ``create_user`` keyword dicts. Emails that already exist
+        (or repeat in ``rows``) are skipped. ``post_save`` is not sent, so the
+        profiles are written here. Returns the created users.
+        """
+        users, seen = [], set()
+        for row in rows:
+            row = dict(row)
+            email = self.normalize_email(row.pop('email', None) or '')
+            if not email:
+                raise ValueError("The Email field is required")
+            if email in seen:
+                continue
+            seen.add(email)
+            # make_password(None) gives an unusable password, like set_password(None)
+            users.append(self.model(email=email, password=make_password(row.pop('password', None)), **row))
+
+        existing = set()
+        emails = [user.email for user in users]
+        for start in range(0, len(emails), batch_size):
+            existing.update(self.filter(email__in=emails[start:start + batch_size]).values_list('email', flat=True))
+        users = [user for user in users if user.email not in existing]
+
+        with transaction.atomic(using=self._db):
+            created = self.bulk_create(users, batch_size=batch_size)
+            UserProfile.objects.bulk_create([UserProfile(user=user) for user in created], batch_size=batch_size)
+        return created
+
 
 # Create your models here.
 class CustomUser(AbstractBaseUser, PermissionsMixin):
@@ -50,26 +86,83 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+# Readiness is a base score plus (points per event, cap) for each activity counter
+READINESS_BASE = 20
+READINESS_WEIGHTS = {
+    'applications': (2, 20),
+    'interviews': (5, 30),
+    'offers': (10, 30),
+}
+READINESS_MAX = 100
+
+
+def readiness_score(applications: int = 0, interviews: int = 0, offers: int = 0) -> Decimal:
+    """Readiness score for a set of activity counters"""
+    counters = {'applications': applications, 'interviews': interviews, 'offers': offers}
+    score = READINESS_BASE + sum(
+        min((counters[name] or 0) * points, cap) for name, (points, cap) in READINESS_WEIGHTS.items()
+    )
+    return Decimal(min(score, READINESS_MAX))
+
+
+def readiness_score_expression(**counters):
+    """``readiness_score`` as a database expression over counter expressions"""
+    score = Value(READINESS_BASE)
+    for name, (points, cap) in READINESS_WEIGHTS.items():
+        score = score + Least(counters.get(name, F(name)) * points, Value(cap))
+    return Least(score, Value(READINESS_MAX), output_field=DecimalField(max_digits=5, decimal_places=1))
+
+
+class UserProfileManager(models.Manager):
+    def record_activity(self, user, **deltas) -> int:
+        """Add to a user's activity counters and store the new readiness score.
+
+        A single UPDATE increments the counters with F expressions and
+        recomputes the score from the incremented values, so concurrent
+        events never lose a count. Returns the number of profiles updated.
+        """
+        unknown = set(deltas) - set(READINESS_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown activity counters: {', '.join(sorted(unknown))}")
+        counters = {name: F(name) + delta for name, delta in deltas.items() if delta}
+        if not counters:
+            return 0
+        with transaction.atomic():
+            updated = self.filter(user=user).update(readiness_score=readiness_score_expression(**counters), **counters)
+            if not updated:
+                # Users created before the profile signal existed have no row yet
+                self.get_or_create(user=user)
+                updated = self.filter(user=user).update(
+                    readiness_score=readiness_score_expression(**counters), **counters
+                )
+        return updated
+
+
 class UserProfile(models.Model):
     user=models.OneToOneField(CustomUser, on_delete=models.CASCADE)
-    readiness_score=models.DecimalField(max_digits=5, decimal_places=1,blank=True,null=True)
-    applications=models.IntegerField(null=True,blank=True)
-    interviews=models.IntegerField(null=True,blank=True)
-    offers=models.IntegerField(null=True, blank=True)
+    readiness_score=models.DecimalField(max_digits=5, decimal_places=1, default=READINESS_BASE)
+    applications=models.PositiveIntegerField(default=0)
+    interviews=models.PositiveIntegerField(default=0)
+    offers=models.PositiveIntegerField(default=0)
     profile_image=models.ImageField(upload_to="image/", blank=True, null=True) # need to adjust
 
+    objects = UserProfileManager()
+
     def __str__(self):
         return self.user.email
 
+    def save(self, *args, **kwargs):
+        # Keep the stored score in step with counters edited directly (admin, API)
+        self.readiness_score = readiness_score(self.applications, self.interviews, self.offers)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(READINESS_WEIGHTS):
+            kwargs['update_fields'] = {*update_fields, 'readiness_score'}
+        super().save(*args, **kwargs)
 
-# @receiver(post_save, sender=CustomUser)
-# def create_user_profile(sender, instance, created, **kwargs):
-#     if created:
-#         UserProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=CustomUser)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Only new users need a profile; saving it again on every user save
+    # (e.g. last_login at each login) just cost a SELECT and an UPDATE
+    if created and not raw:
         UserProfile.objects.create(user=instance)
-    else:
-        instance.userprofile.save()
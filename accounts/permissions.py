@@ -0,0 +1,11 @@
+# accounts/permissions.py
+from rest_framework.permissions import BasePermission
+
+
+class IsRecruiter(BasePermission):
+    """Allow access only to authenticated recruiters"""
+    message = "Only recruiters can access this resource."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and getattr(user, 'is_recruiter', False))
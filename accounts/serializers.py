@@ -16,14 +16,25 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "first_name", "last_name", "password", "is_student", "is_recruiter"]
 
     def create(self, validated_data):
-        password = validated_data.pop("password")
-        user = CustomUser.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user hashes the password, so the user is saved once
+        return CustomUser.objects.create_user(**validated_data)
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserProfile
         fields = ["readiness_score", "applications", "interviews", "offers", "profile_image"]
+        read_only_fields = ["readiness_score"]
+
+
+# Event names as clients send them, mapped to the counter they bump
+ACTIVITY_EVENTS = {
+    'application': 'applications',
+    'interview': 'interviews',
+    'offer': 'offers',
+}
+
+
+class ActivityEventSerializer(serializers.Serializer):
+    event = serializers.ChoiceField(choices=list(ACTIVITY_EVENTS))
+    count = serializers.IntegerField(default=1, min_value=1, max_value=100)
@@ -1,3 +1,136 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .models import CustomUser, UserProfile, readiness_score
+
+
+class ReadinessScoreTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('student@example.com', 'pass12345')
+
+    def test_new_profile_stores_base_score(self):
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual((profile.applications, profile.interviews, profile.offers), (0, 0, 0))
+        self.assertEqual(profile.readiness_score, Decimal('20'))
+
+    def test_score_caps_each_counter_and_total(self):
+        self.assertEqual(readiness_score(applications=3, interviews=1, offers=0), Decimal('31'))
+        self.assertEqual(readiness_score(applications=50, interviews=50, offers=50), Decimal('100'))
+
+    def test_record_activity_increments_and_stores_score(self):
+        UserProfile.objects.record_activity(self.user, applications=3)
+        UserProfile.objects.record_activity(self.user, interviews=1, applications=1)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual((profile.applications, profile.interviews, profile.offers), (4, 1, 0))
+        self.assertEqual(profile.readiness_score, readiness_score(4, 1, 0))
+
+    def test_record_activity_is_one_update(self):
+        with self.assertNumQueries(3):  # savepoint, UPDATE, release
+            UserProfile.objects.record_activity(self.user, offers=1)
+        self.assertEqual(UserProfile.objects.get(user=self.user).readiness_score, Decimal('30'))
+
+    def test_record_activity_creates_missing_profile(self):
+        UserProfile.objects.filter(user=self.user).delete()
+        UserProfile.objects.record_activity(self.user, offers=2)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(profile.offers, 2)
+        self.assertEqual(profile.readiness_score, Decimal('40'))
+
+    def test_record_activity_rejects_unknown_counter(self):
+        with self.assertRaises(ValueError):
+            UserProfile.objects.record_activity(self.user, rejections=1)
+
+    def test_save_recomputes_score(self):
+        profile = UserProfile.objects.get(user=self.user)
+        profile.interviews = 2
+        profile.save(update_fields=['interviews'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.readiness_score, Decimal('30'))
+
+
+class ProfileActivityApiTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('student@example.com', 'pass12345')
+        self.client.force_authenticate(self.user)
+
+    def test_event_updates_counters_and_score(self):
+        url = '/accounts/api/profiles/events/'
+        response = self.client.post(url, {'event': 'application', 'count': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, {'event': 'interview'}, format='json')
+        self.assertEqual(response.data['applications'], 2)
+        self.assertEqual(response.data['interviews'], 1)
+        self.assertEqual(Decimal(response.data['readiness_score']), Decimal('29'))
+
+    def test_unknown_event_is_rejected(self):
+        response = self.client.post('/accounts/api/profiles/events/', {'event': 'rejection'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('event', response.data)
+
+    def test_me_reads_stored_row(self):
+        UserProfile.objects.record_activity(self.user, offers=1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/accounts/api/profiles/me/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['readiness_score']), Decimal('30'))
+
+    def test_score_is_read_only(self):
+        response = self.client.patch(
+            f'/accounts/api/profiles/{self.user.userprofile.pk}/', {'readiness_score': '99'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['readiness_score']), Decimal('20'))
+
+
+class ProfileSignalTests(TestCase):
+    def test_profile_created_once_and_not_rewritten(self):
+        user = CustomUser.objects.create_user('student@example.com', 'pass12345')
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+        user = CustomUser.objects.get(pk=user.pk)
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+
+    def test_register_saves_user_once(self):
+        with self.assertNumQueries(3):  # existence check, user INSERT, profile INSERT
+            response = self.client.post('/accounts/api/register/', {
+                'email': 'new@example.com', 'password': 'pass12345', 'first_name': 'New', 'last_name': 'User'
+            }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(CustomUser.objects.get(email='new@example.com').check_password('pass12345'))
+
+
+class BulkUserImportTests(TestCase):
+    def test_bulk_create_users_creates_profiles_and_skips_existing(self):
+        CustomUser.objects.create_user('taken@example.com', 'pass12345')
+        with self.assertNumQueries(5):  # existing emails, savepoint, users, profiles, release
+            created = CustomUser.objects.bulk_create_users([
+                {'email': 'a@example.com', 'password': 'pass12345', 'is_student': True},
+                {'email': 'b@example.com'},
+                {'email': 'a@example.com', 'password': 'other'},
+                {'email': 'taken@example.com', 'password': 'pass12345'},
+            ])
+        self.assertEqual([user.email for user in created], ['a@example.com', 'b@example.com'])
+        a = CustomUser.objects.get(email='a@example.com')
+        self.assertTrue(a.check_password('pass12345'))
+        self.assertTrue(a.is_student)
+        self.assertFalse(CustomUser.objects.get(email='b@example.com').has_usable_password())
+        self.assertEqual(UserProfile.objects.filter(user__in=created).count(), 2)
 
-# Create your tests here.
+    def test_import_users_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write("email,first_name,is_recruiter\nhr@example.com,Hana,yes\nhr@example.com,Dup,no\n")
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command('import_users', handle.name, stdout=out)
+        self.assertIn('Imported 1 users', out.getvalue())
+        user = CustomUser.objects.get(email='hr@example.com')
+        self.assertTrue(user.is_recruiter)
+        self.assertEqual(user.first_name, 'Hana')
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
@@ -4,9 +4,10 @@ from .views import (
     RegisterView, UserProfileViewSet,
     RegisterPage, LoginPage, LogoutPage
 )
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 
-router = DefaultRouter()
+# No root view: DefaultRouter's would take over the 'api-root' name from core
+router = SimpleRouter()
 router.register(r'profiles', UserProfileViewSet, basename='user-profile')
 
 urlpatterns = [
@@ -1,10 +1,15 @@
 # accounts/views.py
-from rest_framework import generics, viewsets
+from rest_framework import generics, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from .serializers import RegisterSerializer, UserSerializer, UserProfileSerializer
+from .serializers import (
+    RegisterSerializer, UserSerializer, UserProfileSerializer, ActivityEventSerializer, ACTIVITY_EVENTS
+)
 from .models import UserProfile
+from core.pagination import IdCursorPagination
 
 from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import render, redirect
@@ -23,6 +28,7 @@ class RegisterView(generics.CreateAPIView):
 class UserProfileViewSet(viewsets.ModelViewSet):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = IdCursorPagination  # profiles have no created_at
 
     def get_queryset(self):
         # Only return the profile of the logged-in user
@@ -32,6 +38,23 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         # Auto-attach profile to logged-in user
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def me(self, request):
+        """The caller's profile with its stored readiness score, read as one row"""
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        return Response(self.get_serializer(profile).data)
+
+    @action(detail=False, methods=['post'])
+    def events(self, request):
+        """Record application, interview or offer events for the caller"""
+        serializer = ActivityEventSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        counter = ACTIVITY_EVENTS[serializer.validated_data['event']]
+        UserProfile.objects.record_activity(request.user, **{counter: serializer.validated_data['count']})
+        profile = UserProfile.objects.get(user=request.user)
+        return Response(self.get_serializer(profile).data, status=status.HTTP_201_CREATED)
+
 class RegisterForm(forms.ModelForm):
     password = forms.CharField(widget=forms.PasswordInput)
 
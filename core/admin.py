@@ -1,18 +1,68 @@
+from django import forms
 from django.contrib import admin
-from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport
+from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport, Task
+from .search import full_text_search
+
+
+class DocumentTextAdminForm(forms.ModelForm):
+    """Edit text kept in Document rows as if it were a column; subclasses declare the text fields"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in self._meta.model.document_fields:
+            self.initial.setdefault(name, getattr(self.instance, name))
+
+    def save(self, commit=True):
+        for name in self._meta.model.document_fields:
+            setattr(self.instance, name, self.cleaned_data.get(name, ''))
+        return super().save(commit)
+
+
+class JobDescriptionAdminForm(DocumentTextAdminForm):
+    text = forms.CharField(widget=forms.Textarea)
+
+    class Meta:
+        model = JobDescription
+        exclude = ['text_document']
+
+
+class OfferLetterAdminForm(DocumentTextAdminForm):
+    text = forms.CharField(widget=forms.Textarea, required=False)
+
+    class Meta:
+        model = OfferLetter
+        exclude = ['text_document']
+
+
+class FullTextSearchMixin:
+    """Search large text columns through the full-text index; ``search_fields`` covers the short ones"""
+    search_kind = None
+    search_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        matches, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            hits = full_text_search(self.search_kind, search_term, top_k=self.search_limit)
+            matches |= queryset.filter(id__in=[pk for pk, _, _ in hits])
+        return matches, may_have_duplicates
+
 
 @admin.register(Resume)
-class ResumeAdmin(admin.ModelAdmin):
+class ResumeAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
-    search_fields = ['name', 'email', 'parsed_text']
+    search_fields = ['name', 'email']
+    search_kind = 'resume'
+    exclude = ['parsed_text_document']
     readonly_fields = ['parsed_text', 'extracted_skills', 'education', 'experience']
 
 @admin.register(JobDescription)
-class JobDescriptionAdmin(admin.ModelAdmin):
+class JobDescriptionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'company', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['title', 'company', 'text']
+    search_fields = ['title', 'company']
+    search_kind = 'job_description'
+    form = JobDescriptionAdminForm
 
 @admin.register(CoverLetter)
 class CoverLetterAdmin(admin.ModelAdmin):
@@ -21,15 +71,24 @@ class CoverLetterAdmin(admin.ModelAdmin):
     search_fields = ['resume__name', 'job_description__title']
 
 @admin.register(OfferLetter)
-class OfferLetterAdmin(admin.ModelAdmin):
+class OfferLetterAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['ctc', 'probation_period', 'notice_period', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['text', 'explanation']
+    search_fields = ['ctc', 'probation_period', 'notice_period']
+    search_kind = 'offer_letter'
+    form = OfferLetterAdminForm
     readonly_fields = ['explanation', 'risk_flags', 'ctc', 'probation_period', 'notice_period']
 
 @admin.register(SkillGapReport)
 class SkillGapReportAdmin(admin.ModelAdmin):
-    list_display = ['resume', 'job_description', 'fit_score', 'created_at']
-    list_filter = ['created_at', 'fit_score']
+    list_display = ['resume', 'job_description', 'fit_score', 'is_stale', 'created_at']
+    list_filter = ['created_at', 'fit_score', 'is_stale']
     search_fields = ['resume__name', 'job_description__title']
     readonly_fields = ['fit_score', 'missing_skills', 'matching_skills', 'suggested_resources']
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'priority', 'status', 'progress', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'priority', 'name', 'created_at']
+    search_fields = ['name', 'error']
+    readonly_fields = ['result', 'error', 'locked_by', 'locked_until']
@@ -0,0 +1,50 @@
+"""Worker-side helpers for the ``match_all`` command.
+
+Models are imported lazily so worker processes started with ``spawn`` can
+unpickle these functions before Django is set up.
+"""
+from contextlib import nullcontext
+from typing import List, Tuple
+
+from .matching import BatchFitScorer
+
+_scorer = None
+_write_lock = None
+
+
+def init_worker(scorer: BatchFitScorer, write_lock=None):
+    """Set up a pool worker; ``write_lock`` serializes writes for databases with a single writer"""
+    global _scorer, _write_lock
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    from django.db import connections
+    # Forked workers must open their own connections instead of using the parent's
+    for connection in connections.all(initialized_only=True):
+        connection.connection = None
+    _scorer = scorer
+    _write_lock = write_lock
+
+
+def match_chunk(resumes: List[Tuple[int, List[str]]], batch_size: int, scorer: BatchFitScorer = None) -> Tuple[int, int]:
+    """Score a chunk of resumes and upsert the pairs whose inputs changed.
+
+    Returns ``(pairs_scored, rows_written)``.
+    """
+    from .models import SkillGapReport
+    from .reports import save_batch_fit_rows
+
+    scorer = scorer or _scorer
+    rows = scorer.score(resumes)
+    if not rows:
+        return 0, 0
+
+    stored = SkillGapReport.objects.filter(
+        resume_id__gte=resumes[0][0], resume_id__lte=resumes[-1][0],
+        job_description_id__in=scorer.jd_ids
+    ).order_by().values_list('resume_id', 'job_description_id', 'inputs_fingerprint')
+    fingerprints = {(resume_id, jd_id): fingerprint for resume_id, jd_id, fingerprint in stored.iterator()}
+    changed = [row for row in rows if fingerprints.get((row[0], row[1])) != row[5]]
+    with _write_lock or nullcontext():
+        return len(rows), save_batch_fit_rows(changed, batch_size)
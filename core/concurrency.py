@@ -0,0 +1,59 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Callable, List, Optional, TypeVar
+
+from django.conf import settings
+from django.db import connections
+
+T = TypeVar('T')
+
+_executor = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool shared by every request's fan-out"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.LLM_FANOUT_WORKERS, thread_name_prefix='fan-out'
+                )
+    return _executor
+
+
+def _run_in_worker(context: contextvars.Context, func: Callable[[], T]) -> T:
+    _local.in_worker = True
+    try:
+        return context.run(func)
+    finally:
+        _local.in_worker = False
+        # Worker threads outlive the request, so don't leave connections open
+        connections.close_all()
+
+
+def fan_out(calls: List[Callable[[], T]], timeout: Optional[float] = None) -> List[T]:
+    """Run independent calls concurrently and return their results in order.
+
+    Each call sees the caller's context variables (e.g. the LLM priority). The
+    first exception is re-raised once it happens and calls that have not
+    started yet are cancelled. Calls made from inside a fan-out run inline, so
+    nested fan-outs can never starve the shared pool.
+    """
+    if len(calls) <= 1 or getattr(_local, 'in_worker', False):
+        return [call() for call in calls]
+
+    executor = get_executor()
+    futures = [executor.submit(_run_in_worker, contextvars.copy_context(), call) for call in calls]
+    done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+    for future in futures:
+        if future in done and future.exception() is not None:
+            raise future.exception()
+    if pending:
+        raise TimeoutError(f"{len(pending)} of {len(calls)} calls did not finish in {timeout}s")
+    return [future.result() for future in futures]
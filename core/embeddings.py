@@ -0,0 +1,415 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .matching import canonicalize_skill
+from .relevance import tokenize
+
+# Try to import sentence-transformers for an optional local CPU model
+SENTENCE_TRANSFORMERS_AVAILABLE = False
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    pass
+
+# Broader concepts implied by specific skills, so "PyTorch" lands near
+# "deep learning frameworks" even though the strings share nothing
+SKILL_CONCEPTS = {
+    'pytorch': ('deep learning', 'machine learning', 'neural networks', 'python'),
+    'tensorflow': ('deep learning', 'machine learning', 'neural networks'),
+    'keras': ('deep learning', 'machine learning', 'neural networks', 'python'),
+    'scikit-learn': ('machine learning', 'data science', 'python'),
+    'pandas': ('data analysis', 'data science', 'python'),
+    'numpy': ('data analysis', 'scientific computing', 'python'),
+    'spark': ('big data', 'data engineering', 'distributed computing'),
+    'hadoop': ('big data', 'data engineering', 'distributed computing'),
+    'airflow': ('data engineering', 'data pipelines', 'workflow orchestration'),
+    'django': ('python', 'web framework', 'backend development'),
+    'flask': ('python', 'web framework', 'backend development'),
+    'fastapi': ('python', 'web framework', 'backend development'),
+    'spring': ('java', 'web framework', 'backend development'),
+    'node.js': ('javascript', 'backend development'),
+    'express': ('javascript', 'web framework', 'backend development'),
+    'react': ('javascript', 'frontend development', 'web framework'),
+    'angular': ('javascript', 'typescript', 'frontend development', 'web framework'),
+    'vue': ('javascript', 'frontend development', 'web framework'),
+    'postgresql': ('sql', 'relational databases', 'databases'),
+    'mysql': ('sql', 'relational databases', 'databases'),
+    'sqlite': ('sql', 'relational databases', 'databases'),
+    'mongodb': ('nosql', 'databases'),
+    'redis': ('nosql', 'caching', 'databases'),
+    'docker': ('containers', 'devops'),
+    'kubernetes': ('containers', 'container orchestration', 'devops', 'cloud'),
+    'jenkins': ('ci-cd', 'devops'),
+    'terraform': ('infrastructure as code', 'devops', 'cloud'),
+    'aws': ('cloud', 'cloud computing'),
+    'azure': ('cloud', 'cloud computing'),
+    'gcp': ('cloud', 'cloud computing'),
+    'tableau': ('data visualization', 'business intelligence'),
+    'power bi': ('data visualization', 'business intelligence'),
+    'figma': ('ui design', 'ux design', 'prototyping'),
+    'scrum': ('agile', 'project management'),
+    'jira': ('agile', 'project management'),
+}
+
+_CONCEPT_RE = re.compile(
+    r'(?<![a-z0-9])(' + '|'.join(re.escape(k) for k in sorted(SKILL_CONCEPTS, key=len, reverse=True)) + r')(?![a-z0-9])'
+)
+
+
+def _features(text: str) -> Dict[str, float]:
+    """Weighted sparse features: words, word bigrams, char trigrams and implied concepts"""
+    lowered = (text or '').lower()
+    tokens = [canonicalize_skill(t) for t in tokenize(lowered)]
+    features: Dict[str, float] = {}
+
+    def add(key, weight):
+        features[key] = features.get(key, 0.0) + weight
+
+    for token in tokens:
+        add(f"w:{token}", 1.0)
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            add(f"c:{padded[i:i + 3]}", 0.2)
+    for first, second in zip(tokens, tokens[1:]):
+        add(f"b:{first} {second}", 0.7)
+    for match in _CONCEPT_RE.findall(lowered):
+        for concept in SKILL_CONCEPTS[match]:
+            words = concept.split()
+            for word in words:
+                add(f"w:{word}", 0.5)
+            for first, second in zip(words, words[1:]):
+                add(f"b:{first} {second}", 0.5)
+    return features
+
+
+class HashingEmbedder:
+    """Dependency-free embedder based on signed feature hashing.
+
+    Hashes are CRC32 based, so vectors are identical across processes and
+    machines (unlike Python's salted ``hash``).
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for key, weight in _features(text).items():
+                h = zlib.crc32(key.encode('utf-8'))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                vectors[row, h % self.dim] += sign * np.sqrt(weight)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class SentenceTransformerEmbedder:
+    """Embedder backed by a locally stored sentence-transformers model (CPU)"""
+
+    def __init__(self, model_path: str):
+        self.model = SentenceTransformer(model_path, device='cpu')
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Iterable[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=64, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Return the configured embedder (local model if set and installed, else hashing)"""
+    global _embedder
+    if _embedder is None:
+        from django.conf import settings
+        with _embedder_lock:
+            if _embedder is None:
+                model_path = getattr(settings, 'EMBEDDING_MODEL', '')
+                if model_path and SENTENCE_TRANSFORMERS_AVAILABLE:
+                    _embedder = SentenceTransformerEmbedder(model_path)
+                else:
+                    _embedder = HashingEmbedder(getattr(settings, 'EMBEDDING_DIM', 256))
+    return _embedder
+
+
+def cosine_similarity(text_a: str, text_b: str) -> float:
+    """Semantic similarity of two texts as a 0–100 score"""
+    if not text_a or not text_b:
+        return 0.0
+    a, b = get_embedder().embed([text_a, text_b])
+    return round(max(float(a @ b), 0.0) * 100.0, 2)
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit vectors; returns normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].astype(np.float32)
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors stored as float16.
+
+    Vectors are grouped by their nearest k-means centroid and stored
+    contiguously per list, so a query scans only the ``nprobe`` closest lists.
+    Vectors added after training go to a small brute-force tail until the next
+    ``train``; replaced or removed trained vectors are masked out.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, dim), dtype=np.float16)
+        self.live = np.zeros(0, dtype=bool)
+        self.tail_ids = np.zeros(0, dtype=np.int64)
+        self.tail_vectors = np.zeros((0, dim), dtype=np.float16)
+        self.meta: Dict = {}
+
+    def __len__(self):
+        return int(self.live.sum()) + len(self.tail_ids)
+
+    def all_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every live (id, vector) pair, trained and tail"""
+        return (
+            np.concatenate([self.ids[self.live], self.tail_ids]),
+            np.concatenate([self.vectors[self.live], self.tail_vectors]),
+        )
+
+    def add(self, ids: Iterable[int], vectors: np.ndarray):
+        """Add (or replace) vectors; they are searched exhaustively until retraining"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        self.remove(ids)
+        self.tail_ids = np.concatenate([self.tail_ids, ids])
+        self.tail_vectors = np.concatenate([self.tail_vectors, vectors.astype(np.float16)])
+
+    def remove(self, ids: Iterable[int]):
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if len(self.tail_ids):
+            keep = ~np.isin(self.tail_ids, ids)
+            self.tail_ids, self.tail_vectors = self.tail_ids[keep], self.tail_vectors[keep]
+        if len(self.ids):
+            self.live &= ~np.isin(self.ids, ids)
+
+    def needs_training(self, tail_ratio: float = 0.1) -> bool:
+        return len(self.tail_ids) > max(1000, tail_ratio * len(self.ids))
+
+    def train(self, n_lists: Optional[int] = None):
+        """Re-cluster every live vector into ``n_lists`` inverted lists"""
+        ids, vectors = self.all_vectors()
+        vectors = vectors.astype(np.float32)
+        n_lists = min(n_lists or max(1, int(np.sqrt(len(ids)))), len(ids))
+        if not n_lists:
+            meta = self.meta
+            self.__init__(self.dim)
+            self.meta = meta
+            return
+        sample = vectors
+        if len(vectors) > 50 * n_lists:
+            sample = vectors[np.random.default_rng(0).choice(len(vectors), 50 * n_lists, replace=False)]
+        self.centroids = _kmeans(sample, n_lists)
+
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        self.ids = ids[order]
+        self.vectors = vectors[order].astype(np.float16)
+        self.live = np.ones(len(ids), dtype=bool)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+        self.tail_ids = np.zeros(0, dtype=np.int64)
+        self.tail_vectors = np.zeros((0, self.dim), dtype=np.float16)
+
+    @staticmethod
+    def _top_k(ids, scores, top_k):
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), round(float(scores[i]), 4)) for i in order]
+
+    def search(self, query: np.ndarray, top_k: int = 10, nprobe: int = 8,
+               doc_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Approximate top-k by cosine similarity, scanning the ``nprobe`` nearest lists.
+
+        With ``doc_ids`` only those vectors are scored, exhaustively: the probed
+        lists could hold none of them, and a caller's set is small.
+        """
+        if doc_ids is not None:
+            return self.exact_search(query, top_k, doc_ids=doc_ids)
+        query = query.astype(np.float32)
+        parts_ids, parts_scores = [], []
+        if len(self.centroids):
+            nprobe = min(nprobe, len(self.centroids))
+            lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            for list_id in lists:
+                start, end = self.offsets[list_id], self.offsets[list_id + 1]
+                live = self.live[start:end]
+                if not live.any():
+                    continue
+                parts_ids.append(self.ids[start:end][live])
+                parts_scores.append((self.vectors[start:end].astype(np.float32) @ query)[live])
+        if len(self.tail_ids):
+            parts_ids.append(self.tail_ids)
+            parts_scores.append(self.tail_vectors.astype(np.float32) @ query)
+        if not parts_ids:
+            return []
+        return self._top_k(np.concatenate(parts_ids), np.concatenate(parts_scores), top_k)
+
+    def exact_search(self, query: np.ndarray, top_k: int = 10,
+                     doc_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Brute-force top-k, used as ground truth for recall measurements"""
+        ids, vectors = self.all_vectors()
+        if doc_ids is not None:
+            keep = np.isin(ids, np.fromiter(doc_ids, dtype=np.int64))
+            ids, vectors = ids[keep], vectors[keep]
+        if not len(ids):
+            return []
+        return self._top_k(ids, vectors.astype(np.float32) @ query.astype(np.float32), top_k)
+
+    ARRAYS = ('centroids', 'offsets', 'ids', 'vectors', 'live', 'tail_ids', 'tail_vectors')
+
+    def save(self, path: str):
+        """Write the arrays to a new version directory, then swap the manifest to name it.
+
+        Readers open the manifest first and then only the version it names, so
+        they never mix arrays from two saves. The version just replaced is kept
+        for readers that opened the old manifest; older ones are deleted.
+        """
+        os.makedirs(path, exist_ok=True)
+        previous = _manifest_version(path)
+        version_dir = tempfile.mkdtemp(prefix='v', dir=path)
+        for key in self.ARRAYS:
+            np.save(os.path.join(version_dir, f"{key}.npy"), np.asarray(getattr(self, key)))
+        version = os.path.basename(version_dir)
+        tmp = os.path.join(path, 'manifest.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'dim': self.dim, 'meta': self.meta, 'version': version}, f)
+        os.replace(tmp, os.path.join(path, 'manifest.json'))
+
+        for entry in os.scandir(path):
+            if entry.name in (version, previous):
+                continue
+            if entry.is_dir(follow_symlinks=False) and entry.name.startswith('v'):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif previous != '' and entry.name.endswith('.npy'):
+                os.remove(entry.path)  # arrays of the old unversioned layout
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'IVFIndex':
+        """Load a saved index; the float16 vector array is memory-mapped by default"""
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        version_dir = os.path.join(path, manifest.get('version', ''))
+        mode = 'r' if mmap else None
+        index = cls(manifest['dim'])
+        index.meta = manifest.get('meta', {})
+        index.centroids = np.load(os.path.join(version_dir, 'centroids.npy'))
+        index.offsets = np.load(os.path.join(version_dir, 'offsets.npy'))
+        index.ids = np.load(os.path.join(version_dir, 'ids.npy'), mmap_mode=mode)
+        index.vectors = np.load(os.path.join(version_dir, 'vectors.npy'), mmap_mode=mode)
+        index.live = np.array(np.load(os.path.join(version_dir, 'live.npy')))
+        index.tail_ids = np.load(os.path.join(version_dir, 'tail_ids.npy'))
+        index.tail_vectors = np.load(os.path.join(version_dir, 'tail_vectors.npy'))
+        return index
+
+
+def _manifest_version(path: str) -> Optional[str]:
+    """The version directory the current manifest names ('' for the unversioned layout)"""
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            return json.load(f).get('version', '')
+    except (OSError, ValueError):
+        return None
+
+
+_indexes: Dict[str, Tuple[int, IVFIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_path(kind: str) -> str:
+    from django.conf import settings
+    return os.path.join(str(settings.TEXT_INDEX_DIR), 'semantic', kind)
+
+
+def update_semantic_index(kind: str, batch_size: int = 2000, retrain: bool = False) -> int:
+    """Embed rows added (or changed) since the last run and add them to the ANN index"""
+    from .relevance import document_rows
+
+    path = _index_path(kind)
+    embedder = get_embedder()
+    try:
+        index = IVFIndex.load(path, mmap=False)
+        if index.dim != embedder.dim:
+            index, retrain = IVFIndex(embedder.dim), True
+    except FileNotFoundError:
+        index = IVFIndex(embedder.dim)
+
+    since = dict(index.meta)
+    added, batch = 0, []
+    max_id, max_updated = since.get('max_id', 0), since.get('updated_at')
+
+    def flush():
+        index.add([doc_id for doc_id, _ in batch], embedder.embed([text for _, text in batch]))
+
+    for doc_id, updated_at, text in document_rows(kind, since):
+        batch.append((doc_id, text))
+        max_id = max(max_id, doc_id)
+        if updated_at is not None:
+            stamp = updated_at.isoformat()
+            max_updated = max(max_updated or stamp, stamp)
+        if len(batch) >= batch_size:
+            flush()
+            added += len(batch)
+            batch = []
+    if batch:
+        flush()
+        added += len(batch)
+
+    if retrain or index.needs_training():
+        index.train()
+    index.meta = {'max_id': max_id, 'updated_at': max_updated}
+    if added or retrain or not os.path.exists(os.path.join(path, 'manifest.json')):
+        index.save(path)
+    return added
+
+
+def get_semantic_index(kind: str) -> IVFIndex:
+    """Return the process-wide memory-mapped ANN index for ``kind``, reloading after updates"""
+    manifest = os.path.join(_index_path(kind), 'manifest.json')
+    try:
+        mtime = os.stat(manifest).st_mtime_ns
+    except OSError:
+        return IVFIndex(get_embedder().dim)
+    with _indexes_lock:
+        cached = _indexes.get(manifest)
+        if cached is None or cached[0] != mtime:
+            _indexes[manifest] = (mtime, IVFIndex.load(os.path.dirname(manifest)))
+        return _indexes[manifest][1]
+
+
+def semantic_search(kind: str, query: str, top_k: int = 10,
+                    doc_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+    """Approximate nearest-neighbour search of ``kind`` documents for a query text"""
+    from django.conf import settings
+    vector = get_embedder().embed([query])[0]
+    return get_semantic_index(kind).search(
+        vector, top_k=top_k, nprobe=getattr(settings, 'SEMANTIC_NPROBE', 16), doc_ids=doc_ids)
@@ -0,0 +1,78 @@
+import json
+import time
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from .models import Task
+from .serializers import TaskSerializer
+
+TERMINAL_STATUSES = (Task.SUCCEEDED, Task.FAILED)
+
+
+def format_event(event: str, data, event_id: Optional[str] = None) -> str:
+    """Encode one server-sent event"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets ``text/event-stream`` requests through content negotiation; errors become an error event"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data)
+
+
+def task_events(
+    task_id: int,
+    poll_interval: Optional[float] = None,
+    max_duration: Optional[float] = None,
+    keepalive: float = 15.0
+) -> Iterator[str]:
+    """Stream a task's state as server-sent events.
+
+    A ``progress`` event is sent whenever the task row changes and a final
+    ``done`` event once it succeeds or fails. The stream closes after
+    ``max_duration`` seconds so it never pins a server thread for long;
+    browsers reconnect on their own and get the current state straight away.
+    """
+    poll_interval = poll_interval or settings.TASK_EVENTS_POLL_INTERVAL
+    max_duration = max_duration or settings.TASK_EVENTS_MAX_DURATION
+    deadline = time.monotonic() + max_duration
+    last_seen = None
+    last_sent = time.monotonic()
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+    while True:
+        task = Task.objects.filter(id=task_id).first()
+        if task is None:
+            yield format_event('error', {'detail': 'Not found.'})
+            return
+
+        now = time.monotonic()
+        version = (task.status, task.updated_at)
+        if version != last_seen:
+            last_seen = version
+            terminal = task.status in TERMINAL_STATUSES
+            yield format_event(
+                'done' if terminal else 'progress', TaskSerializer(task).data,
+                event_id=task.updated_at.isoformat()
+            )
+            last_sent = now
+            if terminal:
+                return
+        elif now - last_sent >= keepalive:
+            yield ": keepalive\n\n"
+            last_sent = now
+
+        if now >= deadline:
+            return
+        time.sleep(poll_interval)
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, FloatField, Max, Sum
+from django.db.models.functions import Cast
+
+from .matching import canonicalize_skills, job_skill_weights
+from .models import JobDescription, JobSkillPosting, Resume, ResumeSkillPosting
+
+
+def _build_job_postings(jd: JobDescription) -> List[JobSkillPosting]:
+    """Build (unsaved) inverted index postings for one job description"""
+    weights = job_skill_weights(jd.required_skills, jd.preferred_skills)
+    total_weight = sum(weights.values())
+    return [
+        JobSkillPosting(skill=skill, job_description_id=jd.id, weight=weight, total_weight=total_weight)
+        for skill, weight in weights.items()
+    ]
+
+
+def index_job_descriptions(jds: Iterable[JobDescription], batch_size: int = 1000) -> int:
+    """Replace the skill postings of the given job descriptions; returns postings written"""
+    jds = list(jds)
+    postings = [p for jd in jds for p in _build_job_postings(jd)]
+    with transaction.atomic():
+        JobSkillPosting.objects.filter(job_description_id__in=[jd.id for jd in jds]).delete()
+        JobSkillPosting.objects.bulk_create(postings, batch_size=batch_size)
+    return len(postings)
+
+
+def index_job_description(jd: JobDescription) -> int:
+    """Replace the skill postings of a single job description"""
+    return index_job_descriptions([jd])
+
+
+def recommend_job_descriptions(
+    resume_skills: List[str],
+    company: Optional[str] = None,
+    created_after=None,
+    created_before=None
+):
+    """Rank job descriptions by weighted skill coverage for a resume.
+
+    Only postings for the resume's skills are read, so the cost depends on how
+    many JDs share those skills rather than on the total number of JDs.
+    Returns a values queryset of ``job_description_id`` and ``fit_score``.
+    """
+    postings = JobSkillPosting.objects.filter(skill__in=canonicalize_skills(resume_skills))
+    if company:
+        postings = postings.filter(job_description__company__iexact=company)
+    if created_after:
+        postings = postings.filter(job_description__created_at__gte=created_after)
+    if created_before:
+        postings = postings.filter(job_description__created_at__lt=created_before)
+
+    return (
+        postings.values('job_description_id')
+        .annotate(matched_weight=Sum('weight'), total_weight=Max('total_weight'))
+        .annotate(fit_score=Cast(100.0 * F('matched_weight') / F('total_weight'), FloatField()))
+        .order_by('-fit_score', '-job_description_id')
+    )
+
+
+def matching_skills_for(resume_skills: List[str], jd_ids: List[int]) -> Dict[int, List[str]]:
+    """Return the indexed skills each job description shares with a resume"""
+    matches = {jd_id: [] for jd_id in jd_ids}
+    postings = JobSkillPosting.objects.filter(
+        job_description_id__in=jd_ids,
+        skill__in=canonicalize_skills(resume_skills)
+    ).order_by('-weight', 'skill').values_list('job_description_id', 'skill')
+    for jd_id, skill in postings:
+        matches[jd_id].append(skill)
+    return matches
+
+
+def index_resumes(resumes: Iterable[Resume], batch_size: int = 1000) -> int:
+    """Replace the skill postings of the given resumes; returns postings written"""
+    resumes = list(resumes)
+    postings = [
+        ResumeSkillPosting(skill=skill, resume_id=resume.id)
+        for resume in resumes
+        for skill in canonicalize_skills(resume.extracted_skills)
+    ]
+    with transaction.atomic():
+        ResumeSkillPosting.objects.filter(resume_id__in=[r.id for r in resumes]).delete()
+        ResumeSkillPosting.objects.bulk_create(postings, batch_size=batch_size)
+    return len(postings)
+
+
+def index_resume(resume: Resume) -> int:
+    """Replace the skill postings of a single resume"""
+    return index_resumes([resume])
+
+
+def _top_k_settled(scores: np.ndarray, k: int, remaining: float) -> bool:
+    """True when no resume outside the current top k can still overtake it"""
+    if remaining <= 0:
+        return True
+    if len(scores) <= k:
+        return False
+    top = np.partition(scores, len(scores) - k - 1)[-(k + 1):]
+    return top[1:].min() > top[0] + remaining
+
+
+def rank_resumes_for_job(
+    required_skills: List[str],
+    preferred_skills: Optional[List[str]] = None,
+    top_k: int = 20
+) -> List[Tuple[int, float, List[str]]]:
+    """Return the top-k resumes for a JD as ``(resume_id, fit_score, matching_skills)``.
+
+    Skills are visited from heaviest to lightest; each one adds its weight to a
+    dense score array for every resume that has it. Once the remaining weight
+    can no longer change which resumes are in the top k, the rest of the
+    posting lists are skipped and only the winners' scores are completed.
+    """
+    weights = job_skill_weights(required_skills, preferred_skills)
+    total_weight = sum(weights.values())
+    if not total_weight or top_k <= 0:
+        return []
+
+    max_id = Resume.objects.aggregate(max_id=Max('id'))['max_id']
+    if max_id is None:
+        return []
+    scores = np.zeros(max_id + 1, dtype=np.float32)
+
+    ordered = sorted(weights.items(), key=lambda item: (-item[1], item[0]))
+    remaining = total_weight
+    for skill, weight in ordered:
+        ids = np.fromiter(
+            ResumeSkillPosting.objects.filter(skill=skill).values_list('resume_id', flat=True),
+            dtype=np.int64
+        )
+        ids = ids[ids <= max_id]  # ignore resumes created after max_id was read
+        scores[ids] += weight
+        remaining -= weight
+        if _top_k_settled(scores, top_k, remaining):
+            break
+
+    candidates = np.flatnonzero(scores)
+    if len(candidates) > top_k:
+        # Keep everything above the k-th score, then break ties by lowest id
+        kth = np.partition(scores[candidates], len(candidates) - top_k)[len(candidates) - top_k]
+        above = candidates[scores[candidates] > kth]
+        tied = candidates[scores[candidates] == kth][:top_k - len(above)]
+        candidates = np.concatenate([above, tied])
+    candidate_ids = [int(i) for i in candidates]
+
+    # Finish the winners' scores and collect their matching skills
+    matching = {resume_id: [] for resume_id in candidate_ids}
+    postings = ResumeSkillPosting.objects.filter(
+        resume_id__in=candidate_ids, skill__in=list(weights)
+    ).values_list('resume_id', 'skill')
+    final = dict.fromkeys(candidate_ids, 0.0)
+    for resume_id, skill in postings:
+        matching[resume_id].append(skill)
+        final[resume_id] += weights[skill]
+
+    ranked = sorted(candidate_ids, key=lambda rid: (-final[rid], rid))
+    return [
+        (rid, round(100.0 * final[rid] / total_weight, 2),
+         sorted(matching[rid], key=lambda s: (-weights[s], s)))
+        for rid in ranked
+    ]
@@ -0,0 +1,46 @@
+"""Worker-side helpers for the ``import_resumes`` command.
+
+Models are not imported here so worker processes started with ``spawn`` can
+unpickle these functions before Django is set up.
+"""
+import hashlib
+import os
+from typing import Iterator, Optional, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def walk_resume_files(root: str, extensions) -> Iterator[str]:
+    """Yield resume files under ``root`` in a stable depth-first order"""
+    extensions = {ext.lower().lstrip('.') for ext in extensions}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1][1:].lower() in extensions:
+                yield os.path.join(dirpath, filename)
+
+
+def extract_resume_text(path: str) -> Tuple[str, str, Optional[str]]:
+    """Return ``(path, text, error)`` for one file"""
+    from .utils import extract_text_from_file
+
+    try:
+        return path, extract_text_from_file(path), None
+    except Exception as e:
+        return path, '', str(e)
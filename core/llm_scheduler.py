@@ -0,0 +1,176 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+
+INTERACTIVE = 'interactive'
+STANDARD = 'standard'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, STANDARD, BULK)
+
+DEFAULT_WEIGHTS = {INTERACTIVE: 8, STANDARD: 3, BULK: 1}
+
+# Priority of the LLM calls made by the current request, task or command
+_current_priority = contextvars.ContextVar('llm_priority', default=STANDARD)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls under ``priority``"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _Ticket:
+    __slots__ = ('priority', 'finish')
+
+    def __init__(self, priority, finish):
+        self.priority = priority
+        self.finish = finish
+
+
+class LLMScheduler:
+    """Weighted fair queuing of LLM calls across priority classes.
+
+    At most ``max_concurrency`` calls run at once and ``reserved_interactive``
+    of those slots are kept for interactive calls. When calls wait, the next
+    one is the class head with the smallest virtual finish tag, so each class
+    gets capacity in proportion to its weight and bulk work still progresses
+    under load. An optional requests-per-minute budget is shared by everyone.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        reserved_interactive: int = 1,
+        weights: Optional[Dict[str, float]] = None,
+        requests_per_minute: int = 0
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_concurrency - 1)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.requests_per_minute = requests_per_minute
+        self._condition = threading.Condition()
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._last_finish = dict.fromkeys(PRIORITIES, 0.0)
+        self._virtual_time = 0.0
+        self._running = dict.fromkeys(PRIORITIES, 0)
+        self._tokens = float(requests_per_minute)
+        self._refilled_at = time.monotonic()
+
+    def waiting(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def running(self) -> int:
+        with self._condition:
+            return sum(self._running.values())
+
+    def _has_capacity(self, priority):
+        in_use = sum(self._running.values())
+        if priority == INTERACTIVE:
+            return in_use < self.max_concurrency
+        shared_in_use = in_use - self._running[INTERACTIVE]
+        return in_use < self.max_concurrency and shared_in_use < self.max_concurrency - self.reserved_interactive
+
+    def _refill(self):
+        if not self.requests_per_minute:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.requests_per_minute),
+            self._tokens + (now - self._refilled_at) * self.requests_per_minute / 60.0
+        )
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            return 0.0
+        return (1.0 - self._tokens) * 60.0 / self.requests_per_minute
+
+    def _next_ticket(self):
+        heads = [
+            queue[0] for priority, queue in self._queues.items()
+            if queue and self._has_capacity(priority)
+        ]
+        return min(heads, key=lambda ticket: ticket.finish, default=None)
+
+    def acquire(self, priority: str = STANDARD, timeout: Optional[float] = None):
+        """Block until a call of ``priority`` may run; raises TimeoutError after ``timeout`` seconds"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown LLM priority: {priority}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            start = max(self._virtual_time, self._last_finish[priority])
+            ticket = _Ticket(priority, start + 1.0 / self.weights[priority])
+            self._last_finish[priority] = ticket.finish
+            self._queues[priority].append(ticket)
+            try:
+                while True:
+                    wait = None
+                    if self._next_ticket() is ticket:
+                        wait = self._refill()
+                        if not wait:
+                            break
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Timed out waiting for LLM capacity ({priority})")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+            except BaseException:
+                self._queues[priority].remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            self._queues[priority].popleft()
+            self._virtual_time = max(self._virtual_time, ticket.finish - 1.0 / self.weights[priority])
+            self._running[priority] += 1
+            if self.requests_per_minute:
+                self._tokens -= 1.0
+            self._condition.notify_all()
+
+    def release(self, priority: str):
+        with self._condition:
+            self._running[priority] -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None, timeout: Optional[float] = None):
+        """Hold one LLM slot for the enclosed call"""
+        priority = priority or current_priority()
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler configured from settings"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    reserved_interactive=settings.LLM_RESERVED_INTERACTIVE,
+                    weights=settings.LLM_PRIORITY_WEIGHTS,
+                    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+                )
+    return _scheduler
@@ -0,0 +1,64 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.embeddings import SKILL_CONCEPTS, IVFIndex, get_embedder
+
+FILLER = (
+    'experience', 'team', 'projects', 'developed', 'built', 'designed', 'led', 'years',
+    'production', 'systems', 'students', 'internship', 'university', 'applications',
+)
+
+
+class Command(BaseCommand):
+    help = "Measure recall and latency of the semantic ANN index against exact search"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=50000, help="Synthetic documents to index")
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--top-k', type=int, default=10)
+        parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _document(self, rng):
+        skills = rng.sample(sorted(SKILL_CONCEPTS), rng.randint(3, 8))
+        words = skills + rng.sample(FILLER, 5)
+        rng.shuffle(words)
+        return ' '.join(words)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        embedder = get_embedder()
+        top_k = options['top_k']
+
+        started = time.monotonic()
+        vectors = embedder.embed(self._document(rng) for _ in range(options['size']))
+        self.stdout.write(f"Embedded {len(vectors)} documents in {time.monotonic() - started:.1f}s "
+                          f"({vectors.astype(np.float16).nbytes / 1e6:.1f} MB as float16)")
+
+        index = IVFIndex(embedder.dim)
+        index.add(range(len(vectors)), vectors)
+        started = time.monotonic()
+        index.train()
+        self.stdout.write(f"Trained {len(index.centroids)} lists in {time.monotonic() - started:.1f}s")
+
+        queries = embedder.embed(self._document(rng) for _ in range(options['queries']))
+        exact, exact_times = [], []
+        for query in queries:
+            started = time.perf_counter()
+            exact.append({doc_id for doc_id, _ in index.exact_search(query, top_k)})
+            exact_times.append(time.perf_counter() - started)
+        self.stdout.write(f"exact      recall@{top_k}=1.000  "
+                          f"mean={1000 * np.mean(exact_times):.2f}ms p95={1000 * np.percentile(exact_times, 95):.2f}ms")
+
+        for nprobe in options['nprobe']:
+            recalls, times = [], []
+            for query, truth in zip(queries, exact):
+                started = time.perf_counter()
+                found = {doc_id for doc_id, _ in index.search(query, top_k, nprobe=nprobe)}
+                times.append(time.perf_counter() - started)
+                recalls.append(len(found & truth) / max(len(truth), 1))
+            self.stdout.write(f"nprobe={nprobe:<3} recall@{top_k}={np.mean(recalls):.3f}  "
+                              f"mean={1000 * np.mean(times):.2f}ms p95={1000 * np.percentile(times, 95):.2f}ms")
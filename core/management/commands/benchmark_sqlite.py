@@ -0,0 +1,116 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Django's own SQLite defaults: rollback journal, 5s timeout, deferred transactions
+DEFAULT_PROFILE = {'pragmas': '', 'timeout': 5.0, 'begin': 'BEGIN', 'persistent': False}
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent SQLite write throughput with the production profile off and on"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help="Threads inserting rows (uploads, matches)")
+        parser.add_argument('--readers', type=int, default=4, help="Threads reading recent rows (list pages)")
+        parser.add_argument('--duration', type=float, default=5.0, help="Seconds per profile")
+        parser.add_argument('--payload', type=int, default=4096, help="Bytes of text per inserted row")
+
+    def _tuned_profile(self):
+        return {
+            'pragmas': settings.SQLITE_PRAGMAS,
+            'timeout': settings.SQLITE_BUSY_TIMEOUT,
+            'begin': 'BEGIN IMMEDIATE',
+            'persistent': True,
+        }
+
+    def _connect(self, path, profile):
+        conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=None, check_same_thread=False)
+        for pragma in profile['pragmas'].split(';'):
+            if pragma.strip():
+                conn.execute(pragma)
+        return conn
+
+    def _run(self, profile, options):
+        directory = tempfile.mkdtemp(prefix='sqlite-bench-')
+        path = os.path.join(directory, 'bench.sqlite3')
+        setup = self._connect(path, profile)
+        setup.execute("CREATE TABLE doc (id INTEGER PRIMARY KEY, owner INTEGER, body TEXT, created REAL)")
+        setup.execute("CREATE INDEX doc_owner ON doc (owner, id)")
+        setup.close()
+
+        body = 'x' * options['payload']
+        deadline = time.monotonic() + options['duration']
+        latencies, reads, errors = [], [0], [0]
+        lock = threading.Lock()
+
+        def writer(owner):
+            held = self._connect(path, profile) if profile['persistent'] else None
+            while time.monotonic() < deadline:
+                conn = held or self._connect(path, profile)
+                started = time.perf_counter()
+                try:
+                    # Read-then-write, like creating a report after looking up the latest one
+                    conn.execute(profile['begin'])
+                    conn.execute("SELECT id FROM doc WHERE owner = ? ORDER BY id DESC LIMIT 1", (owner,)).fetchone()
+                    conn.execute("INSERT INTO doc (owner, body, created) VALUES (?, ?, ?)", (owner, body, time.time()))
+                    conn.execute("COMMIT")
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    with lock:
+                        errors[0] += 1
+                finally:
+                    if held is None:
+                        conn.close()
+            if held is not None:
+                held.close()
+
+        def reader():
+            held = self._connect(path, profile) if profile['persistent'] else None
+            while time.monotonic() < deadline:
+                conn = held or self._connect(path, profile)
+                try:
+                    conn.execute("SELECT id, owner, created FROM doc ORDER BY id DESC LIMIT 20").fetchall()
+                    with lock:
+                        reads[0] += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        errors[0] += 1
+                finally:
+                    if held is None:
+                        conn.close()
+            if held is not None:
+                held.close()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(options['writers'])]
+        threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        shutil.rmtree(directory, ignore_errors=True)
+        return latencies, reads[0], errors[0]
+
+    def handle(self, *args, **options):
+        duration = options['duration']
+        self.stdout.write(
+            f"{options['writers']} writers, {options['readers']} readers, "
+            f"{options['payload']} byte rows, {duration:.1f}s per profile"
+        )
+        for name, profile in (('default', DEFAULT_PROFILE), ('tuned', self._tuned_profile())):
+            latencies, reads, errors = self._run(profile, options)
+            ms = 1000 * np.array(latencies or [0.0])
+            self.stdout.write(
+                f"{name:<8} writes={len(latencies) / duration:,.0f}/s reads={reads / duration:,.0f}/s "
+                f"locked={errors} p50={np.percentile(ms, 50):.1f}ms p99={np.percentile(ms, 99):.1f}ms"
+            )
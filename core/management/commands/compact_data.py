@@ -0,0 +1,76 @@
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from core.retention import archive_rows, purge_orphan_documents, retention_querysets, sweep_orphan_media
+
+
+def _megabytes(size: int) -> str:
+    return f"{size / 1e6:,.2f} MB"
+
+
+class Command(BaseCommand):
+    help = "Archive old reports and letters to compressed JSONL, then delete orphan texts and media files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.DATA_RETENTION_DAYS,
+                            help="Archive reports and letters older than this")
+        parser.add_argument('--archive-dir', default=str(settings.ARCHIVE_DIR),
+                            help="Where the .jsonl.gz archives are written")
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help="Keep orphan files and texts younger than this (uploads in flight)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--skip-media', action='store_true', help="Leave media files alone")
+        parser.add_argument('--vacuum', action='store_true',
+                            help="Run VACUUM afterwards so SQLite returns the freed pages to the filesystem")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be removed without changing anything")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--days must be zero or more and --batch-size positive")
+        dry_run, batch_size = options['dry_run'], options['batch_size']
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        grace = timedelta(hours=options['grace_hours'])
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        if not dry_run:
+            os.makedirs(options['archive_dir'], exist_ok=True)
+
+        started = time.monotonic()
+        reclaimed = 0
+        for name, queryset in retention_querysets(cutoff):
+            path = os.path.join(options['archive_dir'], f"{name}-{stamp}.jsonl.gz")
+            rows, size = archive_rows(queryset, path, batch_size, dry_run)
+            reclaimed += size
+            archived = f" to {path} ({_megabytes(os.path.getsize(path))})" if rows and not dry_run else ''
+            self.stdout.write(f"{name}: {rows} rows, {_megabytes(size)}{archived}")
+
+        # Archived offer letters may have been the last rows using their texts and files
+        documents, size = purge_orphan_documents(grace, batch_size, dry_run)
+        reclaimed += size
+        self.stdout.write(f"documents: {documents} unreferenced, {_megabytes(size)}")
+
+        if not options['skip_media']:
+            files, size = sweep_orphan_media(
+                grace, batch_size, dry_run,
+                on_delete=lambda name: self.stdout.write(f"  {name}") if options['verbosity'] > 1 else None
+            )
+            reclaimed += size
+            self.stdout.write(f"media: {files} orphan files, {_megabytes(size)}")
+
+        if options['vacuum'] and not dry_run and connection.vendor == 'sqlite':
+            path = str(connection.settings_dict['NAME'])
+            before = os.path.getsize(path) if os.path.exists(path) else 0
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+            after = os.path.getsize(path) if os.path.exists(path) else 0
+            self.stdout.write(f"vacuum: database file {_megabytes(before)} -> {_megabytes(after)}")
+
+        verb = "Would reclaim" if dry_run else "Reclaimed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {_megabytes(reclaimed)} in {time.monotonic() - started:.1f}s"
+        ))
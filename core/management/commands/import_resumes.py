@@ -0,0 +1,185 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.indexing import index_resumes
+from core.ingest import extract_resume_text, file_sha256, init_worker, walk_resume_files
+from core.llm_scheduler import BULK
+from core.models import Resume, resume_file_path
+from core.search import index_objects
+from core.tasks import enqueue_many
+from core.utils import extract_contact_details, extract_skills_from_texts
+
+
+class Command(BaseCommand):
+    help = "Import a folder of PDF/DOCX resumes, skipping files that were already imported"
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--user', help="Email of the user who will own the imported resumes")
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Files extracted, written and checkpointed together")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Text extraction processes (1 extracts in this process)")
+        parser.add_argument('--checkpoint',
+                            help="Progress file used to resume an interrupted import")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore any saved progress")
+        parser.add_argument('--enrich', action='store_true',
+                            help="Queue bulk-priority Gemini parsing for every imported resume")
+
+    def _read_checkpoint(self, path, root):
+        try:
+            with open(path) as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('directory') == root else None
+
+    def _write_checkpoint(self, path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, path)
+
+    def _batches(self, paths, batch_size, seen):
+        """Hash files and keep the unseen ones.
+
+        Yields ``(batch, last_path, files_scanned, duplicates, bytes_scanned)``.
+        """
+        while True:
+            chunk = list(islice(paths, batch_size))
+            if not chunk:
+                return
+            hashed = [(path, file_sha256(path), os.path.getsize(path)) for path in chunk]
+            known = set(
+                Resume.objects.filter(content_hash__in=[digest for _, digest, _ in hashed])
+                .order_by().values_list('content_hash', flat=True)
+            )
+            batch, duplicates = [], 0
+            for path, digest, size in hashed:
+                if digest in known or digest in seen:
+                    duplicates += 1
+                    continue
+                seen.add(digest)
+                batch.append((path, digest, size))
+            yield batch, chunk[-1], len(chunk), duplicates, sum(size for _, _, size in hashed)
+
+    def _extracted(self, batches, workers):
+        """Extract text for each batch, keeping the next batch in flight"""
+        if workers <= 1:
+            for batch, *rest in batches:
+                yield batch, [extract_resume_text(path) for path, _, _ in batch], rest
+            return
+
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            pending = deque()
+            for batch, *rest in batches:
+                paths = [path for path, _, _ in batch]
+                pending.append((batch, pool.map(extract_resume_text, paths, chunksize=8), rest))
+                if len(pending) > 1:
+                    done_batch, results, done_rest = pending.popleft()
+                    yield done_batch, list(results), done_rest
+            while pending:
+                done_batch, results, done_rest = pending.popleft()
+                yield done_batch, list(results), done_rest
+
+    def _store_file(self, path):
+        with open(path, 'rb') as handle:
+            return default_storage.save(resume_file_path(None, os.path.basename(path)), File(handle))
+
+    def handle(self, *args, **options):
+        root = os.path.abspath(options['directory'])
+        if not os.path.isdir(root):
+            raise CommandError(f"Not a directory: {root}")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(email=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+
+        checkpoint = options['checkpoint'] or os.path.join(str(settings.TEXT_INDEX_DIR), 'import_resumes.json')
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+        state = None if options['restart'] else self._read_checkpoint(checkpoint, root)
+        state = state or {
+            'directory': root, 'position': 0, 'last_path': None,
+            'imported': 0, 'duplicates': 0, 'failed': 0,
+        }
+        if state['position']:
+            self.stdout.write(f"Resuming after {state['position']} files ({state['last_path']})")
+
+        # Skipping already-processed files is only a shortcut: duplicates are
+        # caught by content hash anyway if the directory changed meanwhile
+        paths = islice(walk_resume_files(root, settings.ALLOWED_FILE_TYPES), state['position'], None)
+        batches = self._batches(paths, options['batch_size'], set())
+
+        started = time.monotonic()
+        scanned = scanned_bytes = 0
+        for batch, results, (last_path, count, duplicates, size) in self._extracted(batches, options['workers']):
+            rows, failed = [], 0
+            for (path, digest, _), (_, text, error) in zip(batch, results):
+                if error or not text.strip():
+                    failed += 1
+                    self.stderr.write(f"Skipped {path}: {error or 'no text found'}")
+                    continue
+                rows.append((path, digest, text))
+
+            skills = extract_skills_from_texts([text for _, _, text in rows])
+            resumes = [
+                Resume(
+                    user=user,
+                    file=self._store_file(path),
+                    parsed_text=text,
+                    extracted_skills=resume_skills,
+                    content_hash=digest,
+                    **extract_contact_details(text),
+                )
+                for (path, digest, text), resume_skills in zip(rows, skills)
+            ]
+            # bulk_create skips save() and post_save, so documents and indexes are written here
+            with transaction.atomic():
+                Resume.store_documents(resumes)
+                created = Resume.objects.bulk_create(resumes)
+                index_resumes(created)
+                index_objects('resume', created)
+            if options['enrich'] and created:
+                enqueue_many('parse_resume', [{'resume_id': r.id} for r in created], user=user, priority=BULK)
+
+            scanned += count
+            scanned_bytes += size
+            state.update(
+                position=state['position'] + count, last_path=last_path,
+                imported=state['imported'] + len(created),
+                duplicates=state['duplicates'] + duplicates,
+                failed=state['failed'] + failed,
+            )
+            self._write_checkpoint(checkpoint, state)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"{state['position']} files: {state['imported']} imported, {state['duplicates']} duplicates, "
+                f"{state['failed']} failed ({scanned / elapsed:,.1f} files/s, "
+                f"{scanned_bytes / elapsed / 1e6:,.1f} MB/s)"
+            )
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {state['imported']} resumes ({state['duplicates']} duplicates, {state['failed']} failed) "
+            f"in {elapsed:.1f}s. Run update_text_index and update_semantic_index to make them searchable."
+        ))
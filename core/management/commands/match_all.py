@@ -0,0 +1,142 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.batch_matching import init_worker, match_chunk
+from core.matching import BatchFitScorer
+from core.models import JobDescription, Resume
+from core.utils import extract_skills_from_text
+
+
+class Command(BaseCommand):
+    help = "Compute skill gap reports for every resume against every job description"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-description', type=int, action='append', dest='jd_ids',
+                            help="Only match these job description ids (default: all)")
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help="Resumes scored per worker task")
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help="Rows per bulk write")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (1 runs everything in this process)")
+        parser.add_argument('--checkpoint',
+                            help="Progress file used to resume an interrupted run")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore any saved progress and start from the first resume")
+
+    def _load_jobs(self, jd_ids):
+        queryset = JobDescription.objects.with_text().order_by('id').only(
+            'id', 'required_skills', 'preferred_skills', 'text_document'
+        )
+        if jd_ids:
+            queryset = queryset.filter(id__in=jd_ids)
+        jobs = [(jd.id, jd.required_skills, jd.preferred_skills, jd.text) for jd in queryset]
+        extracted = {
+            jd_id: extract_skills_from_text(text)
+            for jd_id, required, preferred, text in jobs
+            if not required and not preferred
+        }
+        return jobs, extracted
+
+    def _read_checkpoint(self, path, key):
+        try:
+            with open(path) as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return 0, 0
+        if state.get('key') != key:
+            return 0, 0
+        return state['last_resume_id'], state['written']
+
+    def _write_checkpoint(self, path, key, last_resume_id, written):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump({'key': key, 'last_resume_id': last_resume_id, 'written': written}, handle)
+        os.replace(tmp_path, path)
+
+    def _chunks(self, last_id, chunk_size):
+        # Page by id instead of streaming one cursor: on SQLite an open read
+        # would block the workers' writes from committing
+        while True:
+            chunk = list(
+                Resume.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'extracted_skills')[:chunk_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1][0]
+
+    def _matched_chunks(self, scorer, chunks, workers, batch_size):
+        if workers <= 1:
+            for chunk in chunks:
+                yield chunk, match_chunk(chunk, batch_size, scorer)
+            return
+
+        # SQLite allows one writer at a time; waiting on its busy timeout
+        # starves workers, so they take turns instead
+        context = multiprocessing.get_context()
+        write_lock = context.Lock() if connection.vendor == 'sqlite' else None
+
+        # Keep a bounded window of chunks in flight and yield them in order,
+        # so the checkpoint only ever covers fully written chunks
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker,
+                                 initargs=(scorer, write_lock)) as pool:
+            pending = []
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(match_chunk, chunk, batch_size)))
+                if len(pending) >= workers * 2:
+                    done_chunk, future = pending.pop(0)
+                    yield done_chunk, future.result()
+            for done_chunk, future in pending:
+                yield done_chunk, future.result()
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--chunk-size and --batch-size must be positive")
+
+        jobs, extracted = self._load_jobs(options['jd_ids'])
+        if not jobs:
+            raise CommandError("No job descriptions to match")
+        scorer = BatchFitScorer(jobs, extracted)
+
+        # Saved progress only applies to a run over the same job descriptions
+        key = hashlib.sha256(json.dumps(scorer.jd_ids).encode('utf-8')).hexdigest()
+        checkpoint = options['checkpoint'] or os.path.join(str(settings.TEXT_INDEX_DIR), 'match_all.json')
+        os.makedirs(os.path.dirname(os.path.abspath(checkpoint)), exist_ok=True)
+        last_id, written = (0, 0) if options['restart'] else self._read_checkpoint(checkpoint, key)
+        if last_id:
+            self.stdout.write(f"Resuming after resume {last_id} ({written} rows already written)")
+
+        total = Resume.objects.filter(id__gt=last_id).count() * len(jobs)
+        self.stdout.write(f"Matching {total // len(jobs)} resumes against {len(jobs)} job descriptions")
+
+        started = time.monotonic()
+        done = 0
+        chunks = self._chunks(last_id, options['chunk_size'])
+        for chunk, (pairs, rows) in self._matched_chunks(scorer, chunks, options['workers'], options['batch_size']):
+            done += pairs
+            written += rows
+            self._write_checkpoint(checkpoint, key, chunk[-1][0], written)
+
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f"{done}/{total} pairs ({100.0 * done / total:.1f}%), {written} rows written, {rate:,.0f} pairs/s"
+            )
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Matched {done} pairs and wrote {written} skill gap reports in {elapsed:.1f}s "
+            f"({done / elapsed if elapsed else 0:,.0f} pairs/s)"
+        ))
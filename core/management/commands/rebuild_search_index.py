@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.search import SEARCH_KINDS, create_search_tables, get_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search tables for resumes, job descriptions and offer letters"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=list(SEARCH_KINDS), action='append',
+                            help="Only rebuild these kinds (repeatable); default is all")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.WARNING("This database has no full-text backend; search falls back to LIKE"))
+            return
+
+        create_search_tables()
+        for kind in options['kind'] or SEARCH_KINDS:
+            rows = rebuild_search_index(kind, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Indexed {rows} {kind.replace('_', ' ')} rows"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from core.indexing import index_job_descriptions, index_resumes
+from core.models import JobDescription, Resume
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted skill indexes used for job recommendations and candidate ranking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def _rebuild(self, queryset, index, batch_size):
+        batch, rows, postings = [], 0, 0
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                postings += index(batch, batch_size)
+                rows += len(batch)
+                batch = []
+        if batch:
+            postings += index(batch, batch_size)
+            rows += len(batch)
+        return rows, postings
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        jds, postings = self._rebuild(
+            JobDescription.objects.only('id', 'required_skills', 'preferred_skills').order_by('id'),
+            index_job_descriptions, batch_size
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {jds} job descriptions ({postings} postings)"))
+
+        resumes, postings = self._rebuild(
+            Resume.objects.only('id', 'extracted_skills').order_by('id'),
+            index_resumes, batch_size
+        )
+        self.stdout.write(self.style.SUCCESS(f"Indexed {resumes} resumes ({postings} postings)"))
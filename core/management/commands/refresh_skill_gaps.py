@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.models import SkillGapReport
+from core.reports import refresh_stale_skill_gap_reports
+
+
+class Command(BaseCommand):
+    help = "Recompute skill gap reports whose resume or job description changed since they were built"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--with-resources', action='store_true',
+            help="Fetch learning resources for newly missing skills (calls the Gemini API)"
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_stale_skill_gap_reports(options['batch_size'], options['with_resources'])
+        remaining = SkillGapReport.objects.filter(is_stale=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {refreshed} skill gap reports ({remaining} still stale)"
+        ))
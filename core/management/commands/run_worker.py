@@ -0,0 +1,67 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core.tasks import claim_task, run_task, worker_id
+
+
+class Command(BaseCommand):
+    help = "Process background tasks (resume parsing, offer analysis, ...) from the database queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help="Number of tasks run at the same time")
+        parser.add_argument('--visibility-timeout', type=int, default=None,
+                            help="Seconds before an unfinished task may be retried by another worker")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once the queue is empty instead of waiting for new tasks")
+
+    def _work(self, stop, visibility_timeout, poll_interval, burst, counts, lock):
+        worker = worker_id()
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                task = claim_task(worker, visibility_timeout)
+                if task is None:
+                    if burst:
+                        return
+                    stop.wait(poll_interval)
+                    continue
+                succeeded = run_task(task, visibility_timeout)
+                with lock:
+                    counts['succeeded' if succeeded else 'failed'] += 1
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+
+    def handle(self, *args, **options):
+        visibility_timeout = options['visibility_timeout'] or settings.TASK_VISIBILITY_TIMEOUT
+        stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            # Finish the tasks in hand, then exit
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        counts = {'succeeded': 0, 'failed': 0}
+        lock = threading.Lock()
+        concurrency = max(1, options['concurrency'])
+        args = (stop, visibility_timeout, options['poll_interval'], options['burst'], counts, lock)
+        self.stdout.write(f"Worker started with concurrency {concurrency}")
+        if concurrency == 1:
+            self._work(*args)
+        else:
+            threads = [threading.Thread(target=self._work, args=args, daemon=True) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker stopped: {counts['succeeded']} tasks succeeded, {counts['failed']} failed"
+        ))
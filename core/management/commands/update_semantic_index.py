@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.embeddings import update_semantic_index
+from core.relevance import TEXT_INDEX_KINDS
+
+
+class Command(BaseCommand):
+    help = "Embed new resumes and job descriptions and add them to the semantic ANN indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=TEXT_INDEX_KINDS, action='append',
+                            help="Index to update (default: all)")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--retrain', action='store_true',
+                            help="Re-cluster the inverted lists after updating")
+
+    def handle(self, *args, **options):
+        for kind in options['kind'] or TEXT_INDEX_KINDS:
+            started = time.monotonic()
+            added = update_semantic_index(kind, batch_size=options['batch_size'], retrain=options['retrain'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"{kind}: embedded {added} rows in {elapsed:.1f}s"))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.relevance import TEXT_INDEX_KINDS, update_text_index
+
+
+class Command(BaseCommand):
+    help = "Incrementally add new resumes and job descriptions to the BM25 text indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=TEXT_INDEX_KINDS, action='append',
+                            help="Index to update (default: all)")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--compact', action='store_true',
+                            help="Merge segments and drop deleted rows after updating")
+
+    def handle(self, *args, **options):
+        for kind in options['kind'] or TEXT_INDEX_KINDS:
+            started = time.monotonic()
+            added = update_text_index(kind, batch_size=options['batch_size'], compact=options['compact'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"{kind}: indexed {added} rows in {elapsed:.1f}s"))
@@ -0,0 +1,312 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Weights used when scoring a resume against a job description
+REQUIRED_SKILL_WEIGHT = 2.0
+PREFERRED_SKILL_WEIGHT = 1.0
+
+# Common spellings mapped to a single canonical skill name
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'es6': 'javascript',
+    'ts': 'typescript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'sklearn': 'scikit-learn',
+    'scikit learn': 'scikit-learn',
+    'tf': 'tensorflow',
+    'rest api': 'rest',
+    'restful': 'rest',
+    'restful api': 'rest',
+    'restful apis': 'rest',
+    'rest apis': 'rest',
+    'ci/cd': 'ci-cd',
+    'cicd': 'ci-cd',
+}
+
+
+def canonicalize_skill(skill: str) -> str:
+    """Normalize a skill string to its canonical name"""
+    if not isinstance(skill, str):
+        return ''
+    name = re.sub(r'\s+', ' ', skill.strip().lower())
+    name = name.strip(' .,;:')
+    return SKILL_ALIASES.get(name, name)
+
+
+def canonicalize_skills(skills: Iterable[str]) -> List[str]:
+    """Canonicalize a list of skills, dropping blanks and duplicates while keeping order"""
+    seen = set()
+    result = []
+    for skill in skills or []:
+        name = canonicalize_skill(skill)
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+class SkillVocabulary:
+    """Thread-safe mapping between canonical skill names and dense integer ids"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def id_for(self, skill: str) -> int:
+        """Return the id of a canonical skill, registering it if needed"""
+        skill_id = self._ids.get(skill)
+        if skill_id is not None:
+            return skill_id
+        with self._lock:
+            skill_id = self._ids.get(skill)
+            if skill_id is None:
+                skill_id = len(self._names)
+                self._names.append(skill)
+                self._ids[skill] = skill_id
+            return skill_id
+
+    def ids_for(self, skills: Iterable[str]) -> np.ndarray:
+        """Return ids for canonical skills as an integer array"""
+        return np.fromiter((self.id_for(s) for s in skills), dtype=np.int64)
+
+    def name_for(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def encode(self, skills: Iterable[str], size: Optional[int] = None) -> np.ndarray:
+        """Encode canonical skills as a boolean membership vector"""
+        ids = self.ids_for(skills)
+        vector = np.zeros(size or len(self), dtype=bool)
+        vector[ids] = True
+        return vector
+
+
+# Process-wide vocabulary shared by all scorers
+VOCABULARY = SkillVocabulary()
+
+
+def job_skill_weights(
+    required_skills: Iterable[str],
+    preferred_skills: Optional[Iterable[str]] = None
+) -> Dict[str, float]:
+    """Map canonical JD skills to their weight; required wins over preferred"""
+    weights = {}
+    for skill in canonicalize_skills(required_skills or []):
+        weights[skill] = REQUIRED_SKILL_WEIGHT
+    for skill in canonicalize_skills(preferred_skills or []):
+        weights.setdefault(skill, PREFERRED_SKILL_WEIGHT)
+    return weights
+
+
+def score_skill_vectors(
+    resume_vector: np.ndarray,
+    required_vector: np.ndarray,
+    preferred_vector: np.ndarray
+) -> float:
+    """Weighted share of JD skills covered by the resume, as a 0–100 score"""
+    preferred_vector = preferred_vector & ~required_vector
+    total = (REQUIRED_SKILL_WEIGHT * np.count_nonzero(required_vector)
+             + PREFERRED_SKILL_WEIGHT * np.count_nonzero(preferred_vector))
+    if not total:
+        return 0.0
+    matched = (REQUIRED_SKILL_WEIGHT * np.count_nonzero(resume_vector & required_vector)
+               + PREFERRED_SKILL_WEIGHT * np.count_nonzero(resume_vector & preferred_vector))
+    return round(float(100.0 * matched / total), 2)
+
+
+def score_skill_matrices(
+    resume_matrix: np.ndarray,
+    required_matrix: np.ndarray,
+    preferred_matrix: np.ndarray
+) -> np.ndarray:
+    """Score every resume row against every JD row in one pass.
+
+    Inputs are boolean matrices over the same vocabulary; the result is an
+    (n_resumes, n_jds) float32 matrix of 0–100 fit scores.
+    """
+    preferred_matrix = preferred_matrix & ~required_matrix
+    weights = (REQUIRED_SKILL_WEIGHT * required_matrix.astype(np.float32)
+               + PREFERRED_SKILL_WEIGHT * preferred_matrix.astype(np.float32))
+    totals = weights.sum(axis=1)
+    matched = resume_matrix.astype(np.float32) @ weights.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(totals > 0, 100.0 * matched / totals, 0.0)
+    return np.round(scores, 2).astype(np.float32)
+
+
+def calculate_job_fit_locally(
+    resume_skills: List[str],
+    required_skills: List[str],
+    preferred_skills: Optional[List[str]] = None
+) -> Tuple[float, List[str], List[str]]:
+    """Deterministically score job fit from skill overlap.
+
+    Returns ``(fit_score, matching_skills, missing_skills)``, the same shape as
+    ``calculate_job_fit_with_gemini``.
+    """
+    resume = canonicalize_skills(resume_skills)
+    weights = job_skill_weights(required_skills, preferred_skills)
+    required = [s for s, w in weights.items() if w == REQUIRED_SKILL_WEIGHT]
+    preferred = [s for s, w in weights.items() if w == PREFERRED_SKILL_WEIGHT]
+
+    # Register every skill first so all vectors share one size
+    VOCABULARY.ids_for(resume + required + preferred)
+    size = len(VOCABULARY)
+    resume_vector = VOCABULARY.encode(resume, size)
+    required_vector = VOCABULARY.encode(required, size)
+    preferred_vector = VOCABULARY.encode(preferred, size)
+
+    fit_score = score_skill_vectors(resume_vector, required_vector, preferred_vector)
+    matching_skills = [s for s in weights if resume_vector[VOCABULARY.id_for(s)]]
+    missing_skills = [s for s in weights if not resume_vector[VOCABULARY.id_for(s)]]
+    return fit_score, matching_skills, missing_skills
+
+
+def _job_fingerprint(
+    required_skills: List[str],
+    preferred_skills: List[str],
+    jd_text: str,
+    scorer: str
+):
+    """Partial fingerprint hash over the JD side, reusable across many resumes"""
+    payload = json.dumps([
+        sorted(canonicalize_skills(required_skills)),
+        sorted(canonicalize_skills(preferred_skills)),
+        jd_text or '',
+        scorer,
+    ], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8'))
+
+
+def _resume_fingerprint_part(resume_skills: Iterable[str]) -> bytes:
+    return json.dumps(sorted(resume_skills), separators=(',', ':')).encode('utf-8')
+
+
+def _finish_fingerprint(job_hash, resume_part: bytes) -> str:
+    digest = job_hash.copy()
+    digest.update(resume_part)
+    return digest.hexdigest()
+
+
+def skill_gap_fingerprint(
+    resume_skills: List[str],
+    required_skills: List[str],
+    preferred_skills: List[str],
+    jd_text: str,
+    scorer: str
+) -> str:
+    """Hash of everything a skill gap report depends on"""
+    job_hash = _job_fingerprint(required_skills, preferred_skills, jd_text, scorer)
+    return _finish_fingerprint(job_hash, _resume_fingerprint_part(canonicalize_skills(resume_skills)))
+
+
+class BatchFitScorer:
+    """Score many resumes against a fixed set of JDs with matrix operations.
+
+    ``jobs`` holds ``(jd_id, required_skills, preferred_skills, text)``;
+    ``extracted`` maps JD ids without skill lists to skills taken from their
+    text, mirroring ``calculate_job_fit``. Uses its own vocabulary made of the
+    JD skills only, since resume skills no JD asks for never affect a score.
+    Instances are picklable so they can be shipped to worker processes once.
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[Tuple[int, List[str], List[str], str]],
+        extracted: Optional[Dict[int, List[str]]] = None
+    ):
+        jobs = list(jobs)
+        extracted = extracted or {}
+        weights = [
+            job_skill_weights(required, preferred) if required or preferred
+            else job_skill_weights(extracted.get(jd_id, []))
+            for jd_id, required, preferred, _ in jobs
+        ]
+        self.vocabulary: Dict[str, int] = {}
+        for job_weights in weights:
+            for skill in job_weights:
+                self.vocabulary.setdefault(skill, len(self.vocabulary))
+
+        size = len(self.vocabulary)
+        self.jd_ids = [jd_id for jd_id, _, _, _ in jobs]
+        self.required = np.zeros((len(jobs), size), dtype=bool)
+        self.preferred = np.zeros((len(jobs), size), dtype=bool)
+        self.columns = []
+        self.names = []
+        for row, job_weights in enumerate(weights):
+            for skill, weight in job_weights.items():
+                matrix = self.required if weight == REQUIRED_SKILL_WEIGHT else self.preferred
+                matrix[row, self.vocabulary[skill]] = True
+            self.columns.append(np.array([self.vocabulary[s] for s in job_weights], dtype=np.int64))
+            self.names.append(np.array(list(job_weights), dtype=object))
+        self._job_inputs = [(required, preferred, text) for _, required, preferred, text in jobs]
+        self._job_hashes = None
+
+    def __getstate__(self):
+        # Hash objects cannot be pickled; they are rebuilt on first use
+        return {**self.__dict__, '_job_hashes': None}
+
+    def _fingerprint_prefixes(self):
+        if self._job_hashes is None:
+            self._job_hashes = [_job_fingerprint(*inputs, 'local') for inputs in self._job_inputs]
+        return self._job_hashes
+
+    def encode(self, resume_skills: Iterable[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=bool)
+        ids = [self.vocabulary[s] for s in resume_skills if s in self.vocabulary]
+        vector[ids] = True
+        return vector
+
+    def score(self, resumes: List[Tuple[int, List[str]]]) -> List[Tuple[int, int, float, List[str], List[str], str]]:
+        """Return ``(resume_id, jd_id, fit_score, matching, missing, fingerprint)`` for every pair"""
+        if not resumes:
+            return []
+        skills = [canonicalize_skills(resume_skills) for _, resume_skills in resumes]
+        resume_matrix = np.array([self.encode(s) for s in skills]).reshape(len(resumes), len(self.vocabulary))
+        scores = score_skill_matrices(resume_matrix, self.required, self.preferred)
+
+        prefixes = self._fingerprint_prefixes()
+        rows = []
+        for i, (resume_id, _) in enumerate(resumes):
+            vector = resume_matrix[i]
+            resume_part = _resume_fingerprint_part(skills[i])
+            for j, jd_id in enumerate(self.jd_ids):
+                has = vector[self.columns[j]]
+                rows.append((
+                    resume_id, jd_id, float(scores[i, j]),
+                    self.names[j][has].tolist(), self.names[j][~has].tolist(),
+                    _finish_fingerprint(prefixes[j], resume_part),
+                ))
+        return rows
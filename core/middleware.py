@@ -0,0 +1,12 @@
+from .llm_scheduler import INTERACTIVE, llm_priority
+
+
+class LLMPriorityMiddleware:
+    """Run LLM calls made while serving a request in the interactive class"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with llm_priority(INTERACTIVE):
+            return self.get_response(request)
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:04
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of core.matching's skill normalisation as of this migration, so
+# later changes to the app code cannot change what this migration writes
+REQUIRED_SKILL_WEIGHT = 2.0
+PREFERRED_SKILL_WEIGHT = 1.0
+
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'es6': 'javascript',
+    'ts': 'typescript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'sklearn': 'scikit-learn',
+    'scikit learn': 'scikit-learn',
+    'tf': 'tensorflow',
+    'rest api': 'rest',
+    'restful': 'rest',
+    'restful api': 'rest',
+    'restful apis': 'rest',
+    'rest apis': 'rest',
+    'ci/cd': 'ci-cd',
+    'cicd': 'ci-cd',
+}
+
+
+def canonicalize_skills(skills):
+    seen = set()
+    result = []
+    for skill in skills or []:
+        if not isinstance(skill, str):
+            continue
+        name = re.sub(r'\s+', ' ', skill.strip().lower()).strip(' .,;:')
+        name = SKILL_ALIASES.get(name, name)
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+def job_skill_weights(required_skills, preferred_skills):
+    weights = {}
+    for skill in canonicalize_skills(required_skills):
+        weights[skill] = REQUIRED_SKILL_WEIGHT
+    for skill in canonicalize_skills(preferred_skills):
+        weights.setdefault(skill, PREFERRED_SKILL_WEIGHT)
+    return weights
+
+
+def index_existing_job_descriptions(apps, schema_editor):
+    JobDescription = apps.get_model('core', 'JobDescription')
+    JobSkillPosting = apps.get_model('core', 'JobSkillPosting')
+    postings = []
+    for jd in JobDescription.objects.only('id', 'required_skills', 'preferred_skills').iterator():
+        weights = job_skill_weights(jd.required_skills, jd.preferred_skills)
+        total_weight = sum(weights.values())
+        postings.extend(
+            JobSkillPosting(skill=skill, job_description_id=jd.id, weight=weight, total_weight=total_weight)
+            for skill, weight in weights.items()
+        )
+    JobSkillPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSkillPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('weight', models.FloatField()),
+                ('total_weight', models.FloatField()),
+                ('job_description', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to='core.jobdescription')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'job_description'), name='unique_job_skill_posting')],
+            },
+        ),
+        migrations.RunPython(index_existing_job_descriptions, migrations.RunPython.noop),
+    ]
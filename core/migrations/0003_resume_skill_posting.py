@@ -0,0 +1,97 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:05
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of core.matching's skill normalisation as of this migration, so
+# later changes to the app code cannot change what this migration writes
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'es6': 'javascript',
+    'ts': 'typescript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'sklearn': 'scikit-learn',
+    'scikit learn': 'scikit-learn',
+    'tf': 'tensorflow',
+    'rest api': 'rest',
+    'restful': 'rest',
+    'restful api': 'rest',
+    'restful apis': 'rest',
+    'rest apis': 'rest',
+    'ci/cd': 'ci-cd',
+    'cicd': 'ci-cd',
+}
+
+
+def canonicalize_skills(skills):
+    seen = set()
+    result = []
+    for skill in skills or []:
+        if not isinstance(skill, str):
+            continue
+        name = re.sub(r'\s+', ' ', skill.strip().lower()).strip(' .,;:')
+        name = SKILL_ALIASES.get(name, name)
+        if name and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+def index_existing_resumes(apps, schema_editor):
+    Resume = apps.get_model('core', 'Resume')
+    ResumeSkillPosting = apps.get_model('core', 'ResumeSkillPosting')
+    postings = []
+    for resume in Resume.objects.only('id', 'extracted_skills').iterator():
+        postings.extend(
+            ResumeSkillPosting(skill=skill, resume_id=resume.id)
+            for skill in canonicalize_skills(resume.extracted_skills)
+        )
+    ResumeSkillPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_job_skill_posting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSkillPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_postings', to='core.resume')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'resume'), name='unique_resume_skill_posting')],
+            },
+        ),
+        migrations.RunPython(index_existing_resumes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:14
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_reports(apps, schema_editor):
+    # Keep only the newest report for each resume/JD pair
+    SkillGapReport = apps.get_model('core', 'SkillGapReport')
+    duplicates = (
+        SkillGapReport.objects.values('resume_id', 'job_description_id')
+        .annotate(count=Count('id'), latest=Max('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates.iterator():
+        SkillGapReport.objects.filter(
+            resume_id=row['resume_id'], job_description_id=row['job_description_id']
+        ).exclude(id=row['latest']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resume_skill_posting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillgapreport',
+            name='inputs_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='skillgapreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(remove_duplicate_reports, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='skillgapreport',
+            constraint=models.UniqueConstraint(fields=('resume', 'job_description'), name='unique_skill_gap_report'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_skill_gap_report_upsert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillgapreport',
+            name='is_stale',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_task_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority',
+            field=models.CharField(choices=[('interactive', 'Interactive'), ('standard', 'Standard'), ('bulk', 'Bulk')], default='standard', max_length=11),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_resume_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='partial_result',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='stage',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_task_progress_stage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coverletter',
+            index=models.Index(fields=['created_at', 'id'], name='cover_letter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobdescription',
+            index=models.Index(fields=['created_at', 'id'], name='jd_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerletter',
+            index=models.Index(fields=['created_at', 'id'], name='offer_letter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['created_at', 'id'], name='resume_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillgapreport',
+            index=models.Index(fields=['created_at', 'id'], name='skill_gap_report_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at', 'id'], name='task_created_idx'),
+        ),
+    ]
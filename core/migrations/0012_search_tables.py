@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from core.search import SEARCH_KINDS, create_search_tables, drop_search_tables, rebuild_search_index
+
+
+def _historical_models(apps):
+    return {kind: apps.get_model('core', spec.model_name) for kind, spec in SEARCH_KINDS.items()}
+
+
+def create_and_fill(apps, schema_editor):
+    models = _historical_models(apps)
+    create_search_tables(schema_editor.connection, models)
+    for kind, model in models.items():
+        rebuild_search_index(kind, model.objects.all(), conn=schema_editor.connection)
+
+
+def drop(apps, schema_editor):
+    drop_search_tables(schema_editor.connection, _historical_models(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_and_fill, drop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:23
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# (model, old text field, new document foreign key)
+TEXT_FIELDS = [
+    ('resume', 'parsed_text', 'parsed_text_document'),
+    ('jobdescription', 'text', 'text_document'),
+    ('offerletter', 'text', 'text_document'),
+]
+
+
+def _document_id(Document, text, cache):
+    sha256 = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    if sha256 not in cache:
+        raw = text.encode('utf-8')
+        data, compressed = raw, False
+        if len(raw) >= settings.DOCUMENT_COMPRESS_MIN_BYTES and len(zlib.compress(raw, 6)) < len(raw):
+            data, compressed = zlib.compress(raw, 6), True
+        document, _ = Document.objects.get_or_create(
+            sha256=sha256, defaults={'data': data, 'compressed': compressed, 'size': len(raw)}
+        )
+        cache[sha256] = document.id
+    return cache[sha256]
+
+
+def move_text_to_documents(apps, schema_editor):
+    Document = apps.get_model('core', 'Document')
+    cache = {}
+    for model_name, text_field, document_field in TEXT_FIELDS:
+        model = apps.get_model('core', model_name)
+        rows = model.objects.exclude(**{text_field: ''}).only('id', text_field)
+        batch = []
+        for row in rows.iterator(chunk_size=500):
+            setattr(row, f"{document_field}_id", _document_id(Document, getattr(row, text_field), cache))
+            batch.append(row)
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, [document_field])
+                batch = []
+        model.objects.bulk_update(batch, [document_field])
+
+
+def move_text_back(apps, schema_editor):
+    for model_name, text_field, document_field in TEXT_FIELDS:
+        model = apps.get_model('core', model_name)
+        rows = model.objects.filter(**{f"{document_field}__isnull": False}).select_related(document_field)
+        batch = []
+        for row in rows.iterator(chunk_size=500):
+            document = getattr(row, document_field)
+            data = bytes(document.data)
+            setattr(row, text_field, (zlib.decompress(data) if document.compressed else data).decode('utf-8'))
+            batch.append(row)
+        model.objects.bulk_update(batch, [text_field], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_search_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('compressed', models.BooleanField(default=False)),
+                ('size', models.PositiveIntegerField(help_text='Uncompressed size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobdescription',
+            name='text_document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='job_descriptions', to='core.document'),
+        ),
+        migrations.AddField(
+            model_name='offerletter',
+            name='text_document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='offer_letters', to='core.document'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='parsed_text_document',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='resumes', to='core.document'),
+        ),
+        migrations.RunPython(move_text_to_documents, move_text_back),
+        migrations.RemoveField(
+            model_name='jobdescription',
+            name='text',
+        ),
+        migrations.RemoveField(
+            model_name='offerletter',
+            name='text',
+        ),
+        migrations.RemoveField(
+            model_name='resume',
+            name='parsed_text',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_document_storage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coverletter',
+            index=models.Index(fields=['resume', 'job_description'], name='cover_letter_pair_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_cover_letter_pair_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillgapreport',
+            name='resources_complete',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_skill_gap_report_resources_complete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobdescription',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
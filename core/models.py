@@ -1,7 +1,13 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+from typing import Dict, Iterable
+import copy
+import hashlib
 import uuid
 import os
+import zlib
 
 def resume_file_path(instance, filename):
     """Generate file path for resume uploads"""
@@ -15,32 +21,202 @@ def offer_letter_file_path(instance, filename):
     filename = f"{uuid.uuid4()}.{ext}"
     return os.path.join('offer_letters', filename)
 
-class Resume(models.Model):
+class TrackedFieldsMixin:
+    """Remember the loaded values of ``tracked_fields`` so saves can tell what changed"""
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: copy.deepcopy(value)
+            for name, value in zip(field_names, values)
+            if name in cls.tracked_fields and value is not models.DEFERRED
+        }
+        return instance
+
+    def changed_fields(self):
+        """Tracked fields whose value differs from the one loaded from the database"""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return set(self.tracked_fields)
+        return {
+            name for name in self.tracked_fields
+            if name not in loaded or loaded[name] != getattr(self, name)
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            name: copy.deepcopy(getattr(self, name)) for name in self.tracked_fields
+        }
+
+def document_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class DocumentManager(models.Manager):
+    def store(self, texts: Iterable[str]) -> Dict[str, int]:
+        """Document ids for the given texts keyed by hash, creating the missing ones"""
+        by_hash = {document_hash(text): text for text in texts if text}
+        if not by_hash:
+            return {}
+        ids = dict(self.filter(sha256__in=list(by_hash)).values_list('sha256', 'id'))
+        missing = [self.model.from_text(text, sha) for sha, text in by_hash.items() if sha not in ids]
+        if missing:
+            # Another writer may store the same text first; the refetch picks up its row
+            self.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+            ids.update(self.filter(sha256__in=[doc.sha256 for doc in missing]).values_list('sha256', 'id'))
+        return ids
+
+class Document(models.Model):
+    """Content-addressed document text, shared by every row with the same text.
+
+    Bodies over ``DOCUMENT_COMPRESS_MIN_BYTES`` are stored zlib-compressed
+    when that makes them smaller.
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = DocumentManager()
+
+    def __str__(self):
+        return f"Document {self.sha256[:12]} ({self.size} bytes)"
+
+    @classmethod
+    def from_text(cls, text: str, sha256: str = None) -> 'Document':
+        raw = text.encode('utf-8')
+        data, compressed = raw, False
+        if len(raw) >= settings.DOCUMENT_COMPRESS_MIN_BYTES:
+            packed = zlib.compress(raw, 6)
+            if len(packed) < len(raw):
+                data, compressed = packed, True
+        return cls(sha256=sha256 or document_hash(text), data=data, compressed=compressed, size=len(raw))
+
+    @cached_property
+    def text(self) -> str:
+        data = bytes(self.data)
+        return (zlib.decompress(data) if self.compressed else data).decode('utf-8')
+
+def document_text(field_name):
+    """Read/write the text of a ``Document`` foreign key; the body is only fetched when read"""
+    def fget(self):
+        texts = self.__dict__.setdefault('_document_texts', {})
+        if field_name not in texts:
+            document = getattr(self, field_name)
+            texts[field_name] = document.text if document is not None else ''
+        return texts[field_name]
+
+    def fset(self, value):
+        self.__dict__.setdefault('_document_texts', {})[field_name] = value or ''
+        self.__dict__.setdefault('_unsaved_documents', set()).add(field_name)
+
+    return property(fget, fset)
+
+class DocumentQuerySet(models.QuerySet):
+    def with_text(self):
+        """Join the document bodies, for code that reads the text of every row"""
+        return self.select_related(*self.model.document_fields.values())
+
+class DocumentTextMixin:
+    """Keep large text in ``Document`` rows; ``document_fields`` maps each text attribute to its foreign key"""
+    document_fields = {}
+
+    @classmethod
+    def store_documents(cls, instances):
+        """Point the foreign keys at Documents for texts set since the last save (``bulk_create`` skips ``save``)"""
+        pending = [
+            (obj, field_name, obj._document_texts[field_name])
+            for obj in instances
+            for field_name in obj.__dict__.get('_unsaved_documents', ())
+        ]
+        if not pending:
+            return
+        ids = Document.objects.store(text for _, _, text in pending)
+        for obj, field_name, text in pending:
+            setattr(obj, f"{field_name}_id", ids[document_hash(text)] if text else None)
+            # Setting the id drops the cached Document, so keep the text we already have
+            obj._document_texts[field_name] = text
+            obj._unsaved_documents.discard(field_name)
+
+    def save(self, *args, **kwargs):
+        type(self).store_documents([self])
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = [
+                f"{self.document_fields[name]}_id" if name in self.document_fields else name
+                for name in kwargs['update_fields']
+            ]
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_document_texts', None)
+        self.__dict__.pop('_unsaved_documents', None)
+        super().refresh_from_db(*args, **kwargs)
+
+class Resume(DocumentTextMixin, TrackedFieldsMixin, models.Model):
     """Model for storing resume information"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     file = models.FileField(upload_to=resume_file_path, null=True, blank=True)
-    parsed_text = models.TextField(blank=True)
+    parsed_text_document = models.ForeignKey(
+        Document, on_delete=models.PROTECT, null=True, blank=True, related_name='resumes'
+    )
     extracted_skills = models.JSONField(default=list, blank=True)
     education = models.JSONField(default=list, blank=True)
     experience = models.JSONField(default=list, blank=True)
     name = models.CharField(max_length=255, blank=True)
     email = models.EmailField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
+    # SHA-256 of the uploaded file, used to skip duplicates on bulk import
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    parsed_text = document_text('parsed_text_document')
+    document_fields = {'parsed_text': 'parsed_text_document'}
+    tracked_fields = ('extracted_skills',)
+
+    objects = DocumentQuerySet.as_manager()
+
+    class Meta:
+        # Newest first, matching the API's cursor pagination
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='resume_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='resume_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Resume - {self.name or 'Unknown'}"
 
-class JobDescription(models.Model):
+class JobDescription(DocumentTextMixin, TrackedFieldsMixin, models.Model):
     """Model for storing job descriptions"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255, blank=True)
-    text = models.TextField()
+    text_document = models.ForeignKey(
+        Document, on_delete=models.PROTECT, null=True, blank=True, related_name='job_descriptions'
+    )
     required_skills = models.JSONField(default=list, blank=True)
     preferred_skills = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    text = document_text('text_document')
+    document_fields = {'text': 'text_document'}
+    # The text matters too: skills are extracted from it when both lists are empty.
+    # Documents are content-addressed, so the id only changes when the text does.
+    tracked_fields = ('text_document_id', 'required_skills', 'preferred_skills')
+
+    objects = DocumentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='jd_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='jd_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -52,14 +228,24 @@ class CoverLetter(models.Model):
     generated_text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='cover_letter_created_idx'),
+            # Finding the latest letter for a pair (compact_data keeps only that one)
+            models.Index(fields=['resume', 'job_description'], name='cover_letter_pair_idx'),
+        ]
+
     def __str__(self):
         return f"Cover Letter for {self.job_description.title}"
 
-class OfferLetter(models.Model):
+class OfferLetter(DocumentTextMixin, models.Model):
     """Model for storing offer letter analysis"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     file = models.FileField(upload_to=offer_letter_file_path, null=True, blank=True)
-    text = models.TextField(blank=True)
+    text_document = models.ForeignKey(
+        Document, on_delete=models.PROTECT, null=True, blank=True, related_name='offer_letters'
+    )
     explanation = models.TextField(blank=True)
     risk_flags = models.JSONField(default=list, blank=True)
     ctc = models.CharField(max_length=100, blank=True)
@@ -67,6 +253,18 @@ class OfferLetter(models.Model):
     notice_period = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    text = document_text('text_document')
+    document_fields = {'text': 'text_document'}
+
+    objects = DocumentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='offer_letter_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='offer_letter_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Offer Letter Analysis - {self.created_at.strftime('%Y-%m-%d')}"
 
@@ -78,8 +276,102 @@ class SkillGapReport(models.Model):
     missing_skills = models.JSONField(default=list, blank=True)
     matching_skills = models.JSONField(default=list, blank=True)
     suggested_resources = models.JSONField(default=list, blank=True)
+    # False until learning resources were fetched for every missing skill (batch rows skip them)
+    resources_complete = models.BooleanField(default=False)
+    inputs_fingerprint = models.CharField(max_length=64, blank=True)
+    is_stale = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        # The unique constraint doubles as the (resume, job_description) lookup index
+        constraints = [
+            models.UniqueConstraint(fields=['resume', 'job_description'], name='unique_skill_gap_report'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='skill_gap_report_created_idx'),
+        ]
 
     def __str__(self):
         return f"Skill Gap Report - {self.fit_score}% fit"
 
+
+class JobSkillPosting(models.Model):
+    """Inverted index entry mapping a canonical skill to a job description"""
+    skill = models.CharField(max_length=255)
+    job_description = models.ForeignKey(JobDescription, on_delete=models.CASCADE, related_name='skill_postings')
+    weight = models.FloatField()
+    total_weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'job_description'], name='unique_job_skill_posting'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} -> {self.job_description_id} ({self.weight})"
+
+class ResumeSkillPosting(models.Model):
+    """Inverted index entry mapping a canonical skill to a resume"""
+    skill = models.CharField(max_length=255)
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='skill_postings')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'resume'], name='unique_resume_skill_posting'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill} -> {self.resume_id}"
+
+
+class Task(models.Model):
+    """Background job stored in the database and run by ``manage.py run_worker``"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    # LLM priority classes (see core.llm_scheduler)
+    PRIORITY_CHOICES = [
+        ('interactive', 'Interactive'),
+        ('standard', 'Standard'),
+        ('bulk', 'Bulk'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.CharField(max_length=11, choices=PRIORITY_CHOICES, default='standard')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    stage = models.CharField(max_length=30, blank=True)
+    partial_result = models.JSONField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_status_run_after_idx'),
+            models.Index(fields=['created_at', 'id'], name='task_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='task_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
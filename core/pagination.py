@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest-first cursor pages over ``(created_at, id)``.
+
+    The cursor is a position rather than an offset, so every page is an
+    index range scan no matter how deep the client goes. Clients may ask for
+    ``?page_size=`` up to ``API_MAX_PAGE_SIZE``.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """Cursor pages for models without a creation timestamp"""
+    ordering = '-id'
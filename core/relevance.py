@@ -0,0 +1,425 @@
+import json
+import math
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers him his how i if in into is it its itself just me more
+most my no nor not now of off on once only or other our ours out over own same she should so
+some such than that the their theirs them then there these they this those through to too
+under until up very was we were what when where which while who whom why will with would you
+your yours will shall may must etc e.g i.e
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words removed (keeps c++, c#, node.js)"""
+    if not text:
+        return []
+    tokens = (t.rstrip('.') for t in TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t and t not in STOP_WORDS]
+
+
+class _Segment:
+    """Immutable block of documents stored as a CSC (documents x terms) tf matrix"""
+
+    def __init__(self, name, doc_ids, matrix, lengths, live):
+        self.name = name
+        self.doc_ids = doc_ids
+        self.matrix = matrix
+        self.lengths = lengths
+        self.live = live
+
+    @property
+    def n_terms(self):
+        return self.matrix.shape[1]
+
+
+class BM25Index:
+    """Incremental BM25 index over integer-keyed documents.
+
+    New documents are appended as immutable segments; re-adding a document id
+    tombstones its previous row. Segments are saved as plain ``.npy`` arrays so
+    other processes can memory-map them with ``BM25Index.load``. Document
+    frequencies include tombstoned rows until ``compact`` is run, as in most
+    segment-based search engines.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.terms: Dict[str, int] = {}
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.segments: List[_Segment] = []
+        self.meta: Dict = {}
+        self._locations: Dict[int, Tuple[int, int]] = {}
+        self._total_length = 0.0
+        self._dirty_segments = set()
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._locations
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self._total_length / len(self) if len(self) else 0.0
+
+    def _term_ids(self, tokens: Iterable[str], grow: bool = False) -> List[int]:
+        ids = []
+        for token in tokens:
+            term_id = self.terms.get(token)
+            if term_id is None and grow:
+                term_id = self.terms[token] = len(self.terms)
+            if term_id is not None:
+                ids.append(term_id)
+        return ids
+
+    def _remove(self, doc_id: int):
+        seg_index, row = self._locations.pop(doc_id)
+        segment = self.segments[seg_index]
+        segment.live[row] = False
+        self._total_length -= float(segment.lengths[row])
+        self._dirty_segments.add(segment.name)
+
+    def remove_documents(self, doc_ids: Iterable[int]):
+        """Tombstone documents so they no longer appear in results"""
+        for doc_id in doc_ids:
+            if doc_id in self._locations:
+                self._remove(doc_id)
+
+    def add_documents(self, documents: Iterable[Tuple[int, str]]) -> int:
+        """Add (or replace) documents as a new segment; returns the number added"""
+        doc_ids, rows, cols, values, lengths = [], [], [], [], []
+        latest = {}
+        for doc_id, text in documents:
+            latest[int(doc_id)] = text
+        for row, (doc_id, text) in enumerate(latest.items()):
+            counts = Counter(self._term_ids(tokenize(text), grow=True))
+            doc_ids.append(doc_id)
+            lengths.append(sum(counts.values()))
+            rows.extend([row] * len(counts))
+            cols.extend(counts.keys())
+            values.extend(counts.values())
+        if not doc_ids:
+            return 0
+
+        self.remove_documents(doc_ids)
+        n_terms = len(self.terms)
+        matrix = sparse.csc_matrix(
+            (np.asarray(values, dtype=np.float32), (np.asarray(rows), np.asarray(cols))),
+            shape=(len(doc_ids), n_terms), dtype=np.float32
+        )
+
+        segment = _Segment(
+            name=uuid.uuid4().hex[:12],
+            doc_ids=np.asarray(doc_ids, dtype=np.int64),
+            matrix=matrix,
+            lengths=np.asarray(lengths, dtype=np.float32),
+            live=np.ones(len(doc_ids), dtype=bool),
+        )
+        seg_index = len(self.segments)
+        self.segments.append(segment)
+        self._dirty_segments.add(segment.name)
+        for row, doc_id in enumerate(doc_ids):
+            self._locations[doc_id] = (seg_index, row)
+        self._total_length += float(segment.lengths.sum())
+
+        doc_freq = np.zeros(n_terms, dtype=np.int64)
+        doc_freq[:len(self.doc_freq)] = self.doc_freq
+        doc_freq += np.diff(matrix.indptr)
+        self.doc_freq = doc_freq
+        return len(doc_ids)
+
+    def idf(self, term_ids: List[int]) -> np.ndarray:
+        df = self.doc_freq[term_ids].astype(np.float64)
+        n = max(len(self), 1)
+        return np.log1p((n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 10, doc_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` ``(doc_id, score)`` pairs ranked by BM25.
+
+        With ``doc_ids`` only those documents are ranked, so a caller's own
+        documents are not crowded out of the top k by everyone else's.
+        """
+        query_terms = Counter(self._term_ids(tokenize(query)))
+        if not query_terms or not len(self):
+            return []
+        allowed = None if doc_ids is None else np.fromiter(doc_ids, dtype=np.int64)
+        term_ids = list(query_terms)
+        term_weights = self.idf(term_ids) * np.asarray([query_terms[t] for t in term_ids])
+        avgdl = self.avg_doc_length or 1.0
+
+        all_ids, all_scores = [], []
+        for segment in self.segments:
+            usable = [i for i, t in enumerate(term_ids) if t < segment.n_terms]
+            if not usable or not segment.live.any():
+                continue
+            sub = segment.matrix[:, [term_ids[i] for i in usable]].tocoo()
+            if not sub.nnz:
+                continue
+            tf = sub.data.astype(np.float64)
+            norm = self.k1 * (1 - self.b + self.b * segment.lengths[sub.row] / avgdl)
+            contrib = term_weights[usable][sub.col] * tf * (self.k1 + 1) / (tf + norm)
+            scores = np.bincount(sub.row, weights=contrib, minlength=len(segment.doc_ids))
+            mask = (scores > 0) & segment.live
+            if allowed is not None:
+                mask &= np.isin(segment.doc_ids, allowed)
+            hits = np.flatnonzero(mask)
+            all_ids.append(segment.doc_ids[hits])
+            all_scores.append(scores[hits])
+
+        if not all_ids:
+            return []
+        ids = np.concatenate(all_ids)
+        scores = np.concatenate(all_scores)
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[i]), round(float(scores[i]), 4)) for i in order]
+
+    def text_similarity(self, text_a: str, text_b: str) -> float:
+        """TF-IDF cosine similarity (0–1) of two texts using this index's IDF.
+
+        Terms the index has never seen get the maximum IDF.
+        """
+        counts_a, counts_b = Counter(tokenize(text_a)), Counter(tokenize(text_b))
+        if not counts_a or not counts_b:
+            return 0.0
+        n = max(len(self), 1)
+
+        def weights(counts):
+            terms = list(counts)
+            df = np.asarray([
+                self.doc_freq[self.terms[t]] if t in self.terms else 0 for t in terms
+            ], dtype=np.float64)
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            tf = 1 + np.log(np.asarray([counts[t] for t in terms], dtype=np.float64))
+            return dict(zip(terms, tf * idf))
+
+        wa, wb = weights(counts_a), weights(counts_b)
+        dot = sum(wa[t] * wb[t] for t in wa if t in wb)
+        norm = math.sqrt(sum(v * v for v in wa.values())) * math.sqrt(sum(v * v for v in wb.values()))
+        return round(float(dot / norm), 4) if norm else 0.0
+
+    def compact(self):
+        """Merge all segments into one, dropping tombstoned rows and stale frequencies"""
+        if not self.segments:
+            return
+        n_terms = len(self.terms)
+        blocks, doc_ids, lengths = [], [], []
+        for segment in self.segments:
+            keep = np.flatnonzero(segment.live)
+            matrix = segment.matrix[keep]
+            matrix.resize((len(keep), n_terms))
+            blocks.append(matrix)
+            doc_ids.append(segment.doc_ids[keep])
+            lengths.append(segment.lengths[keep])
+        matrix = sparse.vstack(blocks, format='csc', dtype=np.float32)
+
+        segment = _Segment(
+            name=uuid.uuid4().hex[:12],
+            doc_ids=np.concatenate(doc_ids),
+            matrix=matrix,
+            lengths=np.concatenate(lengths),
+            live=np.ones(matrix.shape[0], dtype=bool),
+        )
+        self.segments = [segment]
+        self._dirty_segments = {segment.name}
+        self._locations = {int(doc_id): (0, row) for row, doc_id in enumerate(segment.doc_ids)}
+        self._total_length = float(segment.lengths.sum())
+        self.doc_freq = np.diff(matrix.indptr).astype(np.int64)
+
+    def save(self, path: str):
+        """Write changed segments and an atomically replaced manifest"""
+        os.makedirs(path, exist_ok=True)
+        for segment in self.segments:
+            if segment.name not in self._dirty_segments:
+                continue
+            prefix = os.path.join(path, segment.name)
+            arrays = {
+                'doc_ids': segment.doc_ids,
+                'indptr': segment.matrix.indptr,
+                'indices': segment.matrix.indices,
+                'data': segment.matrix.data,
+                'lengths': segment.lengths,
+            }
+            for key, array in arrays.items():
+                if not os.path.exists(f"{prefix}.{key}.npy"):
+                    np.save(f"{prefix}.{key}.npy", np.asarray(array))
+            # Live masks change with tombstones, so they are replaced atomically
+            np.save(f"{prefix}.live.tmp.npy", segment.live)
+            os.replace(f"{prefix}.live.tmp.npy", f"{prefix}.live.npy")
+        np.save(os.path.join(path, 'doc_freq.tmp.npy'), self.doc_freq)
+        os.replace(os.path.join(path, 'doc_freq.tmp.npy'), os.path.join(path, 'doc_freq.npy'))
+
+        terms = sorted(self.terms, key=self.terms.get)
+        manifest = {
+            'k1': self.k1,
+            'b': self.b,
+            'terms': terms,
+            'segments': [
+                {'name': s.name, 'n_docs': len(s.doc_ids), 'n_terms': s.n_terms}
+                for s in self.segments
+            ],
+            'meta': self.meta,
+        }
+        tmp = os.path.join(path, self.MANIFEST + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(path, self.MANIFEST))
+        self._dirty_segments.clear()
+
+        # Drop files of segments merged away by compact()
+        live_names = {s.name for s in self.segments}
+        for filename in os.listdir(path):
+            name = filename.split('.', 1)[0]
+            if filename.endswith('.npy') and name not in live_names and name != 'doc_freq':
+                os.remove(os.path.join(path, filename))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'BM25Index':
+        """Load an index saved with ``save``; large arrays are memory-mapped by default"""
+        with open(os.path.join(path, cls.MANIFEST)) as f:
+            manifest = json.load(f)
+        mode = 'r' if mmap else None
+        index = cls(k1=manifest['k1'], b=manifest['b'])
+        index.terms = {term: i for i, term in enumerate(manifest['terms'])}
+        index.meta = manifest.get('meta', {})
+        index.doc_freq = np.array(np.load(os.path.join(path, 'doc_freq.npy')), dtype=np.int64)
+        for seg_index, info in enumerate(manifest['segments']):
+            prefix = os.path.join(path, info['name'])
+            doc_ids = np.load(f"{prefix}.doc_ids.npy", mmap_mode=mode)
+            matrix = sparse.csc_matrix(
+                (
+                    np.load(f"{prefix}.data.npy", mmap_mode=mode),
+                    np.load(f"{prefix}.indices.npy", mmap_mode=mode),
+                    np.load(f"{prefix}.indptr.npy", mmap_mode=mode),
+                ),
+                shape=(info['n_docs'], info['n_terms']), copy=False
+            )
+            segment = _Segment(
+                name=info['name'],
+                doc_ids=doc_ids,
+                matrix=matrix,
+                lengths=np.load(f"{prefix}.lengths.npy", mmap_mode=mode),
+                live=np.array(np.load(f"{prefix}.live.npy")),
+            )
+            index.segments.append(segment)
+            for row in np.flatnonzero(segment.live):
+                index._locations[int(doc_ids[row])] = (seg_index, int(row))
+            index._total_length += float(segment.lengths[segment.live].sum())
+        return index
+
+
+# Model rows that get a text index, keyed by index name
+TEXT_INDEX_KINDS = ('resume', 'job_description')
+
+_indexes: Dict[str, Tuple[float, BM25Index]] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_path(kind: str) -> str:
+    from django.conf import settings
+    return os.path.join(str(settings.TEXT_INDEX_DIR), kind)
+
+
+def document_rows(kind: str, since: Dict):
+    """Yield (id, updated_at, text) for rows added or updated since the watermark.
+
+    Re-yielded rows replace their old entry, which is tombstoned by the index.
+    Without an ``updated_at`` watermark (a new index, or one written before
+    rows were stamped) every row is read once.
+    """
+    from django.db.models import Q
+    from .models import JobDescription, Resume
+
+    if kind == 'resume':
+        queryset = Resume.objects.with_text().only('id', 'parsed_text_document', 'extracted_skills', 'updated_at')
+    elif kind == 'job_description':
+        queryset = JobDescription.objects.with_text().only('id', 'title', 'company', 'text_document', 'updated_at')
+    else:
+        raise ValueError(f"Unknown text index kind: {kind}")
+    if since.get('updated_at'):
+        queryset = queryset.filter(Q(updated_at__gt=since['updated_at']) | Q(id__gt=since.get('max_id', 0)))
+
+    for obj in queryset.order_by('id').iterator(chunk_size=2000):
+        if kind == 'resume':
+            yield obj.id, obj.updated_at, f"{obj.parsed_text} {' '.join(map(str, obj.extracted_skills or []))}"
+        else:
+            yield obj.id, obj.updated_at, f"{obj.title} {obj.company} {obj.text}"
+
+
+def update_text_index(kind: str, batch_size: int = 5000, compact: bool = False) -> int:
+    """Add new (and changed) rows of ``kind`` to its on-disk index; returns rows indexed"""
+    path = _index_path(kind)
+    try:
+        index = BM25Index.load(path, mmap=False)
+    except FileNotFoundError:
+        index = BM25Index()
+
+    since = dict(index.meta)
+    added, batch = 0, []
+    max_id, max_updated = since.get('max_id', 0), since.get('updated_at')
+    for doc_id, updated_at, text in document_rows(kind, since):
+        batch.append((doc_id, text))
+        max_id = max(max_id, doc_id)
+        if updated_at is not None:
+            stamp = updated_at.isoformat()
+            max_updated = max(max_updated or stamp, stamp)
+        if len(batch) >= batch_size:
+            added += index.add_documents(batch)
+            batch = []
+    if batch:
+        added += index.add_documents(batch)
+
+    if compact:
+        from .models import JobDescription, Resume
+        model = Resume if kind == 'resume' else JobDescription
+        existing = set(model.objects.order_by().values_list('id', flat=True))
+        index.remove_documents([doc_id for doc_id in list(index._locations) if doc_id not in existing])
+        index.compact()
+    index.meta = {'max_id': max_id, 'updated_at': max_updated}
+    if added or compact or not os.path.exists(os.path.join(path, BM25Index.MANIFEST)):
+        index.save(path)
+    return added
+
+
+def get_text_index(kind: str) -> BM25Index:
+    """Return the process-wide (memory-mapped) index for ``kind``, reloading it after updates"""
+    manifest = os.path.join(_index_path(kind), BM25Index.MANIFEST)
+    try:
+        mtime = os.path.getmtime(manifest)
+    except OSError:
+        return BM25Index()
+    with _indexes_lock:
+        cached = _indexes.get(manifest)
+        if cached is None or cached[0] != mtime:
+            _indexes[manifest] = (mtime, BM25Index.load(os.path.dirname(manifest)))
+        return _indexes[manifest][1]
+
+
+def text_relevance(resume_text: str, jd_text: str) -> float:
+    """Text similarity of a resume and a JD as a 0–100 score, using JD corpus statistics"""
+    return round(100.0 * get_text_index('job_description').text_similarity(resume_text, jd_text), 2)
+
+
+def search_documents(kind: str, query: str, top_k: int = 10,
+                     doc_ids: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+    """Full-text search over the on-disk index for ``kind``, optionally limited to ``doc_ids``"""
+    return get_text_index(kind).search(query, top_k=top_k, doc_ids=doc_ids)
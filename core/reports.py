@@ -0,0 +1,148 @@
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .llm_scheduler import BULK, llm_priority
+from .matching import canonicalize_skill, skill_gap_fingerprint
+from .models import JobDescription, Resume, SkillGapReport
+from .utils import calculate_job_fit, get_learning_resources_with_gemini
+
+
+def skill_gap_inputs_fingerprint(resume: Resume, jd: JobDescription, scorer: Optional[str] = None) -> str:
+    """Fingerprint of the resume and JD inputs a report was computed from"""
+    scorer = scorer or getattr(settings, 'JOB_FIT_SCORER', 'local')
+    return skill_gap_fingerprint(
+        resume.extracted_skills, jd.required_skills, jd.preferred_skills, jd.text, scorer
+    )
+
+
+def upsert_skill_gap_report(
+    resume: Resume,
+    jd: JobDescription,
+    scorer: Optional[str] = None
+) -> Tuple[SkillGapReport, bool]:
+    """Return the report for a resume/JD pair, recomputing it only when its inputs changed.
+
+    Returns ``(report, computed)`` where ``computed`` is False for a cache hit.
+    Rows scored in bulk without learning resources are recomputed, not reused.
+    """
+    fingerprint = skill_gap_inputs_fingerprint(resume, jd, scorer)
+    report = SkillGapReport.objects.filter(resume=resume, job_description=jd).first()
+    if report is not None and report.inputs_fingerprint == fingerprint and report.resources_complete:
+        # Reuse the caller's instances so serializing the report needs no extra queries
+        report.resume, report.job_description = resume, jd
+        return report, False
+
+    fit_score, matching_skills, missing_skills = calculate_job_fit(
+        resume.extracted_skills,
+        jd_text=jd.text,
+        required_skills=jd.required_skills,
+        preferred_skills=jd.preferred_skills,
+        scorer=scorer
+    )
+    suggested_resources = get_learning_resources_with_gemini(missing_skills)
+
+    report, _ = SkillGapReport.objects.update_or_create(
+        resume=resume,
+        job_description=jd,
+        defaults={
+            'fit_score': fit_score,
+            'missing_skills': missing_skills,
+            'matching_skills': matching_skills,
+            'suggested_resources': suggested_resources,
+            'resources_complete': True,
+            'inputs_fingerprint': fingerprint,
+            'is_stale': False,
+        }
+    )
+    report.resume, report.job_description = resume, jd
+    return report, True
+
+
+def refresh_stale_skill_gap_reports(batch_size: int = 500, with_resources: bool = False) -> int:
+    """Recompute stale reports with the local scorer and return how many were refreshed.
+
+    Learning resources are kept for skills that are still missing; resources for
+    newly missing skills are only fetched when ``with_resources`` is set.
+    """
+    refreshed = 0
+    last_id = 0
+    while True:
+        batch = list(
+            SkillGapReport.objects.filter(is_stale=True, id__gt=last_id)
+            # jd.text lives in its Document row; join it so scoring does not query per report
+            .select_related('resume', 'job_description__text_document')
+            .order_by('id')[:batch_size]
+        )
+        if not batch:
+            return refreshed
+        last_id = batch[-1].id
+
+        for report in batch:
+            resume, jd = report.resume, report.job_description
+            fit_score, matching_skills, missing_skills = calculate_job_fit(
+                resume.extracted_skills,
+                jd_text=jd.text,
+                required_skills=jd.required_skills,
+                preferred_skills=jd.preferred_skills,
+                scorer='local'
+            )
+            resources = [
+                entry for entry in report.suggested_resources or []
+                if isinstance(entry, dict) and canonicalize_skill(entry.get('skill')) in missing_skills
+            ]
+            covered = {canonicalize_skill(entry['skill']) for entry in resources}
+            new_skills = [skill for skill in missing_skills if skill not in covered]
+            if with_resources and new_skills:
+                with llm_priority(BULK):
+                    resources += get_learning_resources_with_gemini(new_skills)
+
+            # Skip the write if the resume or JD was edited again meanwhile
+            refreshed += SkillGapReport.objects.filter(
+                id=report.id, updated_at=report.updated_at
+            ).update(
+                fit_score=fit_score,
+                missing_skills=missing_skills,
+                matching_skills=matching_skills,
+                suggested_resources=resources,
+                resources_complete=with_resources or not new_skills,
+                inputs_fingerprint=skill_gap_inputs_fingerprint(resume, jd, 'local'),
+                is_stale=False,
+                updated_at=timezone.now()
+            )
+
+
+def save_batch_fit_rows(rows: List[Tuple[int, int, float, List[str], List[str], str]], batch_size: int = 2000) -> int:
+    """Upsert ``BatchFitScorer.score`` rows as skill gap reports.
+
+    Each batch is its own transaction so concurrent writers only hold the
+    database briefly. Existing learning resources are left alone but marked
+    incomplete, so the match endpoint fetches them for the new missing skills.
+    """
+    now = timezone.now()
+    for start in range(0, len(rows), batch_size):
+        SkillGapReport.objects.bulk_create(
+            [
+                SkillGapReport(
+                    resume_id=resume_id,
+                    job_description_id=jd_id,
+                    fit_score=fit_score,
+                    matching_skills=matching_skills,
+                    missing_skills=missing_skills,
+                    inputs_fingerprint=fingerprint,
+                    resources_complete=False,
+                    is_stale=False,
+                    updated_at=now,
+                )
+                for resume_id, jd_id, fit_score, matching_skills, missing_skills, fingerprint
+                in rows[start:start + batch_size]
+            ],
+            update_conflicts=True,
+            unique_fields=['resume', 'job_description'],
+            update_fields=[
+                'fit_score', 'matching_skills', 'missing_skills', 'inputs_fingerprint', 'resources_complete',
+                'is_stale', 'updated_at'
+            ],
+        )
+    return len(rows)
@@ -0,0 +1,175 @@
+"""Retention for generated rows and uploaded files.
+
+Old rows are written to gzipped JSONL archives before they are deleted, in
+id order and in batches, so an interrupted run loses nothing and can simply
+be started again. Media files are reconciled against the FileFields that
+point at them one directory batch at a time, without loading every file
+name from the database.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Exists, FileField, OuterRef, Q, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import CoverLetter, Document, OfferLetter, Resume, SkillGapReport
+
+# Directories under MEDIA_ROOT and the FileFields whose files live there
+MEDIA_DIRECTORIES = {
+    'resumes': [(Resume, 'file')],
+    'offer_letters': [(OfferLetter, 'file')],
+}
+
+
+def serialize_row(obj) -> dict:
+    """A JSON-ready dict of a row's columns, plus its document texts"""
+    row = {}
+    for field in obj._meta.concrete_fields:
+        value = field.value_from_object(obj)
+        row[field.attname] = value.name if isinstance(field, FileField) else value
+    for name in getattr(obj, 'document_fields', {}):
+        row[name] = getattr(obj, name)
+    return row
+
+
+def has_newer_cover_letter():
+    """True for cover letters with a newer one for the same resume and job description"""
+    # An index seek on (resume, job_description) per row
+    return Exists(CoverLetter.objects.filter(
+        resume=OuterRef('resume'), job_description=OuterRef('job_description'), id__gt=OuterRef('id')
+    ))
+
+
+def retention_querysets(cutoff) -> List[Tuple[str, object]]:
+    """What each run archives: rows not touched since ``cutoff`` and superseded cover letters"""
+    return [
+        # One report per pair is already enforced; old ones have not been refreshed since cutoff
+        ('skill_gap_reports', SkillGapReport.objects.filter(updated_at__lt=cutoff)),
+        ('cover_letters', CoverLetter.objects.filter(Q(created_at__lt=cutoff) | has_newer_cover_letter())),
+        ('offer_letters', OfferLetter.objects.with_text().filter(created_at__lt=cutoff)),
+    ]
+
+
+def _batches(queryset, batch_size: int) -> Iterator[List]:
+    """Rows in id order, fetched by id cursor so deleting a batch never shifts the next one"""
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def archive_rows(queryset, path: Optional[str], batch_size: int = 1000, dry_run: bool = False) -> Tuple[int, int]:
+    """Append rows to a gzipped JSONL archive, then delete them.
+
+    Each batch is flushed to the archive before it is deleted. Returns
+    ``(rows, bytes)`` where bytes is the size of the rows as JSON.
+    """
+    rows = size = 0
+    archive = None if dry_run or path is None else gzip.open(path, 'at', encoding='utf-8')
+    try:
+        for batch in _batches(queryset, batch_size):
+            lines = [json.dumps(serialize_row(obj), cls=DjangoJSONEncoder) + '\n' for obj in batch]
+            rows += len(batch)
+            size += sum(len(line.encode('utf-8')) for line in lines)
+            if dry_run:
+                continue
+            archive.writelines(lines)
+            archive.flush()
+            with transaction.atomic():
+                queryset.model.objects.filter(id__in=[obj.id for obj in batch]).delete()
+    finally:
+        if archive is not None:
+            archive.close()
+    return rows, size
+
+
+def purge_orphan_documents(grace: timedelta, batch_size: int = 1000, dry_run: bool = False) -> Tuple[int, int]:
+    """Delete stored texts no row points at any more; returns ``(documents, stored bytes)``.
+
+    Documents younger than ``grace`` are kept: a text being stored right now
+    has its Document before the row that references it.
+    """
+    orphans = Document.objects.filter(
+        resumes__isnull=True, job_descriptions__isnull=True, offer_letters__isnull=True,
+        created_at__lt=timezone.now() - grace
+    )
+    if dry_run:
+        totals = orphans.aggregate(count=Count('id'), size=Sum(Length('data')))
+        return totals['count'], totals['size'] or 0
+    count = size = 0
+    while True:
+        batch = list(orphans.order_by('id').values_list('id', Length('data'))[:batch_size])
+        if not batch:
+            return count, size
+        Document.objects.filter(id__in=[document_id for document_id, _ in batch]).delete()
+        count += len(batch)
+        size += sum(document_size for _, document_size in batch)
+
+
+def _media_entries(directory: str) -> Iterator[Tuple[str, int, float]]:
+    """``(name, size, mtime)`` of the files under a media directory, as the storage names them"""
+    try:
+        root = default_storage.path(directory)
+    except NotImplementedError:
+        return  # remote storages can't be scanned from disk
+    if not os.path.isdir(root):
+        return
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    name = os.path.relpath(entry.path, default_storage.location).replace(os.sep, '/')
+                    yield name, stat.st_size, stat.st_mtime
+
+
+def sweep_orphan_media(
+    grace: timedelta,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+    on_delete: Optional[Callable[[str], None]] = None
+) -> Tuple[int, int]:
+    """Delete media files no FileField references; returns ``(files, bytes)``.
+
+    Files are read from disk in batches and each batch is checked with one
+    ``IN`` query per field. Files modified within ``grace`` are kept, since
+    uploads are written before their row is saved.
+    """
+    newest = (timezone.now() - grace).timestamp()
+    count = size = 0
+    for directory, fields in MEDIA_DIRECTORIES.items():
+        entries = _media_entries(directory)
+        while True:
+            batch = list(islice(entries, batch_size))
+            if not batch:
+                break
+            names = [name for name, _, mtime in batch if mtime < newest]
+            referenced = set()
+            for model, field_name in fields:
+                referenced.update(
+                    model.objects.filter(**{f"{field_name}__in": names}).values_list(field_name, flat=True)
+                )
+            for name, file_size, mtime in batch:
+                if mtime >= newest or name in referenced:
+                    continue
+                if not dry_run:
+                    default_storage.delete(name)
+                if on_delete:
+                    on_delete(name)
+                count += 1
+                size += file_size
+    return count, size
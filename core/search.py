@@ -0,0 +1,291 @@
+"""Full-text search over resumes, job descriptions and offer letters.
+
+Each searchable model gets a side table keyed by the row's id: an FTS5
+virtual table on SQLite and a ``tsvector`` column with a GIN index on
+PostgreSQL. Rows are reindexed from ``post_save`` and dropped from
+``post_delete``; writes that skip signals (``bulk_create``, ``update``) call
+``index_objects`` themselves or are picked up by ``rebuild_search_index``.
+"""
+import re
+from functools import reduce
+from operator import and_
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import CharField, Q, TextField
+
+TERM_RE = re.compile(r"\w+")
+HIGHLIGHT = ('<mark>', '</mark>')
+SNIPPET_WORDS = 16
+TITLE_WEIGHT = 4.0
+BATCH_SIZE = 500
+
+# Default for ``full_text_search(user_id=...)``: rows of every owner
+ANY_OWNER = object()
+
+
+class SearchKind:
+    """What gets indexed for one model and how it is scoped.
+
+    ``fields`` are the columns (attnames) whose change means the row must be
+    reindexed.
+    """
+
+    def __init__(self, model_name: str, fields: Tuple[str, ...], document: Callable, owner_scoped: bool):
+        self.model_name = model_name
+        self.fields = fields
+        self.document = document
+        self.owner_scoped = owner_scoped
+
+    @property
+    def model(self):
+        return apps.get_model('core', self.model_name)
+
+    def source_table(self, model=None) -> str:
+        return (model or self.model)._meta.db_table
+
+    def table(self, model=None) -> str:
+        return f"{self.source_table(model)}_search"
+
+
+def _resume_document(resume) -> Tuple[str, str]:
+    return resume.name or '', f"{resume.parsed_text or ''}\n{' '.join(resume.extracted_skills or [])}"
+
+
+def _job_description_document(jd) -> Tuple[str, str]:
+    return f"{jd.title} {jd.company}", jd.text or ''
+
+
+def _offer_letter_document(offer) -> Tuple[str, str]:
+    return '', f"{offer.text or ''}\n{offer.explanation or ''}"
+
+
+SEARCH_KINDS: Dict[str, SearchKind] = {
+    'resume': SearchKind(
+        'Resume', ('name', 'parsed_text_document_id', 'extracted_skills'), _resume_document, True
+    ),
+    'job_description': SearchKind(
+        'JobDescription', ('title', 'company', 'text_document_id'), _job_description_document, False
+    ),
+    'offer_letter': SearchKind('OfferLetter', ('text_document_id', 'explanation'), _offer_letter_document, True),
+}
+
+
+def kind_for_model(model) -> Optional[str]:
+    for kind, spec in SEARCH_KINDS.items():
+        if spec.model_name == model._meta.object_name and model._meta.app_label == 'core':
+            return kind
+    return None
+
+
+def _chunks(items: List, size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _owner_clause(user_id) -> Tuple[str, List]:
+    if user_id is ANY_OWNER:
+        return '', []
+    if user_id is None:
+        return ' AND src.user_id IS NULL', []
+    return ' AND src.user_id = %s', [user_id]
+
+
+class SQLiteSearchBackend:
+    """FTS5 tables ranked by bm25 (title weighted above body)"""
+
+    def create_table(self, cursor, table: str):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(title, body, tokenize='porter unicode61')"
+        )
+
+    def drop_table(self, cursor, table: str):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def delete(self, cursor, table: str, ids: List[int]):
+        for chunk in _chunks(ids):
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+    def prune(self, cursor, table: str, source_table: str):
+        cursor.execute(f"DELETE FROM {table} WHERE rowid NOT IN (SELECT id FROM {source_table})")
+
+    def upsert(self, cursor, table: str, rows: List[Tuple[int, str, str]]):
+        # FTS5 has no ON CONFLICT, so replaced rows are deleted first
+        self.delete(cursor, table, [row[0] for row in rows])
+        cursor.executemany(f"INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+
+    def match_expression(self, query: str) -> str:
+        """Quote every term so user input can never be read as FTS5 syntax"""
+        return ' '.join(f'"{term}"' for term in TERM_RE.findall(query.lower()))
+
+    def search(self, cursor, table: str, source_table: str, query: str, top_k: int, user_id):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        owner_sql, owner_params = _owner_clause(user_id)
+        rank = f"bm25({table}, {TITLE_WEIGHT}, 1.0)"
+        cursor.execute(
+            f"SELECT {table}.rowid, -{rank}, "
+            f"snippet({table}, -1, %s, %s, '…', {SNIPPET_WORDS}) "
+            f"FROM {table} JOIN {source_table} src ON src.id = {table}.rowid "
+            f"WHERE {table} MATCH %s{owner_sql} ORDER BY {rank} LIMIT %s",
+            [*HIGHLIGHT, expression, *owner_params, top_k]
+        )
+        return cursor.fetchall()
+
+
+class PostgresSearchBackend:
+    """Weighted ``tsvector`` columns behind a GIN index, ranked by ts_rank_cd"""
+
+    config = 'english'
+
+    def create_table(self, cursor, table: str):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"id bigint PRIMARY KEY, title text NOT NULL, body text NOT NULL, "
+            f"document tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{self.config}', title), 'A') || "
+            f"setweight(to_tsvector('{self.config}', body), 'B')) STORED)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_document_idx ON {table} USING GIN (document)")
+
+    def drop_table(self, cursor, table: str):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def delete(self, cursor, table: str, ids: List[int]):
+        cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", [list(ids)])
+
+    def prune(self, cursor, table: str, source_table: str):
+        cursor.execute(f"DELETE FROM {table} s WHERE NOT EXISTS (SELECT 1 FROM {source_table} src WHERE src.id = s.id)")
+
+    def upsert(self, cursor, table: str, rows: List[Tuple[int, str, str]]):
+        cursor.executemany(
+            f"INSERT INTO {table} (id, title, body) VALUES (%s, %s, %s) "
+            f"ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title, body = EXCLUDED.body",
+            rows
+        )
+
+    def search(self, cursor, table: str, source_table: str, query: str, top_k: int, user_id):
+        if not TERM_RE.search(query):
+            return []
+        owner_sql, owner_params = _owner_clause(user_id)
+        options = f"StartSel={HIGHLIGHT[0]}, StopSel={HIGHLIGHT[1]}, MaxWords={SNIPPET_WORDS}, MinWords=5"
+        # The headline is only computed for the rows that survive the LIMIT
+        cursor.execute(
+            f"SELECT s.id, ts_rank_cd(s.document, q), "
+            f"ts_headline('{self.config}', s.title || ' ' || s.body, q, %s) "
+            f"FROM {table} s JOIN {source_table} src ON src.id = s.id, "
+            f"websearch_to_tsquery('{self.config}', %s) q "
+            f"WHERE s.document @@ q{owner_sql} ORDER BY 2 DESC, s.id DESC LIMIT %s",
+            [options, query, *owner_params, top_k]
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+
+def get_backend(conn=None):
+    """The search backend for a connection, or None when its database has none"""
+    return BACKENDS.get((conn or connection).vendor)
+
+
+def create_search_tables(conn=None, models: Optional[Dict[str, object]] = None):
+    """Create the side tables; ``models`` lets migrations pass historical models"""
+    conn = conn or connection
+    backend = get_backend(conn)
+    if backend is None:
+        return
+    with conn.cursor() as cursor:
+        for kind, spec in SEARCH_KINDS.items():
+            backend.create_table(cursor, spec.table((models or {}).get(kind)))
+
+
+def drop_search_tables(conn=None, models: Optional[Dict[str, object]] = None):
+    conn = conn or connection
+    backend = get_backend(conn)
+    if backend is None:
+        return
+    with conn.cursor() as cursor:
+        for kind, spec in SEARCH_KINDS.items():
+            backend.drop_table(cursor, spec.table((models or {}).get(kind)))
+
+
+def index_objects(kind: str, objects: Iterable, conn=None) -> int:
+    """Add or replace the search rows of saved objects; returns rows written"""
+    conn = conn or connection
+    backend = get_backend(conn)
+    spec = SEARCH_KINDS[kind]
+    objects = list(objects)
+    if backend is None or not objects:
+        return 0
+    rows = [(obj.pk, *spec.document(obj)) for obj in objects]
+    with conn.cursor() as cursor:
+        backend.upsert(cursor, spec.table(type(objects[0])), rows)
+    return len(rows)
+
+
+def remove_objects(kind: str, ids: Iterable[int], conn=None):
+    conn = conn or connection
+    backend = get_backend(conn)
+    ids = list(ids)
+    if backend is None or not ids:
+        return
+    with conn.cursor() as cursor:
+        backend.delete(cursor, SEARCH_KINDS[kind].table(), ids)
+
+
+def rebuild_search_index(kind: str, queryset=None, batch_size: int = 1000, conn=None) -> int:
+    """Drop rows of deleted objects, then reindex every row in batches; returns rows indexed"""
+    conn = conn or connection
+    backend = get_backend(conn)
+    spec = SEARCH_KINDS[kind]
+    queryset = spec.model.objects.with_text() if queryset is None else queryset
+    if backend is not None:
+        with conn.cursor() as cursor:
+            backend.prune(cursor, spec.table(queryset.model), spec.source_table(queryset.model))
+    queryset = queryset.order_by('id')
+    batch, total = [], 0
+    for obj in queryset.iterator(chunk_size=batch_size):
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            total += index_objects(kind, batch, conn)
+            batch = []
+    return total + index_objects(kind, batch, conn)
+
+
+def _fallback_search(spec: SearchKind, query: str, top_k: int, user_id) -> List[Tuple[int, float, str]]:
+    """Unranked substring match on the inline text columns, for databases without a search backend"""
+    terms = TERM_RE.findall(query)
+    text_fields = [
+        field.name for field in spec.model._meta.concrete_fields
+        if field.attname in spec.fields and isinstance(field, (CharField, TextField))
+    ]
+    if not terms or not text_fields:
+        return []
+    queryset = spec.model.objects.filter(reduce(and_, (
+        reduce(lambda a, b: a | b, (Q(**{f"{field}__icontains": term}) for field in text_fields))
+        for term in terms
+    )))
+    if user_id is not ANY_OWNER:
+        queryset = queryset.filter(user_id=user_id)
+    return [(pk, 0.0, '') for pk in queryset.values_list('id', flat=True)[:top_k]]
+
+
+def full_text_search(kind: str, query: str, top_k: int = 10, user_id=ANY_OWNER) -> List[Tuple[int, float, str]]:
+    """Best matches for a query as ``(id, score, snippet)``, best first.
+
+    ``user_id`` limits results to one owner (``None`` for ownerless rows).
+    Snippets wrap matched words in ``<mark>`` tags.
+    """
+    spec = SEARCH_KINDS[kind]
+    backend = get_backend()
+    if backend is None:
+        return _fallback_search(spec, query, top_k, user_id)
+    with connection.cursor() as cursor:
+        rows = backend.search(cursor, spec.table(), spec.source_table(), query, top_k, user_id)
+    return [(pk, float(score), snippet or '') for pk, score, snippet in rows]
@@ -1,55 +1,88 @@
 from rest_framework import serializers
-from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport
+from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport, Task
+from .search import SEARCH_KINDS
 from accounts.serializers import UserSerializer
 
-class ResumeSerializer(serializers.ModelSerializer):
+class FieldSubsetSerializerMixin:
+    """Serializer that only renders the field names passed as ``fields``"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class ResumeSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    parsed_text = serializers.CharField(read_only=True)
     
     class Meta:
         model = Resume
-        fields = '__all__'
-        read_only_fields = ['parsed_text', 'extracted_skills', 'education', 'experience', 'name', 'email', 'phone']
+        exclude = ['parsed_text_document']
+        read_only_fields = ['extracted_skills', 'education', 'experience', 'name', 'email', 'phone', 'content_hash']
+
+class ResumeSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Resume
+        fields = ['id', 'name', 'email', 'phone', 'extracted_skills', 'created_at']
 
-class JobDescriptionSerializer(serializers.ModelSerializer):
+class JobDescriptionSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    text = serializers.CharField()
     
     class Meta:
         model = JobDescription
-        fields = '__all__'
+        exclude = ['text_document']
 
-class CoverLetterSerializer(serializers.ModelSerializer):
+class CoverLetterSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
     resume = ResumeSerializer(read_only=True)
     job_description = JobDescriptionSerializer(read_only=True)
+    resume_id = serializers.IntegerField(read_only=True)
+    job_description_id = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = CoverLetter
         fields = '__all__'
 
-class OfferLetterSerializer(serializers.ModelSerializer):
+class OfferLetterSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    text = serializers.CharField(required=False, allow_blank=True)
     
     class Meta:
         model = OfferLetter
-        fields = '__all__'
+        exclude = ['text_document']
         read_only_fields = ['explanation', 'risk_flags', 'ctc', 'probation_period', 'notice_period']
 
-class SkillGapReportSerializer(serializers.ModelSerializer):
+class SkillGapReportSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
     resume = ResumeSerializer(read_only=True)
     job_description = JobDescriptionSerializer(read_only=True)
+    resume_id = serializers.IntegerField(read_only=True)
+    job_description_id = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = SkillGapReport
         fields = '__all__'
-        read_only_fields = ['fit_score', 'missing_skills', 'matching_skills', 'suggested_resources']
+        read_only_fields = [
+            'fit_score', 'missing_skills', 'matching_skills', 'suggested_resources',
+            'inputs_fingerprint', 'is_stale'
+        ]
+
+class TaskSerializer(FieldSubsetSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'priority', 'status', 'stage', 'progress', 'partial_result', 'attempts',
+                  'max_attempts', 'result', 'error', 'created_at', 'updated_at', 'finished_at']
+        read_only_fields = fields
 
 # Special serializers for specific API endpoints
 class ResumeUploadSerializer(serializers.ModelSerializer):
+    parsed_text = serializers.CharField(required=False, allow_blank=True)
+
     class Meta:
         model = Resume
         fields = ['file', 'parsed_text', 'name', 'email', 'phone', 'extracted_skills', 'education', 'experience']
         extra_kwargs = {
             'file': {'required': False},
-            'parsed_text': {'required': False},
             'name': {'required': False},
             'email': {'required': False},
             'phone': {'required': False},
@@ -58,9 +91,48 @@ class ResumeUploadSerializer(serializers.ModelSerializer):
             'experience': {'required': False},
         }
 
+class ResumeBulkItemSerializer(ResumeUploadSerializer):
+    """One resume in a bulk create; files still go through ``upload``"""
+    parsed_text = serializers.CharField()
+
+    class Meta(ResumeUploadSerializer.Meta):
+        fields = [name for name in ResumeUploadSerializer.Meta.fields if name != 'file']
+
+JOB_FIT_SCORERS = ['local', 'gemini']
+
 class JobMatchSerializer(serializers.Serializer):
     resume_id = serializers.IntegerField()
     job_description_id = serializers.IntegerField()
+    scorer = serializers.ChoiceField(choices=JOB_FIT_SCORERS, required=False)
+    explain = serializers.BooleanField(required=False, default=False)
+
+class JobRecommendationQuerySerializer(serializers.Serializer):
+    resume_id = serializers.IntegerField()
+    company = serializers.CharField(required=False, allow_blank=True)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+    offset = serializers.IntegerField(required=False, default=0, min_value=0)
+
+class CandidateRankingQuerySerializer(serializers.Serializer):
+    top_k = serializers.IntegerField(required=False, default=20, min_value=1, max_value=200)
+
+class TextSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(required=False)
+    resume_id = serializers.IntegerField(required=False)
+    job_description_id = serializers.IntegerField(required=False)
+    top_k = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+    mode = serializers.ChoiceField(choices=['text', 'semantic'], required=False, default='text')
+
+    def validate(self, attrs):
+        if not any(key in attrs for key in ('q', 'resume_id', 'job_description_id')):
+            raise serializers.ValidationError("Provide q, resume_id or job_description_id.")
+        return attrs
+
+class FullTextSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField()
+    kind = serializers.MultipleChoiceField(choices=list(SEARCH_KINDS), required=False)
+    top_k = serializers.IntegerField(required=False, default=10, min_value=1, max_value=50)
 
 class CoverLetterGenerateSerializer(serializers.Serializer):
     resume_id = serializers.IntegerField()
@@ -68,12 +140,13 @@ class CoverLetterGenerateSerializer(serializers.Serializer):
     custom_prompt = serializers.CharField(required=False, allow_blank=True)
 
 class OfferLetterAnalyzeSerializer(serializers.ModelSerializer):
+    text = serializers.CharField(required=False, allow_blank=True)
+
     class Meta:
         model = OfferLetter
         fields = ['file', 'text']
         extra_kwargs = {
             'file': {'required': False},
-            'text': {'required': False},
         }
 
 class ATSOptimizeSerializer(serializers.Serializer):
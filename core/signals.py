@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .indexing import index_job_description, index_resume
+from .models import JobDescription, OfferLetter, Resume, SkillGapReport
+from .search import SEARCH_KINDS, index_objects, kind_for_model, remove_objects
+
+
+# Postings are removed with their owner through the FK cascade,
+# so only saves need handling here.
+@receiver(post_save, sender=JobDescription)
+def update_job_skill_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_job_description(instance)
+
+
+@receiver(post_save, sender=Resume)
+def update_resume_skill_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_resume(instance)
+
+
+def _inputs_changed(instance, created, update_fields):
+    if created:
+        return False
+    changed = instance.changed_fields()
+    if update_fields is not None:
+        changed &= set(update_fields)
+    return bool(changed)
+
+
+# Reports are refreshed later by ``refresh_skill_gaps``; here they are only flagged.
+# Bumping updated_at lets a refresh already in flight notice the newer edit.
+@receiver(post_save, sender=Resume)
+def mark_resume_reports_stale(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or not _inputs_changed(instance, created, update_fields):
+        return
+    SkillGapReport.objects.filter(resume=instance).update(is_stale=True, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=JobDescription)
+def mark_job_reports_stale(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw or not _inputs_changed(instance, created, update_fields):
+        return
+    SkillGapReport.objects.filter(job_description=instance).update(is_stale=True, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=JobDescription)
+@receiver(post_save, sender=OfferLetter)
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    kind = kind_for_model(sender)
+    if update_fields is not None and not set(update_fields) & set(SEARCH_KINDS[kind].fields):
+        return
+    index_objects(kind, [instance])
+
+
+@receiver(post_delete, sender=Resume)
+@receiver(post_delete, sender=JobDescription)
+@receiver(post_delete, sender=OfferLetter)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_objects(kind_for_model(sender), [instance.pk])
@@ -0,0 +1,356 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .concurrency import fan_out
+from .embeddings import cosine_similarity
+from .indexing import index_job_descriptions, index_resumes
+from .llm_scheduler import PRIORITIES, STANDARD, llm_priority
+from .models import JobDescription, OfferLetter, Resume, SkillGapReport, Task
+from .relevance import text_relevance
+from .search import index_objects
+from .utils import (
+    analyze_offer_letter_with_gemini, calculate_job_fit, extract_contact_details, extract_skills_from_text,
+    extract_skills_from_texts, extract_text_from_file, get_learning_resources_with_gemini, parse_resume_text
+)
+
+logger = logging.getLogger(__name__)
+
+# Registered task functions by name
+TASKS: Dict[str, Callable] = {}
+
+
+class PermanentTaskError(Exception):
+    """Raised by a task for a failure a retry would only repeat"""
+
+
+# Everything else, including the ValidationErrors that wrap Gemini timeouts,
+# 5xx and rate-limit errors, goes through the retry backoff
+PERMANENT_ERRORS = (ObjectDoesNotExist, PermanentTaskError)
+
+
+def task(name: str):
+    """Register ``func(task, **payload)`` as a background task called ``name``"""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(
+    name: str,
+    payload: Optional[Dict] = None,
+    user=None,
+    max_attempts: Optional[int] = None,
+    priority: str = STANDARD
+) -> Task:
+    """Store a task for the worker to pick up"""
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        user=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def enqueue_many(
+    name: str,
+    payloads: List[Dict],
+    user=None,
+    priority: str = STANDARD,
+    batch_size: int = 1000
+) -> int:
+    """Store many tasks of one kind with a single bulk insert"""
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+    user = user if user is not None and user.is_authenticated else None
+    Task.objects.bulk_create(
+        [
+            Task(name=name, payload=payload, user=user, priority=priority,
+                 max_attempts=settings.TASK_MAX_ATTEMPTS)
+            for payload in payloads
+        ],
+        batch_size=batch_size,
+    )
+    return len(payloads)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _claimable(now):
+    # Pending work that is due, or running work whose worker stopped renewing its lock
+    return (
+        Q(status=Task.PENDING, run_after__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now, attempts__lt=F('max_attempts'))
+    )
+
+
+def fail_expired_tasks(now) -> int:
+    """Fail running tasks whose lock expired on their last attempt, so they are not leased forever"""
+    return Task.objects.filter(
+        status=Task.RUNNING, locked_until__lt=now, attempts__gte=F('max_attempts')
+    ).update(
+        status=Task.FAILED, locked_by='', locked_until=None,
+        error='Lock expired on the last attempt: the worker died or the task outran its visibility timeout',
+        finished_at=now, updated_at=now,
+    )
+
+
+def claim_task(worker: str, visibility_timeout: int) -> Optional[Task]:
+    """Atomically take the most urgent due task, or return None when there is none.
+
+    Higher priority classes go first, then the oldest. Claims are a
+    conditional UPDATE, so concurrent workers never get the same task without
+    needing row locks.
+    """
+    now = timezone.now()
+    fail_expired_tasks(now)
+    rank = Case(
+        *[When(priority=priority, then=Value(i)) for i, priority in enumerate(PRIORITIES)],
+        default=Value(len(PRIORITIES)), output_field=IntegerField()
+    )
+    candidates = (
+        Task.objects.filter(_claimable(now))
+        .order_by(rank, 'run_after', 'id')
+        .values_list('id', flat=True)[:10]
+    )
+    for task_id in candidates:
+        claimed = Task.objects.filter(_claimable(now), id=task_id).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+        if claimed:
+            return Task.objects.get(id=task_id)
+    return None
+
+
+def set_progress(
+    task_obj: Task,
+    progress: int,
+    visibility_timeout: Optional[int] = None,
+    stage: Optional[str] = None,
+    partial_result: Optional[Dict] = None
+) -> bool:
+    """Record progress (0–100) and renew the lock; False if another worker took the task over.
+
+    ``stage`` names the current step and ``partial_result`` holds whatever is
+    already known, so clients can render it before the task finishes.
+    """
+    now = timezone.now()
+    timeout = visibility_timeout or settings.TASK_VISIBILITY_TIMEOUT
+    task_obj.progress = max(0, min(100, int(progress)))
+    fields = {'progress': task_obj.progress}
+    if stage is not None:
+        task_obj.stage = fields['stage'] = stage
+    if partial_result is not None:
+        task_obj.partial_result = fields['partial_result'] = partial_result
+    return bool(Task.objects.filter(id=task_obj.id, locked_by=task_obj.locked_by, status=Task.RUNNING).update(
+        **fields,
+        locked_until=now + timedelta(seconds=timeout),
+        updated_at=now,
+    ))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff between attempts, capped at ten minutes"""
+    return timedelta(seconds=min(600, settings.TASK_RETRY_DELAY * 2 ** max(0, attempts - 1)))
+
+
+def _renew_lock(task_obj: Task, visibility_timeout: float, stop: threading.Event):
+    """Extend the task's lock every third of the timeout until ``stop`` is set"""
+    try:
+        while not stop.wait(visibility_timeout / 3):
+            Task.objects.filter(id=task_obj.id, locked_by=task_obj.locked_by, status=Task.RUNNING).update(
+                locked_until=timezone.now() + timedelta(seconds=visibility_timeout)
+            )
+    finally:
+        connection.close()
+
+
+def run_task(task_obj: Task, visibility_timeout: Optional[float] = None) -> bool:
+    """Run a claimed task and record its outcome; returns True on success.
+
+    The lock is renewed in the background while the task runs, so long tasks
+    that never call ``set_progress`` are not handed to another worker.
+    """
+    func = TASKS.get(task_obj.name)
+    owned = Task.objects.filter(id=task_obj.id, locked_by=task_obj.locked_by, status=Task.RUNNING)
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_renew_lock, args=(task_obj, visibility_timeout or settings.TASK_VISIBILITY_TIMEOUT, stop), daemon=True
+    )
+    heartbeat.start()
+    try:
+        if func is None:
+            raise PermanentTaskError(f"Unknown task: {task_obj.name}")
+        with llm_priority(task_obj.priority):
+            result = func(task_obj, **task_obj.payload)
+    except Exception as e:
+        logger.exception("Task %s failed (attempt %s/%s)", task_obj.id, task_obj.attempts, task_obj.max_attempts)
+        now = timezone.now()
+        if not isinstance(e, PERMANENT_ERRORS) and task_obj.attempts < task_obj.max_attempts:
+            owned.update(
+                status=Task.PENDING, locked_by='', locked_until=None,
+                run_after=now + retry_delay(task_obj.attempts),
+                error=str(e), updated_at=now,
+            )
+        else:
+            owned.update(
+                status=Task.FAILED, locked_by='', locked_until=None,
+                error=traceback.format_exc(limit=5), finished_at=now, updated_at=now,
+            )
+        return False
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    now = timezone.now()
+    owned.update(
+        status=Task.SUCCEEDED, locked_by='', locked_until=None, progress=100,
+        result=result, error='', finished_at=now, updated_at=now,
+    )
+    return True
+
+
+@task('parse_resume')
+def parse_resume(task_obj: Task, resume_id: int):
+    """Parse an uploaded resume file and fill in the extracted fields"""
+    resume = Resume.objects.get(id=resume_id)
+    set_progress(task_obj, 5, stage='extracting')
+    text = extract_text_from_file(resume.file.path)
+
+    # A quick local pass gives the client something to show while Gemini parses
+    set_progress(task_obj, 30, stage='parsing', partial_result={
+        **extract_contact_details(text), 'skills': extract_skills_from_text(text)
+    })
+    parsed_data = parse_resume_text(text)
+    set_progress(task_obj, 90, stage='saving')
+
+    resume.parsed_text = parsed_data.get('parsed_text', '')
+    resume.name = parsed_data.get('name', '')
+    resume.email = parsed_data.get('email', '')
+    resume.phone = parsed_data.get('phone', '')
+    resume.extracted_skills = parsed_data.get('skills', [])
+    resume.education = parsed_data.get('education', [])
+    resume.experience = parsed_data.get('experience', [])
+
+    # If no skills found, try to extract from text
+    if not resume.extracted_skills and resume.parsed_text:
+        resume.extracted_skills = extract_skills_from_text(resume.parsed_text)
+
+    resume.save()
+    return {
+        'resume_id': resume.id,
+        'name': resume.name,
+        'email': resume.email,
+        'phone': resume.phone,
+        'extracted_skills': resume.extracted_skills,
+    }
+
+
+@task('extract_skills')
+def extract_skills(task_obj: Task, kind: str, ids: List[int]):
+    """Fill in skills for bulk-created resumes or job descriptions that arrived without any"""
+    if kind == 'resume':
+        rows = [r for r in Resume.objects.with_text().filter(id__in=ids) if not r.extracted_skills]
+        texts = [r.parsed_text for r in rows]
+    elif kind == 'job_description':
+        rows = [jd for jd in JobDescription.objects.with_text().filter(id__in=ids)
+                if not jd.required_skills and not jd.preferred_skills]
+        texts = [jd.text for jd in rows]
+    else:
+        raise ValueError(f"Unknown kind: {kind}")
+    set_progress(task_obj, 10, stage='extracting')
+
+    # One spaCy pass for the whole batch; bulk_update skips post_save, so the
+    # indexes and stale flags the signals would maintain are updated here
+    skills = extract_skills_from_texts(texts)
+    set_progress(task_obj, 80, stage='indexing')
+    now = timezone.now()
+    if kind == 'resume':
+        for resume, resume_skills in zip(rows, skills):
+            resume.extracted_skills, resume.updated_at = resume_skills, now
+        Resume.objects.bulk_update(rows, ['extracted_skills', 'updated_at'])
+        index_resumes(rows)
+        index_objects('resume', rows)
+        reports = SkillGapReport.objects.filter(resume__in=rows)
+    else:
+        for jd, jd_skills in zip(rows, skills):
+            jd.required_skills, jd.updated_at = jd_skills, now
+        JobDescription.objects.bulk_update(rows, ['required_skills', 'updated_at'])
+        index_job_descriptions(rows)
+        reports = SkillGapReport.objects.filter(job_description__in=rows)
+    reports.update(is_stale=True, updated_at=now)
+    return {'kind': kind, 'updated': len(rows)}
+
+
+@task('match_job')
+def match_job(task_obj: Task, resume_id: int, jd_text: str, scorer: Optional[str] = None):
+    """Score a resume against pasted JD text, then fetch learning resources for the gaps"""
+    resume = Resume.objects.with_text().get(id=resume_id)  # the text is read from fan-out threads
+    set_progress(task_obj, 5, stage='scoring')
+    (fit_score, matching_skills, missing_skills), relevance, semantic_score = fan_out([
+        lambda: calculate_job_fit(resume.extracted_skills, jd_text=jd_text, scorer=scorer),
+        lambda: text_relevance(resume.parsed_text, jd_text),
+        lambda: cosine_similarity(resume.parsed_text, jd_text),
+    ])
+    result = {
+        'fit_score': fit_score,
+        'skills_match': fit_score,
+        'text_relevance': relevance,
+        'semantic_score': semantic_score,
+        'experience_match': 0,
+        'education_match': 0,
+        'matching_skills': matching_skills,
+        'missing_skills': missing_skills,
+    }
+    set_progress(task_obj, 50, stage='recommending', partial_result=result)
+
+    result['recommendations'] = {
+        'skills_to_develop': missing_skills,
+        'learning_resources': get_learning_resources_with_gemini(missing_skills),
+    }
+    return result
+
+
+@task('analyze_offer_letter')
+def analyze_offer_letter(task_obj: Task, offer_letter_id: int):
+    """Extract an offer letter's text and analyze it with Gemini"""
+    offer_letter = OfferLetter.objects.with_text().get(id=offer_letter_id)
+    offer_text = offer_letter.text or ""
+    if offer_letter.file:
+        set_progress(task_obj, 5, stage='extracting')
+        offer_text = extract_text_from_file(offer_letter.file.path)
+    set_progress(task_obj, 30, stage='analyzing')
+
+    analysis = analyze_offer_letter_with_gemini(offer_text)
+
+    offer_letter.explanation = analysis.get('explanation', '')
+    offer_letter.risk_flags = analysis.get('risk_flags', [])
+    offer_letter.ctc = analysis.get('ctc', '')
+    offer_letter.probation_period = analysis.get('probation_period', '')
+    offer_letter.notice_period = analysis.get('notice_period', '')
+    offer_letter.save()
+    return {'offer_letter_id': offer_letter.id}
@@ -1,24 +1,59 @@
-from django.test import TestCase, Client
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.contrib.auth.models import User
-from rest_framework.test import APITestCase
+from django.utils import timezone
 from rest_framework import status
-from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport, UserProfile
+from rest_framework.test import APITestCase
+
+from .concurrency import fan_out
+from .embeddings import HashingEmbedder, IVFIndex, update_semantic_index
+from .events import task_events
+from .indexing import rank_resumes_for_job, recommend_job_descriptions
+from .llm_scheduler import BULK, INTERACTIVE, LLMScheduler, current_priority, llm_priority
+from .matching import VOCABULARY, calculate_job_fit_locally, canonicalize_skill, score_skill_matrices
+from .models import CoverLetter, Document, JobDescription, JobSkillPosting, OfferLetter, Resume, SkillGapReport, Task
+from .relevance import BM25Index, search_documents, update_text_index
+from .reports import (
+    refresh_stale_skill_gap_reports, save_batch_fit_rows, skill_gap_inputs_fingerprint, upsert_skill_gap_report
+)
+from .search import full_text_search, rebuild_search_index
+from .tasks import TASKS, claim_task, enqueue, run_task, set_progress
 from .utils import (
-    mock_generate_cover_letter, mock_analyze_offer_letter, 
-    mock_calculate_job_fit, extract_skills_from_text,
-    validate_file_type, validate_file_size, sanitize_filename
+    analyze_offer_letter_with_gemini, extract_skills_from_text, generate_cover_letter_with_gemini,
+    get_learning_resources_with_gemini, sanitize_filename, validate_file_size, validate_file_type
 )
-import tempfile
-import os
-from django.core.files.uploadedfile import SimpleUploadedFile
+
+
+def gemini_reply(text):
+    """Stand in for a Gemini response so tests never call the API"""
+    return mock.patch('core.utils.generate_with_retry', return_value=SimpleNamespace(text=text))
+
+OFFER_JSON = json.dumps({'ctc': '₹8,00,000 per annum', 'risk_flags': []})
 
 class ModelTests(TestCase):
     """Test cases for models"""
     
     def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
+        self.user = get_user_model().objects.create_user(
             email='test@example.com',
             password='testpass123'
         )
@@ -56,14 +91,13 @@ class ModelTests(TestCase):
             ctc='₹8,00,000 per annum'
         )
         self.assertEqual(offer.ctc, '₹8,00,000 per annum')
-        self.assertIn('2025-07-26', str(offer))  # Check for date instead of 'John'
+        self.assertIn(timezone.now().strftime('%Y-%m-%d'), str(offer))
 
 class APITests(APITestCase):
     """Test cases for API endpoints"""
     
     def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
+        self.user = get_user_model().objects.create_user(
             email='test@example.com',
             password='testpass123'
         )
@@ -96,33 +130,37 @@ class APITests(APITestCase):
             'text': 'Dear John, We offer you ₹8,00,000 per annum with 6 months probation.'
         }
         response = self.client.post(url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertIn('ctc', response.data)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIn('task_id', response.data)
+        self.assertIn('ctc', response.data['offer_letter'])
 
 class UtilityTests(TestCase):
     """Test cases for utility functions"""
     
-    def test_mock_generate_cover_letter(self):
+    def test_generate_cover_letter(self):
         """Test cover letter generation"""
         resume_text = "Experienced software engineer with Python skills"
         jd_text = "Looking for Python developer"
-        result = mock_generate_cover_letter(resume_text, jd_text)
+        with gemini_reply("Dear Hiring Manager,\nI would like to apply...") as generate:
+            result = generate_cover_letter_with_gemini(resume_text, jd_text)
         self.assertIsInstance(result, str)
         self.assertIn('Dear Hiring Manager', result)
+        self.assertIn(resume_text, generate.call_args[0][0])
     
-    def test_mock_analyze_offer_letter(self):
+    def test_analyze_offer_letter(self):
         """Test offer letter analysis"""
         offer_text = "Dear John, We offer ₹8,00,000 per annum"
-        result = mock_analyze_offer_letter(offer_text)
+        with gemini_reply(f"```json\n{OFFER_JSON}\n```"):
+            result = analyze_offer_letter_with_gemini(offer_text)
         self.assertIsInstance(result, dict)
         self.assertIn('ctc', result)
         self.assertIn('risk_flags', result)
     
-    def test_mock_calculate_job_fit(self):
+    def test_calculate_job_fit(self):
         """Test job fit calculation"""
         resume_skills = ['python', 'django', 'react']
         jd_skills = ['python', 'django', 'aws']
-        fit_score, missing, matching = mock_calculate_job_fit(resume_skills, jd_skills)
+        fit_score, matching, missing = calculate_job_fit_locally(resume_skills, jd_skills)
         self.assertIsInstance(fit_score, float)
         self.assertIsInstance(missing, list)
         self.assertIsInstance(matching, list)
@@ -177,6 +215,1154 @@ class UtilityTests(TestCase):
         sanitized = sanitize_filename(normal_filename)
         self.assertEqual(sanitized, "resume.pdf")
 
+class LocalJobFitTests(TestCase):
+    """Test cases for the local job fit scorer"""
+
+    def test_canonicalize_skill(self):
+        """Test alias and whitespace normalization"""
+        self.assertEqual(canonicalize_skill('  ReactJS '), 'react')
+        self.assertEqual(canonicalize_skill('K8s'), 'kubernetes')
+        self.assertEqual(canonicalize_skill('Machine   Learning'), 'machine learning')
+
+    def test_required_skills_weigh_more(self):
+        """Test weighted fit score and matching/missing lists"""
+        fit_score, matching, missing = calculate_job_fit_locally(
+            ['Python', 'Django', 'JS'],
+            ['python', 'aws'],
+            ['javascript', 'docker']
+        )
+        # matched: python (2) + javascript (1) out of 2 + 2 + 1 + 1
+        self.assertEqual(fit_score, 50.0)
+        self.assertEqual(matching, ['python', 'javascript'])
+        self.assertEqual(missing, ['aws', 'docker'])
+
+    def test_no_jd_skills(self):
+        """Test that a JD without skills scores zero"""
+        self.assertEqual(calculate_job_fit_locally(['python'], [], []), (0.0, [], []))
+
+    def test_matrix_scoring_matches_pairwise(self):
+        """Test that matrix scoring agrees with the pairwise scorer"""
+        resumes = [['python', 'django'], ['aws'], []]
+        jds = [(['python', 'aws'], ['django']), (['docker'], [])]
+        VOCABULARY.ids_for([s for r in resumes for s in r] + ['python', 'aws', 'django', 'docker'])
+        size = len(VOCABULARY)
+        resume_matrix = np.array([VOCABULARY.encode(r, size) for r in resumes])
+        required = np.array([VOCABULARY.encode(req, size) for req, _ in jds])
+        preferred = np.array([VOCABULARY.encode(pref, size) for _, pref in jds])
+        scores = score_skill_matrices(resume_matrix, required, preferred)
+        for i, resume_skills in enumerate(resumes):
+            for j, (req, pref) in enumerate(jds):
+                expected = calculate_job_fit_locally(resume_skills, req, pref)[0]
+                self.assertAlmostEqual(float(scores[i, j]), expected, places=2)
+
+class SkillIndexTests(APITestCase):
+    """Test cases for the inverted skill index and job recommendations"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.resume = Resume.objects.create(user=self.user, name='Jane', extracted_skills=['Python', 'Django'])
+        self.backend = JobDescription.objects.create(
+            title='Backend Developer', company='TechCorp', text='...',
+            required_skills=['python', 'django'], preferred_skills=['aws']
+        )
+        self.data = JobDescription.objects.create(
+            title='Data Engineer', company='DataCorp', text='...',
+            required_skills=['python', 'spark']
+        )
+        JobDescription.objects.create(title='Designer', company='TechCorp', text='...', required_skills=['figma'])
+
+    def test_postings_follow_saves_and_deletes(self):
+        """Test that postings are rewritten on save and removed on delete"""
+        self.assertEqual(
+            set(JobSkillPosting.objects.filter(job_description=self.data).values_list('skill', flat=True)),
+            {'python', 'spark'}
+        )
+        self.data.required_skills = ['scala']
+        self.data.save()
+        self.assertEqual(
+            list(JobSkillPosting.objects.filter(job_description=self.data).values_list('skill', flat=True)),
+            ['scala']
+        )
+        self.data.delete()
+        self.assertFalse(JobSkillPosting.objects.filter(job_description_id=self.data.id).exists())
+
+    def test_create_keeps_empty_skill_lists(self):
+        """Test that a job description posted with no skills is stored without guessed ones"""
+        response = self.client.post(
+            reverse('job-description-list'),
+            {'title': 'Dev', 'text': 'Python and Django', 'required_skills': [], 'preferred_skills': []},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        jd = JobDescription.objects.get(id=response.data['id'])
+        self.assertEqual((jd.required_skills, jd.preferred_skills), ([], []))
+        self.assertFalse(jd.skill_postings.exists())
+
+    def test_recommendation_ranking(self):
+        """Test ranking by weighted coverage and company filter"""
+        ranked = list(recommend_job_descriptions(self.resume.extracted_skills))
+        self.assertEqual([r['job_description_id'] for r in ranked], [self.backend.id, self.data.id])
+        self.assertAlmostEqual(ranked[0]['fit_score'], 80.0)
+        self.assertAlmostEqual(ranked[1]['fit_score'], 50.0)
+
+        ranked = list(recommend_job_descriptions(self.resume.extracted_skills, company='datacorp'))
+        self.assertEqual([r['job_description_id'] for r in ranked], [self.data.id])
+
+    def test_recommended_endpoint_paginates(self):
+        """Test the recommendations endpoint with offset pagination"""
+        url = reverse('job-description-recommended')
+        response = self.client.get(url, {'resume_id': self.resume.id, 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['matching_skills'], ['django', 'python'])
+        self.assertEqual(response.data['next_offset'], 1)
+
+        response = self.client.get(url, {'resume_id': self.resume.id, 'limit': 1, 'offset': 1})
+        self.assertEqual(response.data['results'][0]['job_description']['id'], self.data.id)
+        self.assertIsNone(response.data['next_offset'])
+
+class CandidateRankingTests(APITestCase):
+    """Test cases for recruiter-side candidate ranking"""
+
+    def setUp(self):
+        self.recruiter = get_user_model().objects.create_user(
+            email='recruiter@example.com', password='testpass123', is_recruiter=True
+        )
+        self.jd = JobDescription.objects.create(
+            user=self.recruiter, title='Backend Developer', company='TechCorp', text='...',
+            required_skills=['python', 'django', 'sql'], preferred_skills=['aws', 'docker']
+        )
+        pool = ['python', 'django', 'sql', 'aws', 'docker', 'react', 'java']
+        self.resumes = [
+            Resume.objects.create(name=f'Candidate {i}', extracted_skills=pool[i % 3:i % 3 + (i % 5) + 1])
+            for i in range(30)
+        ]
+
+    def test_ranking_matches_brute_force(self):
+        """Test that early termination returns the exact top-k"""
+        expected = sorted(
+            (
+                (-calculate_job_fit_locally(r.extracted_skills, self.jd.required_skills, self.jd.preferred_skills)[0], r.id)
+                for r in self.resumes
+            )
+        )
+        expected = [(rid, -score) for score, rid in expected if score < 0][:5]
+        ranked = rank_resumes_for_job(self.jd.required_skills, self.jd.preferred_skills, top_k=5)
+        self.assertEqual([(rid, score) for rid, score, _ in ranked], expected)
+
+    def test_candidates_endpoint_requires_recruiter(self):
+        """Test that only recruiters can rank candidates"""
+        url = reverse('job-description-candidates', args=[self.jd.id])
+        student = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.client.force_authenticate(user=student)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.recruiter)
+        response = self.client.get(url, {'top_k': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertNotIn('parsed_text', response.data['results'][0]['resume'])
+
+class TextRelevanceTests(APITestCase):
+    """Test cases for the BM25 text relevance engine"""
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+        override = override_settings(TEXT_INDEX_DIR=self.index_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.python_jd = JobDescription.objects.create(
+            title='Python Developer', company='TechCorp', text='Build REST APIs with Python and Django.'
+        )
+        self.java_jd = JobDescription.objects.create(
+            title='Java Developer', company='JavaCorp', text='Spring Boot microservices in Java.'
+        )
+
+    def test_bm25_ranking_and_replacement(self):
+        """Test ranking, document replacement and save/load round trip"""
+        index = BM25Index()
+        index.add_documents([(1, 'python django rest'), (2, 'java spring'), (3, 'python pandas')])
+        self.assertEqual(index.search('django python', top_k=2)[0][0], 1)
+
+        index.add_documents([(2, 'python django flask')])
+        self.assertEqual(len(index), 3)
+        self.assertEqual({doc_id for doc_id, _ in index.search('spring')}, set())
+
+        index.save(self.index_dir)
+        loaded = BM25Index.load(self.index_dir)
+        self.assertEqual(loaded.search('django python'), index.search('django python'))
+        loaded.compact()
+        self.assertEqual(loaded.search('django python'), index.search('django python'))
+
+    def test_incremental_update_and_search_endpoint(self):
+        """Test that only new rows are indexed and the search endpoint ranks them"""
+        self.assertEqual(update_text_index('job_description'), 2)
+        self.assertEqual(update_text_index('job_description'), 0)
+        JobDescription.objects.create(title='Data Engineer', company='DataCorp', text='Python and Spark pipelines.')
+        self.assertEqual(update_text_index('job_description'), 1)
+
+        response = self.client.get(reverse('job-description-search'), {'q': 'django python'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['job_description']['id'], self.python_jd.id)
+
+        self.assertEqual(self.client.get(reverse('job-description-search')).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_edited_job_description_is_reindexed(self):
+        """Test that an edit replaces the indexed text so new terms score and old ones do not"""
+        update_text_index('job_description')
+        self.java_jd.text = 'Kotlin services on Android.'
+        self.java_jd.save()
+        self.assertEqual(update_text_index('job_description'), 1)
+        self.assertEqual(search_documents('job_description', 'kotlin android')[0][0], self.java_jd.id)
+        self.assertEqual(search_documents('job_description', 'spring microservices'), [])
+
+class SemanticIndexTests(APITestCase):
+    """Test cases for hashed embeddings and the IVF index"""
+
+    def test_related_skills_are_closer(self):
+        """Test that implied concepts bring related skills together"""
+        embedder = HashingEmbedder(256)
+        pytorch, frameworks, accounting = embedder.embed([
+            'Built models with PyTorch',
+            'Experience with deep learning frameworks',
+            'Accounting and bookkeeping in Excel',
+        ])
+        self.assertGreater(pytorch @ frameworks, pytorch @ accounting)
+        self.assertEqual(embedder.embed(['python']).dtype, np.float32)
+
+    def test_ivf_recall_and_updates(self):
+        """Test that probing every list matches exact search and replacements apply"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(500, 32)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index = IVFIndex(32)
+        index.add(range(500), vectors)
+        index.train(n_lists=10)
+        query = vectors[7]
+        self.assertEqual(index.search(query, top_k=5, nprobe=10), index.exact_search(query, top_k=5))
+        self.assertEqual(index.search(query, top_k=1)[0][0], 7)
+
+        index.add([7], vectors[8:9])
+        self.assertEqual(len(index), 500)
+        self.assertEqual({doc_id for doc_id, _ in index.search(query, top_k=500, nprobe=10)} - set(range(500)), set())
+        self.assertNotEqual(index.search(query, top_k=1, nprobe=10)[0], (7, 1.0))
+
+    def test_saves_swap_whole_versions(self):
+        """Test that each save writes a new version and an open reader keeps its own arrays"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        vectors = np.eye(4, dtype=np.float32)
+        index = IVFIndex(4)
+        index.add([1], vectors[:1])
+        index.save(index_dir)
+        reader = IVFIndex.load(index_dir)
+
+        index.add([2, 3], vectors[1:3])
+        index.save(index_dir)
+        self.assertEqual(reader.search(vectors[1], top_k=5), [(1, 0.0)])
+        index.add([4], vectors[3:])
+        index.save(index_dir)
+        self.assertEqual(len([name for name in os.listdir(index_dir) if name.startswith('v')]), 2)
+        self.assertEqual(len(IVFIndex.load(index_dir)), 4)
+
+    def test_semantic_search_endpoint(self):
+        """Test semantic mode on the job description search endpoint"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        with override_settings(TEXT_INDEX_DIR=index_dir):
+            ml = JobDescription.objects.create(title='ML Engineer', company='AI Labs', text='Train models with PyTorch.')
+            JobDescription.objects.create(title='Accountant', company='FinCo', text='Bookkeeping and audits.')
+            self.assertEqual(update_semantic_index('job_description'), 2)
+            response = self.client.get(
+                reverse('job-description-search'), {'q': 'deep learning frameworks', 'mode': 'semantic'}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['job_description']['id'], ml.id)
+
+class SkillGapReportUpsertTests(APITestCase):
+    """Test cases for reusing and replacing skill gap reports"""
+
+    def setUp(self):
+        self.resume = Resume.objects.create(parsed_text='Python developer', extracted_skills=['python'])
+        self.jd = JobDescription.objects.create(
+            title='Backend Developer', company='Tech Corp', text='Python and Django',
+            required_skills=['python', 'django']
+        )
+        self.url = reverse('skill-gap-report-match')
+        self.payload = {'resume_id': self.resume.id, 'job_description_id': self.jd.id}
+
+    @mock.patch('core.reports.get_learning_resources_with_gemini', return_value=[])
+    def test_unchanged_inputs_reuse_report(self, resources):
+        """Test that a repeated match returns the stored report without recomputing"""
+        first = self.client.post(self.url, self.payload, format='json')
+        second = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(resources.call_count, 1)
+        self.assertEqual(SkillGapReport.objects.count(), 1)
+
+    @mock.patch('core.reports.get_learning_resources_with_gemini', return_value=[{'skill': 'Django', 'resources': []}])
+    def test_batch_rows_are_not_reused_without_resources(self, resources):
+        """Test that a report scored by match_all still gets learning resources from the match endpoint"""
+        fingerprint = skill_gap_inputs_fingerprint(self.resume, self.jd, 'local')
+        save_batch_fit_rows([(self.resume.id, self.jd.id, 50.0, ['python'], ['django'], fingerprint)])
+        response = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['suggested_resources'], [{'skill': 'Django', 'resources': []}])
+        self.assertEqual(self.client.post(self.url, self.payload, format='json').status_code, status.HTTP_200_OK)
+        self.assertEqual(resources.call_count, 1)
+
+    @mock.patch('core.reports.get_learning_resources_with_gemini', return_value=[])
+    def test_changed_inputs_replace_report(self, resources):
+        """Test that changed resume skills recompute the report in place"""
+        first = self.client.post(self.url, self.payload, format='json')
+        self.resume.extracted_skills = ['python', 'django']
+        self.resume.save()
+        second = self.client.post(self.url, self.payload, format='json')
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(float(second.data['fit_score']), 100.0)
+        self.assertEqual(SkillGapReport.objects.count(), 1)
+
+        gaps = self.client.get(
+            reverse('skill-gap-report-gaps'),
+            {'resume_id': self.resume.id, 'job_description_id': self.jd.id}
+        )
+        self.assertEqual(gaps.data['missing_skills'], [])
+
+    @mock.patch('core.reports.get_learning_resources_with_gemini', return_value=[])
+    def test_edits_mark_reports_stale_and_refresh(self, resources):
+        """Test that skill edits flag reports and the refresh recomputes only those"""
+        other = JobDescription.objects.create(title='Data Engineer', company='Data Co', text='SQL', required_skills=['sql'])
+        upsert_skill_gap_report(self.resume, self.jd)
+        untouched, _ = upsert_skill_gap_report(self.resume, other)
+        SkillGapReport.objects.filter(job_description=self.jd).update(suggested_resources=[
+            {'skill': 'Django', 'resources': []}, {'skill': 'Python', 'resources': []}
+        ])
+
+        self.jd.title = 'Senior Backend Developer'
+        self.jd.save()
+        self.assertFalse(SkillGapReport.objects.filter(is_stale=True).exists())
+
+        self.jd.required_skills = ['python', 'django', 'docker']
+        self.jd.save()
+        self.assertEqual(list(SkillGapReport.objects.filter(is_stale=True).values_list('job_description', flat=True)), [self.jd.id])
+
+        self.assertEqual(refresh_stale_skill_gap_reports(), 1)
+        report = SkillGapReport.objects.get(job_description=self.jd)
+        self.assertFalse(report.is_stale)
+        self.assertEqual(report.missing_skills, ['django', 'docker'])
+        self.assertEqual(report.suggested_resources, [{'skill': 'Django', 'resources': []}])
+        self.assertEqual(SkillGapReport.objects.get(job_description=other).updated_at, untouched.updated_at)
+        self.assertEqual(resources.call_count, 2)
+
+    def test_refresh_reads_each_batch_in_one_query(self):
+        """Test that refreshing stale reports does not load JD texts one report at a time"""
+        for i in range(3):
+            jd = JobDescription.objects.create(title=f'Role {i}', company='Tech Corp', text='Python and Docker')
+            SkillGapReport.objects.create(resume=self.resume, job_description=jd, fit_score=0, is_stale=True)
+        with self.assertNumQueries(5):  # one batch read, three updates, the empty next batch
+            self.assertEqual(refresh_stale_skill_gap_reports(), 3)
+
+class QueryCountTests(APITestCase):
+    """Test cases for keeping list endpoints at a constant number of queries per page"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            resume = Resume.objects.create(user=self.user, parsed_text='Python developer', extracted_skills=['python'])
+            jd = JobDescription.objects.create(
+                user=self.user, title=f'Developer {i}', company='Tech Corp', text='Python', required_skills=['python']
+            )
+            CoverLetter.objects.create(resume=resume, job_description=jd, generated_text='Dear team')
+            SkillGapReport.objects.create(resume=resume, job_description=jd, fit_score=100)
+            OfferLetter.objects.create(user=self.user, text='We offer you 8 LPA.')
+
+    def test_list_endpoints_use_one_query(self):
+        """Test that nested resumes, JDs and users are joined instead of fetched per row"""
+        for name in ('resume-list', 'job-description-list', 'cover-letter-list',
+                     'offer-letter-list', 'skill-gap-report-list'):
+            with self.subTest(name=name), self.assertNumQueries(1):
+                response = self.client.get(reverse(name))
+                self.assertEqual(len(response.data['results']), 5)
+
+    @override_settings(API_MAX_PAGE_SIZE=2)
+    def test_cursor_pages_are_newest_first_and_capped(self):
+        """Test that following next cursors visits every row once, newest first, at most the cap per page"""
+        url, seen = reverse('resume-list') + '?page_size=50', []
+        while url:
+            with self.assertNumQueries(1):
+                page = self.client.get(url).data
+            self.assertLessEqual(len(page['results']), 2)
+            seen += [resume['id'] for resume in page['results']]
+            url = page['next']
+        self.assertEqual(seen, list(Resume.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_cached_match_needs_no_relation_queries(self):
+        """Test that serializing a reused report does not refetch its resume, JD or owners"""
+        report = SkillGapReport.objects.select_related('resume', 'job_description').first()
+        report.inputs_fingerprint = skill_gap_inputs_fingerprint(report.resume, report.job_description)
+        report.resources_complete = True
+        report.save()
+        payload = {'resume_id': report.resume_id, 'job_description_id': report.job_description_id}
+        with self.assertNumQueries(3):  # resume, JD and the stored report
+            response = self.client.post(reverse('skill-gap-report-match'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['resume']['user']['email'], report.resume.user.email)
+
+
+class SparseFieldsetTests(APITestCase):
+    """Test cases for ?fields= / ?omit= and compact list responses"""
+
+    def setUp(self):
+        owner = get_user_model().objects.create_user(email='owner@example.com', password='testpass123')
+        self.client.force_authenticate(user=owner)
+        self.resume = Resume.objects.create(
+            user=owner, name='Jane', parsed_text='Python developer ' * 500, extracted_skills=['python']
+        )
+
+    def test_lists_are_compact_by_default(self):
+        """Test that list rows skip large columns in both the payload and the SQL"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('resume-list'))
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'file', 'name', 'email', 'phone', 'extracted_skills', 'created_at', 'updated_at'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('parsed_text', queries[0]['sql'])
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_fields_and_omit(self):
+        """Test picking fields, including nested ones, and omitting them from full rows"""
+        detail = reverse('resume-detail', args=[self.resume.id])
+        response = self.client.get(detail, {'fields': 'id,name,user'})
+        self.assertEqual(response.data, {'id': self.resume.id, 'name': 'Jane', 'user': mock.ANY})
+        self.assertEqual(response.data['user']['email'], 'owner@example.com')
+
+        row = self.client.get(reverse('resume-list'), {'fields': '*', 'omit': 'parsed_text'}).data['results'][0]
+        self.assertIn('education', row)
+        self.assertNotIn('parsed_text', row)
+        self.assertIn('parsed_text', self.client.get(detail).data)
+
+        response = self.client.get(reverse('resume-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DocumentStorageTests(APITestCase):
+    """Test cases for keeping large text in the content-addressed Document table"""
+
+    def test_texts_are_deduplicated_and_compressed(self):
+        """Test that equal texts share one compressed Document and read back unchanged"""
+        text = 'Python developer with Django and AWS experience. ' * 100
+        first = Resume.objects.create(parsed_text=text)
+        second = Resume.objects.create(parsed_text=text)
+        self.assertEqual(first.parsed_text_document_id, second.parsed_text_document_id)
+        document = Document.objects.get()
+        self.assertTrue(document.compressed)
+        self.assertLess(len(document.data), document.size)
+        self.assertEqual(Resume.objects.get(id=second.id).parsed_text, text)
+        self.assertIsNone(Resume.objects.create(parsed_text='').parsed_text_document_id)
+
+    def test_text_is_loaded_only_when_read(self):
+        """Test that fetching rows skips document bodies until the text is used"""
+        jd = JobDescription.objects.create(title='Developer', text='Python ' * 1000)
+        with CaptureQueriesContext(connection) as queries:
+            fetched = JobDescription.objects.get(id=jd.id)
+        self.assertNotIn('core_document', queries[0]['sql'])
+        with self.assertNumQueries(1):
+            self.assertEqual(fetched.text, jd.text)
+        with self.assertNumQueries(1):
+            self.assertEqual(JobDescription.objects.with_text().get(id=jd.id).text, jd.text)
+
+    def test_update_fields_and_api_use_the_text_attribute(self):
+        """Test that save(update_fields=[...]) and serializers accept the text attribute names"""
+        resume = Resume.objects.create(parsed_text='Java developer')
+        resume.parsed_text = 'Go developer'
+        resume.save(update_fields=['parsed_text'])
+        self.assertEqual(Resume.objects.get(id=resume.id).parsed_text, 'Go developer')
+
+        self.client.force_authenticate(get_user_model().objects.create_user(email='hr@example.com', password='testpass123'))
+        response = self.client.post(reverse('job-description-list'), {'title': 'Dev', 'text': 'Python and SQL'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['text'], 'Python and SQL')
+        self.assertNotIn('text_document', response.data)
+
+
+class OwnerScopingTests(APITestCase):
+    """Test cases for limiting each viewset to the caller's own rows"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.other = get_user_model().objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.rows = {}
+        for owner in (self.user, self.other):
+            resume = Resume.objects.create(user=owner, parsed_text='Python developer', extracted_skills=['python'])
+            jd = JobDescription.objects.create(
+                user=owner, title='Developer', company='Tech Corp', text='Python', required_skills=['python']
+            )
+            self.rows[owner.id] = {
+                'resume': resume.id,
+                'job-description': jd.id,
+                'cover-letter': CoverLetter.objects.create(resume=resume, job_description=jd, generated_text='Hi').id,
+                'skill-gap-report': SkillGapReport.objects.create(resume=resume, job_description=jd, fit_score=100).id,
+                'offer-letter': OfferLetter.objects.create(user=owner, text='We offer you 8 LPA.').id,
+            }
+
+    def test_lists_and_details_are_scoped_to_the_owner(self):
+        """Test that lists show only the caller's rows and other users' rows are not found"""
+        for name, own_id in self.rows[self.user.id].items():
+            with self.subTest(name=name):
+                results = self.client.get(reverse(f'{name}-list')).data['results']
+                self.assertEqual([row['id'] for row in results], [own_id])
+                other_id = self.rows[self.other.id][name]
+                response = self.client.get(reverse(f'{name}-detail', args=[other_id]))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_anonymous_requests_see_only_ownerless_rows(self):
+        """Test that anonymous lists never expose another user's data"""
+        self.client.force_authenticate(user=None)
+        anonymous = Resume.objects.create(parsed_text='Java developer', extracted_skills=['java'])
+        results = self.client.get(reverse('resume-list')).data['results']
+        self.assertEqual([row['id'] for row in results], [anonymous.id])
+
+    def test_resume_search_is_scoped_to_the_owner(self):
+        """Test that resume search never returns or reads another user's resume"""
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        with override_settings(TEXT_INDEX_DIR=index_dir):
+            update_text_index('resume')
+            response = self.client.get(reverse('resume-search'), {'q': 'python developer'})
+            self.assertEqual(
+                [row['resume']['id'] for row in response.data['results']], [self.rows[self.user.id]['resume']]
+            )
+            response = self.client.get(reverse('resume-search'), {'resume_id': self.rows[self.other.id]['resume']})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_resume_search_ranks_only_the_owners_resumes(self):
+        """Test that better matches from other users do not crowd the caller's resume out of top_k"""
+        for _ in range(3):
+            Resume.objects.create(user=self.other, parsed_text='Python developer Python Django developer')
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        with override_settings(TEXT_INDEX_DIR=index_dir):
+            update_text_index('resume')
+            update_semantic_index('resume')
+            for mode in ('text', 'semantic'):
+                with self.subTest(mode=mode):
+                    response = self.client.get(
+                        reverse('resume-search'), {'q': 'python django developer', 'mode': mode, 'top_k': 1}
+                    )
+                    self.assertEqual(
+                        [row['resume']['id'] for row in response.data['results']],
+                        [self.rows[self.user.id]['resume']]
+                    )
+
+    def test_actions_reject_another_users_resume(self):
+        """Test that generating or matching with another user's resume is not found"""
+        other = self.rows[self.other.id]
+        own_jd = self.rows[self.user.id]['job-description']
+        for url in ('/api/cover-letter/generate/', reverse('skill-gap-report-match')):
+            with self.subTest(url=url):
+                response = self.client.post(
+                    url, {'resume_id': other['resume'], 'job_description_id': own_jd}, format='json'
+                )
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """Test cases that pin hot queries to their indexes"""
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn('TEMP B-TREE', plan)  # no separate sort step
+
+    def test_hot_queries_use_indexes(self):
+        """Test owner lists, newest-first pages and report lookups against the indexes meant for them"""
+        user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.assertUsesIndex(Resume.objects.filter(user=user)[:20], 'resume_user_created_idx')
+        self.assertUsesIndex(Resume.objects.filter(created_at__lt=timezone.now())[:20], 'resume_created_idx')
+        self.assertUsesIndex(JobDescription.objects.filter(user=user)[:20], 'jd_user_created_idx')
+        self.assertUsesIndex(OfferLetter.objects.filter(user=user)[:20], 'offer_letter_user_created_idx')
+        self.assertUsesIndex(Task.objects.filter(user=user)[:20], 'task_user_created_idx')
+        self.assertUsesIndex(CoverLetter.objects.all()[:20], 'cover_letter_created_idx')
+        # SQLite builds the unique constraint's index itself, under an automatic name
+        self.assertUsesIndex(
+            SkillGapReport.objects.filter(resume_id=1, job_description_id=2), 'sqlite_autoindex_core_skillgapreport'
+        )
+
+
+class FullTextSearchTests(APITestCase):
+    """Test cases for the full-text search tables and /api/search/"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        other = get_user_model().objects.create_user(email='other@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.resume = Resume.objects.create(
+            user=self.user, name='Jane', parsed_text='Deployed services on Kubernetes clusters', extracted_skills=['go']
+        )
+        self.hidden = Resume.objects.create(user=other, parsed_text='Kubernetes administrator', extracted_skills=[])
+        self.jd = JobDescription.objects.create(
+            user=other, title='Platform Engineer', company='Tech Corp', text='Run our Kubernetes platform'
+        )
+        JobDescription.objects.create(title='Kubernetes Lead', company='Infra Inc', text='Own the clusters')
+
+    def test_ranked_results_scoped_to_the_caller(self):
+        """Test that JDs rank title matches first and resumes and offers only include the caller's"""
+        response = self.client.get(reverse('search'), {'q': 'kubernetes'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([hit['resume']['id'] for hit in results['resume']], [self.resume.id])
+        self.assertIn('<mark>Kubernetes</mark>', results['resume'][0]['snippet'])
+        titles = [hit['job_description']['title'] for hit in results['job_description']]
+        self.assertEqual(titles, ['Kubernetes Lead', 'Platform Engineer'])
+        self.assertEqual(results['offer_letter'], [])
+
+        response = self.client.get(reverse('search'), {'q': 'kubernetes', 'kind': 'job_description'})
+        self.assertEqual(list(response.data['results']), ['job_description'])
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test that edits are searchable straight away and deleted rows disappear"""
+        self.resume.parsed_text = 'Terraform modules'
+        self.resume.save()
+        self.assertEqual([hit[0] for hit in full_text_search('resume', 'terraform')], [self.resume.id])
+        self.assertEqual([hit[0] for hit in full_text_search('resume', 'kubernetes')], [self.hidden.id])
+
+        self.jd.delete()
+        self.assertEqual(len(full_text_search('job_description', 'platform')), 0)
+        self.assertEqual(rebuild_search_index('job_description'), 1)
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test that FTS operators and quotes in user input are searched as plain words"""
+        for query in ('"kubernetes', 'kubernetes OR (', 'NEAR(kubernetes', '*'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(reverse('search'), {'q': query}).status_code, status.HTTP_200_OK)
+
+    def test_admin_search_uses_index(self):
+        """Test that admin search finds rows by their long text columns"""
+        admin_user = get_user_model().objects.create_superuser(email='admin@example.com', password='testpass123')
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:core_resume_changelist'), {'q': 'clusters'})
+        self.assertEqual([r.id for r in response.context['cl'].result_list], [self.resume.id])
+
+
+class BulkCreateTests(APITestCase):
+    """Test cases for the list-accepting bulk create endpoints"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='recruiter@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def _jds(self, count):
+        return [
+            {'title': f'Engineer {i}', 'company': 'Tech Corp', 'text': f'Python and Django role number {i}'}
+            for i in range(count)
+        ]
+
+    def test_partial_failures_are_reported_per_item(self):
+        """Test that valid JDs are created while invalid ones are reported by index"""
+        items = self._jds(3)
+        items[1] = {'company': 'No Title Inc', 'text': 'Missing a title'}
+        items[2]['required_skills'] = ['go']
+        response = self.client.post('/api/job-description/bulk/', items, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([row['index'] for row in response.data['created']], [0, 2])
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertEqual(JobDescription.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(JobSkillPosting.objects.filter(job_description_id=response.data['created'][1]['id']).count(), 1)
+        self.assertEqual([hit[0] for hit in full_text_search('job_description', 'engineer 2')][:1],
+                         [response.data['created'][1]['id']])
+
+        bad = self.client.post('/api/job-description/bulk/', {'items': [{'text': 'x'}]}, format='json')
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post('/api/job-description/bulk/', {}, format='json').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_queries_do_not_grow_with_items(self):
+        """Test that a bulk request costs the same number of queries for 5 or 50 JDs"""
+        counts = []
+        for size in (5, 50):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/job-description/bulk/', {'items': self._jds(size)}, format='json')
+            self.assertEqual(len(response.data['created']), size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_skills_are_extracted_by_a_batched_task(self):
+        """Test that items without skills share one extract_skills task that fills them in"""
+        response = self.client.post('/api/resume/bulk/', [
+            {'parsed_text': 'Experienced Python developer'},
+            {'parsed_text': 'Java engineer', 'extracted_skills': ['java']},
+            {'name': 'No text'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['skill_extraction_tasks'], 1)
+        self.assertEqual(response.data['errors'][0]['index'], 2)
+        task = Task.objects.get(name='extract_skills')
+        self.assertEqual(task.payload, {'kind': 'resume', 'ids': [response.data['created'][0]['id']]})
+
+        self.assertTrue(run_task(claim_task('w1', 60)))
+        resume = Resume.objects.get(id=response.data['created'][0]['id'])
+        self.assertIn('python', resume.extracted_skills)
+        self.assertEqual(rank_resumes_for_job(['python'], [], top_k=5)[0][0], resume.id)
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite connection profile")
+class SQLiteProfileTests(TestCase):
+    """Test cases for the production SQLite settings"""
+
+    def test_connections_use_the_tuned_profile(self):
+        """Test that pragmas run on connect and transactions take the write lock up front"""
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_benchmark_compares_both_profiles(self):
+        """Test that concurrent read-then-write transactions never fail with the tuned profile"""
+        out = StringIO()
+        call_command('benchmark_sqlite', writers=4, readers=2, duration=0.5, stdout=out)
+        default, tuned = out.getvalue().splitlines()[1:]
+        self.assertTrue(default.startswith('default'))
+        self.assertTrue(tuned.startswith('tuned'))
+        self.assertIn('locked=0', tuned)
+
+
+class BatchMatchTests(TestCase):
+    """Test cases for the all-pairs batch matching command"""
+
+    def setUp(self):
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'match_all.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.checkpoint))
+        self.resumes = [
+            Resume.objects.create(extracted_skills=skills)
+            for skills in (['Python', 'Django'], ['AWS'], [])
+        ]
+        self.jds = [
+            JobDescription.objects.create(title='Backend', text='Backend role', required_skills=['python', 'aws'], preferred_skills=['django']),
+            JobDescription.objects.create(title='DevOps', text='DevOps role', required_skills=['docker']),
+        ]
+
+    def test_matches_every_pair_like_the_single_scorer(self):
+        """Test that batch rows agree with calculate_job_fit_locally and the upsert fingerprint"""
+        call_command('match_all', workers=1, chunk_size=2, checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEqual(SkillGapReport.objects.count(), 6)
+        for report in SkillGapReport.objects.select_related('resume', 'job_description'):
+            jd = report.job_description
+            fit_score, matching, missing = calculate_job_fit_locally(
+                report.resume.extracted_skills, jd.required_skills, jd.preferred_skills
+            )
+            self.assertAlmostEqual(float(report.fit_score), fit_score, places=2)
+            self.assertEqual((report.matching_skills, report.missing_skills), (matching, missing))
+            self.assertEqual(report.inputs_fingerprint, skill_gap_inputs_fingerprint(report.resume, jd, 'local'))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        out = StringIO()
+        call_command('match_all', workers=1, checkpoint=self.checkpoint, stdout=out)
+        self.assertIn('wrote 0 skill gap reports', out.getvalue())
+
+    def test_resumes_from_checkpoint(self):
+        """Test that a saved checkpoint skips resumes already written"""
+        key = hashlib.sha256(json.dumps([jd.id for jd in self.jds]).encode('utf-8')).hexdigest()
+        with open(self.checkpoint, 'w') as handle:
+            json.dump({'key': key, 'last_resume_id': self.resumes[1].id, 'written': 4}, handle)
+        call_command('match_all', workers=1, checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEqual(
+            set(SkillGapReport.objects.values_list('resume_id', flat=True)), {self.resumes[2].id}
+        )
+
+class TaskQueueTests(APITestCase):
+    """Test cases for the database task queue and worker"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        # Uploads land in a throwaway MEDIA_ROOT, never in the project's media/
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    @mock.patch('core.tasks.analyze_offer_letter_with_gemini', return_value={'ctc': '8 LPA', 'explanation': 'ok'})
+    def test_offer_analysis_runs_on_worker(self, analyze):
+        """Test that explain returns 202 and the worker fills in the analysis"""
+        response = self.client.post(reverse('offer-explain'), {'text': 'We offer you 8 LPA.'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        status_url = reverse('task-detail', args=[response.data['task_id']])
+        self.assertEqual(self.client.get(status_url).data['status'], Task.PENDING)
+
+        call_command('run_worker', burst=True, concurrency=1, stdout=StringIO())
+        task = self.client.get(status_url).data
+        self.assertEqual((task['status'], task['progress']), (Task.SUCCEEDED, 100))
+        self.assertEqual(OfferLetter.objects.get(id=response.data['offer_letter']['id']).ctc, '8 LPA')
+
+    @mock.patch('core.tasks.extract_text_from_file', return_value='Jane Doe\njane@example.com\nPython developer')
+    @mock.patch('core.tasks.parse_resume_text', return_value={'parsed_text': 'Python', 'name': 'Jane', 'skills': ['python']})
+    def test_resume_file_upload_is_queued(self, parse, extract):
+        """Test that uploading a file defers parsing to the worker"""
+        upload = SimpleUploadedFile('resume.pdf', b'%PDF-1.4 test', content_type='application/pdf')
+        response = self.client.post(reverse('resume-upload'), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['events_url'], reverse('task-events', args=[response.data['task_id']]))
+        parse.assert_not_called()
+        resume_id = response.data['resume']['id']
+
+        call_command('run_worker', burst=True, concurrency=1, stdout=StringIO())
+        self.assertEqual(Resume.objects.get(id=resume_id).extracted_skills, ['python'])
+        task = Task.objects.get(id=response.data['task_id'])
+        self.assertEqual((task.stage, task.partial_result['email']), ('saving', 'jane@example.com'))
+
+    def test_retries_then_fails(self):
+        """Test backoff retries and final failure"""
+        calls = []
+        TASKS['flaky'] = lambda task_obj: calls.append(task_obj.attempts) or 1 / 0
+        self.addCleanup(TASKS.pop, 'flaky')
+        task = enqueue('flaky', max_attempts=2)
+
+        self.assertFalse(run_task(claim_task('w1', 60)))
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.PENDING)
+        self.assertIsNone(claim_task('w1', 60))  # backing off
+
+        Task.objects.filter(id=task.id).update(run_after=timezone.now())
+        self.assertFalse(run_task(claim_task('w1', 60)))
+        task.refresh_from_db()
+        self.assertEqual((task.status, calls), (Task.FAILED, [1, 2]))
+
+    def test_missing_row_fails_without_retry(self):
+        """Test that a deleted resume fails the task at once, timestamped after the run"""
+        task = enqueue('parse_resume', {'resume_id': 0}, max_attempts=3)
+        claimed = claim_task('w1', 60)
+        before = timezone.now()
+        self.assertFalse(run_task(claimed))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.FAILED, 1))
+        self.assertIn('DoesNotExist', task.error)
+        self.assertGreaterEqual(task.finished_at, before)
+
+    def test_gemini_errors_are_retried(self):
+        """Test that a rate-limited Gemini call, wrapped in a ValidationError, backs off and retries"""
+        offer = OfferLetter.objects.create(user=self.user, text='We offer you 8 LPA.')
+        task = enqueue('analyze_offer_letter', {'offer_letter_id': offer.id}, max_attempts=3)
+        with mock.patch('core.utils.generate_with_retry', side_effect=RuntimeError('429 Resource exhausted')):
+            self.assertFalse(run_task(claim_task('w1', 60)))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.PENDING, 1))
+        self.assertIn('429 Resource exhausted', task.error)
+        self.assertGreater(task.run_after, timezone.now())
+
+    def test_expired_lock_is_reclaimed(self):
+        """Test the visibility timeout hands a stuck task to another worker"""
+        TASKS['noop'] = lambda task_obj: 'done'
+        self.addCleanup(TASKS.pop, 'noop')
+        task = enqueue('noop')
+        stuck = claim_task('w1', 60)
+        self.assertIsNone(claim_task('w2', 60))
+
+        Task.objects.filter(id=task.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = claim_task('w2', 60)
+        self.assertEqual((reclaimed.id, reclaimed.attempts), (task.id, 2))
+        self.assertTrue(run_task(reclaimed))
+        self.assertFalse(set_progress(stuck, 50))
+
+    def test_lock_expired_on_last_attempt_fails(self):
+        """Test that a task whose worker died on its last attempt is failed, not leased again"""
+        TASKS['noop'] = lambda task_obj: 'done'
+        self.addCleanup(TASKS.pop, 'noop')
+        task = enqueue('noop', max_attempts=1)
+        claim_task('w1', 60)
+        Task.objects.filter(id=task.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(claim_task('w2', 60))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.locked_by), (Task.FAILED, 1, ''))
+        self.assertIn('Lock expired', task.error)
+
+    def test_event_stream_reports_progress(self):
+        """Test that the event stream sends stage and partial results, then a final done event"""
+        TASKS['noop'] = lambda task_obj: 'done'
+        self.addCleanup(TASKS.pop, 'noop')
+        task = enqueue('noop', user=self.user)
+        set_progress(claim_task('w1', 60), 40, stage='scoring', partial_result={'fit_score': 50.0})
+
+        events = list(task_events(task.id, poll_interval=0.01, max_duration=0.05))
+        self.assertEqual(events[0], 'retry: 10\n\n')
+        self.assertEqual(len(events), 2)  # one change, then the stream times out
+        progress = json.loads(events[1].split('data: ')[1])
+        self.assertEqual((progress['stage'], progress['partial_result']), ('scoring', {'fit_score': 50.0}))
+
+        Task.objects.filter(id=task.id).update(status=Task.SUCCEEDED, progress=100, result='done')
+        response = self.client.get(reverse('task-events', args=[task.id]), HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('event: done', body)
+        self.assertIn('"result": "done"', body)
+
+    @mock.patch('core.tasks.get_learning_resources_with_gemini', return_value=[])
+    def test_job_matching_page_gets_scores_before_resources(self, resources):
+        """Test that the match task publishes scores as a partial result before fetching resources"""
+        Resume.objects.create(user=self.user, parsed_text='Python and Django', extracted_skills=['python', 'django'])
+        self.client.force_login(self.user)  # a plain Django view, so DRF's forced auth does not apply
+        response = self.client.post(reverse('job_matching'), {'description': 'Python, Docker and AWS'})
+        task_id = response.json()['task_id']
+
+        call_command('run_worker', burst=True, concurrency=1, stdout=StringIO())
+        task = Task.objects.get(id=task_id)
+        self.assertEqual((task.status, task.stage), (Task.SUCCEEDED, 'recommending'))
+        self.assertNotIn('recommendations', task.partial_result)
+        self.assertCountEqual(task.partial_result['missing_skills'], ['docker', 'aws'])
+        self.assertEqual(task.result['recommendations']['skills_to_develop'], task.partial_result['missing_skills'])
+        resources.assert_called_once_with(task.partial_result['missing_skills'])
+
+    def test_other_users_tasks_are_hidden(self):
+        """Test that the status endpoint only shows the caller's tasks"""
+        other = get_user_model().objects.create_user(email='other@example.com', password='testpass123')
+        task = enqueue('parse_resume', {'resume_id': 0}, user=other)
+        response = self.client.get(reverse('task-detail', args=[task.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class TaskLockRenewalTests(TransactionTestCase):
+    """Test cases for renewing a running task's lock from a background thread"""
+
+    def test_long_task_keeps_its_lock(self):
+        """Test that a task that never reports progress still has its lock extended"""
+        def slow(task_obj):
+            time.sleep(0.5)
+            return Task.objects.get(id=task_obj.id).locked_until.isoformat()
+
+        TASKS['slow'] = slow
+        self.addCleanup(TASKS.pop, 'slow')
+        enqueue('slow')
+        claimed = claim_task('w1', 0.3)
+        self.assertTrue(run_task(claimed, visibility_timeout=0.3))
+        renewed = Task.objects.get(id=claimed.id).result
+        self.assertGreater(renewed, claimed.locked_until.isoformat())
+
+class LLMSchedulerTests(TestCase):
+    """Test cases for priority scheduling of LLM calls"""
+
+    def _drain(self, scheduler, priorities):
+        """Queue one waiter per priority behind a held slot and return the order they run in"""
+        order = []
+        scheduler.acquire(INTERACTIVE)
+
+        def call(priority):
+            with scheduler.slot(priority, timeout=5):
+                order.append(priority)
+
+        threads = []
+        for priority in priorities:
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while scheduler.waiting() < len(threads):
+                time.sleep(0.001)
+        scheduler.release(INTERACTIVE)
+        for thread in threads:
+            thread.join()
+        return order
+
+    def test_weighted_fair_order(self):
+        """Test that interactive calls overtake queued bulk calls without starving them"""
+        scheduler = LLMScheduler(max_concurrency=1, reserved_interactive=0, weights={INTERACTIVE: 3, BULK: 1})
+        order = self._drain(scheduler, [BULK] * 3 + [INTERACTIVE] * 3)
+        self.assertEqual(order, [INTERACTIVE, INTERACTIVE, BULK, INTERACTIVE, BULK, BULK])
+
+    def test_reserved_interactive_capacity(self):
+        """Test that bulk calls cannot take the reserved slot"""
+        scheduler = LLMScheduler(max_concurrency=2, reserved_interactive=1)
+        scheduler.acquire(BULK)
+        with self.assertRaises(TimeoutError):
+            scheduler.acquire(BULK, timeout=0.05)
+        self.assertEqual(scheduler.waiting(), 0)
+        with scheduler.slot(INTERACTIVE, timeout=0.05):
+            self.assertEqual(scheduler.running(), 2)
+
+    def test_task_priority_sets_llm_class(self):
+        """Test that workers claim urgent tasks first and run them in their class"""
+        seen = []
+        TASKS['record'] = lambda task_obj: seen.append(current_priority())
+        self.addCleanup(TASKS.pop, 'record')
+        enqueue('record', priority=BULK)
+        enqueue('record', priority=INTERACTIVE)
+        for _ in range(2):
+            run_task(claim_task('w1', 60))
+        self.assertEqual(seen, [INTERACTIVE, BULK])
+
+class FanOutTests(TestCase):
+    """Test cases for running independent calls of one request concurrently"""
+
+    def test_calls_run_concurrently_in_order(self):
+        """Test that latency approaches the slowest call and results keep their order"""
+        def slow(value):
+            time.sleep(0.2)
+            return value
+
+        started = time.monotonic()
+        results = fan_out([lambda i=i: slow(i) for i in range(4)])
+        self.assertEqual(results, [0, 1, 2, 3])
+        self.assertLess(time.monotonic() - started, 0.6)
+
+    def test_priority_and_errors_propagate(self):
+        """Test that calls see the caller's LLM priority and failures reach the caller"""
+        with llm_priority(BULK):
+            self.assertEqual(fan_out([current_priority, current_priority]), [BULK, BULK])
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            fan_out([lambda: 1, fail])
+
+    @override_settings(LEARNING_RESOURCES_CHUNK_SIZE=2)
+    def test_learning_resources_are_fetched_per_chunk(self):
+        """Test that each skill chunk is a separate concurrent Gemini call"""
+        prompts = []
+
+        def fake_generate(prompt, **kwargs):
+            prompts.append(prompt)
+            time.sleep(0.2)
+            skills = json.loads(prompt.split('Missing Skills: ')[1].replace("'", '"'))
+            return mock.Mock(text=json.dumps([{'skill': s, 'resources': []} for s in skills]))
+
+        with mock.patch('core.utils.generate_with_retry', side_effect=fake_generate):
+            started = time.monotonic()
+            resources = get_learning_resources_with_gemini(['Docker', 'AWS', 'Go', 'Rust', 'SQL'])
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual([r['skill'] for r in resources], ['docker', 'aws', 'go', 'rust', 'sql'])
+
+
+class ImportResumesTests(TestCase):
+    """Test cases for the bulk resume import command"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        media = override_settings(MEDIA_ROOT=os.path.join(self.root, 'media'))
+        media.enable()
+        self.addCleanup(media.disable)
+        self.source = os.path.join(self.root, 'college')
+        os.makedirs(os.path.join(self.source, 'cse'))
+        files = {
+            'a.pdf': b'resume a',
+            'cse/b.pdf': b'resume a',  # same content as a.pdf
+            'cse/c.docx': b'resume c',
+            'notes.txt': b'not a resume',
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.source, name), 'wb') as handle:
+                handle.write(content)
+        self.checkpoint = os.path.join(self.root, 'import.json')
+
+    def _import(self):
+        texts = {'a.pdf': 'Jane Doe\njane@example.com\nPython and Django', 'c.docx': 'John Roe\nAWS and Docker'}
+        with mock.patch('core.utils.extract_text_from_file', side_effect=lambda path: texts[os.path.basename(path)]):
+            call_command('import_resumes', self.source, workers=1, checkpoint=self.checkpoint,
+                         stdout=StringIO(), stderr=StringIO())
+
+    def test_imports_new_files_once(self):
+        """Test dedupe by content hash, contact details and skill postings"""
+        self._import()
+        self.assertEqual(Resume.objects.count(), 2)
+        jane = Resume.objects.get(email='jane@example.com')
+        self.assertEqual(jane.name, 'Jane Doe')
+        self.assertIn('python', jane.extracted_skills)
+        self.assertTrue(jane.file.name.startswith('resumes/'))
+        self.assertTrue(jane.skill_postings.filter(skill='python').exists())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+        self._import()
+        self.assertEqual(Resume.objects.count(), 2)
+
+    def test_resumes_from_checkpoint(self):
+        """Test that files before the saved position are not read again"""
+        with open(self.checkpoint, 'w') as handle:
+            json.dump({'directory': self.source, 'position': 2, 'last_path': 'cse/b.pdf',
+                       'imported': 1, 'duplicates': 1, 'failed': 0}, handle)
+        self._import()
+        self.assertEqual(list(Resume.objects.values_list('name', flat=True)), ['John Roe'])
+
+class CompactDataTests(TestCase):
+    """Test cases for the retention and compaction command"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        media = override_settings(MEDIA_ROOT=os.path.join(self.root, 'media'))
+        media.enable()
+        self.addCleanup(media.disable)
+        self.archive = os.path.join(self.root, 'archive')
+        self.old = timezone.now() - timedelta(days=400)
+
+        self.resume = Resume.objects.create(parsed_text='Python developer', file=self._media_file('resumes/kept.pdf'))
+        self.jd = JobDescription.objects.create(title='Developer', text='Python role')
+        self.superseded = CoverLetter.objects.create(resume=self.resume, job_description=self.jd, generated_text='v1')
+        self.latest = CoverLetter.objects.create(resume=self.resume, job_description=self.jd, generated_text='v2')
+        self.report = SkillGapReport.objects.create(resume=self.resume, job_description=self.jd)
+        SkillGapReport.objects.filter(id=self.report.id).update(updated_at=self.old)
+        self.offer = OfferLetter.objects.create(
+            text='Offer for a unique role', file=self._media_file('offer_letters/offer.pdf')
+        )
+        OfferLetter.objects.filter(id=self.offer.id).update(created_at=self.old)
+        Document.objects.update(created_at=self.old)
+        self.orphan = self._media_file('resumes/orphan.pdf')
+        self.fresh = self._media_file('resumes/uploading.pdf', age=0)
+
+    def _media_file(self, name, age=48 * 3600):
+        path = os.path.join(self.root, 'media', name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as handle:
+            handle.write(b'x' * 100)
+        os.utime(path, (time.time() - age, time.time() - age))
+        return name
+
+    def _compact(self, *args):
+        out = StringIO()
+        call_command('compact_data', '--archive-dir', self.archive, *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_changes_nothing(self):
+        """Test that a dry run reports the work without deleting rows or files"""
+        output = self._compact('--dry-run')
+        self.assertIn('cover_letters: 1 rows', output)
+        self.assertIn('media: 1 orphan files', output)  # the offer letter still owns its file
+        self.assertEqual(CoverLetter.objects.count(), 2)
+        self.assertTrue(OfferLetter.objects.filter(id=self.offer.id).exists())
+        self.assertFalse(os.path.exists(self.archive))
+
+    def test_archives_old_rows_and_removes_orphans(self):
+        """Test that old and superseded rows are archived, then unreferenced texts and files removed"""
+        output = self._compact()
+        self.assertEqual(list(CoverLetter.objects.values_list('id', flat=True)), [self.latest.id])
+        self.assertFalse(SkillGapReport.objects.exists())
+        self.assertFalse(OfferLetter.objects.exists())
+        self.assertEqual(Document.objects.count(), 2)  # the resume and JD texts
+        self.assertIn('Reclaimed', output)
+
+        archived = {}
+        for name in os.listdir(self.archive):
+            with gzip.open(os.path.join(self.archive, name), 'rt') as handle:
+                archived[name.split('-')[0]] = [json.loads(line) for line in handle]
+        self.assertEqual([row['id'] for row in archived['cover_letters']], [self.superseded.id])
+        self.assertEqual(archived['offer_letters'][0]['text'], 'Offer for a unique role')
+        self.assertEqual(archived['offer_letters'][0]['file'], 'offer_letters/offer.pdf')
+
+        media = os.path.join(self.root, 'media')
+        self.assertTrue(os.path.exists(os.path.join(media, 'resumes/kept.pdf')))
+        self.assertTrue(os.path.exists(os.path.join(media, self.fresh)))
+        self.assertFalse(os.path.exists(os.path.join(media, self.orphan)))
+        self.assertFalse(os.path.exists(os.path.join(media, 'offer_letters/offer.pdf')))
+
+
 class ViewTests(TestCase):
     """Test cases for template views"""
     
@@ -222,8 +1408,7 @@ class IntegrationTests(TestCase):
     """Integration test cases"""
     
     def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
+        self.user = get_user_model().objects.create_user(
             email='test@example.com',
             password='testpass123'
         )
@@ -248,7 +1433,7 @@ class IntegrationTests(TestCase):
         )
         
         # 3. Test job matching
-        fit_score, missing, matching = mock_calculate_job_fit(
+        fit_score, matching, missing = calculate_job_fit_locally(
             ['python', 'django'], 
             ['python', 'django', 'aws']
         )
@@ -258,10 +1443,11 @@ class IntegrationTests(TestCase):
         self.assertIn('aws', missing)
         
         # 4. Test cover letter generation
-        cover_letter = mock_generate_cover_letter(
-            resume.parsed_text, 
-            jd.text
-        )
+        with gemini_reply("Dear Hiring Manager, ..."):
+            cover_letter = generate_cover_letter_with_gemini(
+                resume.parsed_text, 
+                jd.text
+            )
         self.assertIsInstance(cover_letter, str)
         self.assertIn('Dear Hiring Manager', cover_letter)
 
@@ -290,18 +1476,15 @@ class SecurityTests(TestCase):
     def test_input_validation(self):
         """Test input validation"""
         # Test empty inputs
-        with self.assertRaises(Exception):
-            mock_generate_cover_letter("", "Job description")
+        with self.assertRaises(ValidationError):
+            generate_cover_letter_with_gemini("", "Job description")
         
-        with self.assertRaises(Exception):
-            mock_analyze_offer_letter("")
+        with self.assertRaises(ValidationError):
+            analyze_offer_letter_with_gemini("")
         
         # Test invalid skill lists
-        with self.assertRaises(Exception):
-            mock_calculate_job_fit("not a list", ["python"])
-        
-        with self.assertRaises(Exception):
-            mock_get_learning_resources("not a list")
+        with self.assertRaises(ValidationError):
+            get_learning_resources_with_gemini("not a list")
 
 class PerformanceTests(TestCase):
     """Performance test cases"""
@@ -321,10 +1504,8 @@ class PerformanceTests(TestCase):
     def test_multiple_requests(self):
         """Test handling multiple concurrent requests"""
         # This is a basic test - in production, use proper load testing tools
-        for i in range(10):
-            result = mock_analyze_offer_letter(f"Offer letter {i}")
-            self.assertIsInstance(result, dict)
-            self.assertIn('ctc', result)
-
-# Import time for performance tests
-import time
+        with gemini_reply(OFFER_JSON):
+            for i in range(10):
+                result = analyze_offer_letter_with_gemini(f"Offer letter {i}")
+                self.assertIsInstance(result, dict)
+                self.assertIn('ctc', result)
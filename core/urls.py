@@ -9,6 +9,7 @@ router.register(r'job-description', views.JobDescriptionViewSet, basename='job-d
 router.register(r'cover-letter', views.CoverLetterViewSet, basename='cover-letter')
 router.register(r'offer-letter', views.OfferLetterViewSet, basename='offer-letter')
 router.register(r'skill-gap-report', views.SkillGapReportViewSet, basename='skill-gap-report')
+router.register(r'tasks', views.TaskViewSet, basename='task')
 
 # URL patterns
 urlpatterns = [
@@ -23,6 +24,7 @@ urlpatterns = [
 
     # API root
     path('api/', views.api_root, name='api-root'),
+    path('api/search/', views.api_search, name='search'),
 
     # Include router URLs
     path('api/', include(router.urls)),
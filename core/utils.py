@@ -10,6 +10,10 @@ from django.conf import settings
 from django.core.exceptions import ValidationError, ImproperlyConfigured
 import google.generativeai as genai
 from time import sleep
+from accounts.models import readiness_score
+from .matching import calculate_job_fit_locally
+from .llm_scheduler import get_scheduler
+from .concurrency import fan_out
 
 # Load environment variables
 API_KEY = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
@@ -79,14 +83,22 @@ def sanitize_filename(filename: str) -> str:
     return re.sub(r'[^\w\-_\.]', '', filename)
 
 def generate_with_retry(prompt: str, max_retries: int = 3, **kwargs):
-    """Helper function with retry logic for Gemini API calls"""
+    """Helper function with retry logic for Gemini API calls.
+
+    Each attempt waits for a slot from the LLM scheduler in the caller's
+    priority class (see ``core.llm_scheduler``).
+    """
+    scheduler = get_scheduler()
     for attempt in range(max_retries):
         try:
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            response = model.generate_content(prompt, **kwargs)
+            with scheduler.slot(timeout=settings.LLM_QUEUE_TIMEOUT):
+                model = genai.GenerativeModel(GEMINI_MODEL)
+                response = model.generate_content(prompt, **kwargs)
             if response.text:
                 return response
             raise ValueError("Empty response from API")
+        except TimeoutError:
+            raise
         except Exception as e:
             if attempt == max_retries - 1:
                 raise
@@ -218,21 +230,85 @@ Job Description:
     except Exception as e:
         raise ValidationError(f"Failed to calculate job fit: {str(e)}")
 
-def get_learning_resources_with_gemini(missing_skills: List[str]) -> List[Dict]:
-    """Get learning resources for missing skills."""
-    if not isinstance(missing_skills, list):
-        raise ValidationError("Missing skills must be provided as a list")
+def explain_job_fit_with_gemini(
+    resume_skills: List[str],
+    jd_text: str,
+    fit_score: float,
+    matching_skills: List[str],
+    missing_skills: List[str]
+) -> str:
+    """Ask Gemini for a short narrative explaining an already computed fit score."""
+    try:
+        prompt = (
+            "You are a career coach. In 3-4 sentences, explain this job fit result to the candidate "
+            "and what they should focus on next. Do not change the score.\n\n"
+            f"Fit score: {fit_score}\n"
+            f"Matching skills: {matching_skills}\n"
+            f"Missing skills: {missing_skills}\n"
+            f"Resume skills: {resume_skills}\n\n"
+            f"Job Description excerpt:\n{jd_text[:1000]}"
+        )
+        response = generate_with_retry(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.3,
+                max_output_tokens=250,
+            )
+        )
+        return response.text.strip()
+    except Exception as e:
+        raise ValidationError(f"Failed to explain job fit: {str(e)}")
 
-    cleaned_skills = [s.lower().strip() for s in missing_skills if s]
-    if not cleaned_skills:
-        return []
+def calculate_job_fit(
+    resume_skills: List[str],
+    jd_text: str = "",
+    required_skills: Optional[List[str]] = None,
+    preferred_skills: Optional[List[str]] = None,
+    scorer: Optional[str] = None
+) -> Tuple[float, List[str], List[str]]:
+    """Calculate job fit with the selected scorer ('local' or 'gemini').
+
+    The local scorer uses the JD's required/preferred skills, falling back to
+    skills extracted from the JD text when neither list is set.
+    """
+    scorer = scorer or getattr(settings, 'JOB_FIT_SCORER', 'local')
+    if scorer == 'gemini':
+        return calculate_job_fit_with_gemini(resume_skills, jd_text)
+    if scorer != 'local':
+        raise ValidationError(f"Unknown job fit scorer: {scorer}")
+
+    if not required_skills and not preferred_skills:
+        required_skills = extract_skills_from_text(jd_text)
+    return calculate_job_fit_locally(resume_skills, required_skills or [], preferred_skills or [])
+
+def _fallback_learning_resources(skills: List[str]) -> List[Dict]:
+    """Basic resources used when Gemini is unavailable"""
+    return [
+        {
+            "skill": skill,
+            "resources": [
+                {
+                    "title": f"Learn {skill.title()}",
+                    "url": f"https://example.com/learn-{skill}",
+                    "type": "course"
+                },
+                {
+                    "title": f"{skill.title()} Tutorial",
+                    "url": f"https://example.com/{skill}-tutorial",
+                    "type": "tutorial"
+                }
+            ]
+        }
+        for skill in skills
+    ]
 
+def _learning_resources_for_chunk(skills: List[str], fallback_limit: int) -> List[Dict]:
     try:
         prompt = (
             "For these missing skills, list up to three high-quality learning resources per skill. "
             "Return ONLY valid JSON array with items containing: "
             "skill (string) and resources (array of {title, url, type}).\n\n"
-            f"Missing Skills: {cleaned_skills}"
+            f"Missing Skills: {skills}"
         )
 
         response = generate_with_retry(
@@ -242,27 +318,33 @@ def get_learning_resources_with_gemini(missing_skills: List[str]) -> List[Dict]:
                 max_output_tokens=300,
             )
         )
-        return json.loads(response.text.strip())
+        resources = json.loads(response.text.strip())
+        return resources if isinstance(resources, list) else [resources]
     except Exception:
-        # Fallback to basic resources
-        return [
-            {
-                "skill": skill,
-                "resources": [
-                    {
-                        "title": f"Learn {skill.title()}",
-                        "url": f"https://example.com/learn-{skill}",
-                        "type": "course"
-                    },
-                    {
-                        "title": f"{skill.title()} Tutorial",
-                        "url": f"https://example.com/{skill}-tutorial",
-                        "type": "tutorial"
-                    }
-                ]
-            }
-            for skill in cleaned_skills[:5]  # Limit to 5 skills
-        ]
+        return _fallback_learning_resources(skills[:fallback_limit])
+
+def get_learning_resources_with_gemini(missing_skills: List[str]) -> List[Dict]:
+    """Get learning resources for missing skills.
+
+    Skills are sent in small chunks that run concurrently, so the wait is
+    roughly one Gemini call however many skills are missing.
+    """
+    if not isinstance(missing_skills, list):
+        raise ValidationError("Missing skills must be provided as a list")
+
+    cleaned_skills = [s.lower().strip() for s in missing_skills if s]
+    if not cleaned_skills:
+        return []
+
+    size = max(1, settings.LEARNING_RESOURCES_CHUNK_SIZE)
+    # Fallback resources are limited to the first 5 skills overall
+    chunks = fan_out([
+        lambda start=start: _learning_resources_for_chunk(
+            cleaned_skills[start:start + size], max(0, 5 - start)
+        )
+        for start in range(0, len(cleaned_skills), size)
+    ])
+    return [item for chunk in chunks for item in chunk]
     
 
 def extract_text_from_file(file_path: str) -> str:
@@ -281,8 +363,11 @@ def extract_text_from_file(file_path: str) -> str:
     
 
 def parse_resume_file(file_path):
-    text = extract_text_from_file(file_path)
+    return parse_resume_text(extract_text_from_file(file_path))
 
+
+def parse_resume_text(text: str) -> Dict:
+    """Extract structured resume fields from raw resume text with Gemini"""
     prompt = f"""
 You are an AI resume parser. Extract the following fields from the resume:
 - name
@@ -331,37 +416,70 @@ Resume:
         raise ValidationError(f"Error parsing resume with Gemini: {str(e)}")
 
 
+# Skill patterns
+SKILL_PATTERNS = [
+    re.compile(r'\b(python|java|javascript|react|angular|vue|node\.?js|django|flask|spring)\b'),
+    re.compile(r'\b(sql|mongodb|postgresql|mysql|aws|azure|gcp|docker|kubernetes|git|jenkins)\b'),
+    re.compile(r'\b(agile|scrum|html|css|bootstrap|jquery|ajax|rest|api|json|xml|soap|graphql)\b'),
+    re.compile(r'\b(machine learning|ml|ai|deep learning|neural networks|tensorflow|pytorch|scikit-learn)\b'),
+    re.compile(r'\b(project management|leadership|communication|problem solving|analytical thinking)\b'),
+]
+
+def _skills_from_doc(doc, text: str) -> List[str]:
+    skills = set()
+    
+    # Pattern matching
+    for pattern in SKILL_PATTERNS:
+        skills.update(pattern.findall(text))
+    
+    # Noun phrases
+    for chunk in doc.noun_chunks:
+        if len(chunk.text.split()) <= 3:
+            skills.add(chunk.text.lower())
+    
+    return sorted(skills)[:20]  # Return sorted and limited list
+
 def extract_skills_from_text(text: str) -> List[str]:
     """Extract skills from text using NLP and pattern matching."""
     if not text:
         return []
     
     try:
-        doc = NLP(text.lower())
-        skills = set()
-        
-        # Skill patterns
-        patterns = [
-            r'\b(python|java|javascript|react|angular|vue|node\.?js|django|flask|spring)\b',
-            r'\b(sql|mongodb|postgresql|mysql|aws|azure|gcp|docker|kubernetes|git|jenkins)\b',
-            r'\b(agile|scrum|html|css|bootstrap|jquery|ajax|rest|api|json|xml|soap|graphql)\b',
-            r'\b(machine learning|ml|ai|deep learning|neural networks|tensorflow|pytorch|scikit-learn)\b',
-            r'\b(project management|leadership|communication|problem solving|analytical thinking)\b'
-        ]
-        
-        # Pattern matching
-        for pattern in patterns:
-            skills.update(re.findall(pattern, text.lower()))
-        
-        # Noun phrases
-        for chunk in doc.noun_chunks:
-            if len(chunk.text.split()) <= 3:
-                skills.add(chunk.text.lower())
-        
-        return sorted(skills)[:20]  # Return sorted and limited list
+        text = text.lower()
+        return _skills_from_doc(NLP(text), text)
+    except Exception as e:
+        raise ValidationError(f"Failed to extract skills: {str(e)}")
+
+def extract_skills_from_texts(texts: List[str], batch_size: int = 64) -> List[List[str]]:
+    """Extract skills from many texts at once, batching them through spaCy's pipeline."""
+    lowered = [(text or '').lower() for text in texts]
+    try:
+        docs = NLP.pipe(lowered, batch_size=batch_size)
+        return [_skills_from_doc(doc, text) if text else [] for doc, text in zip(docs, lowered)]
     except Exception as e:
         raise ValidationError(f"Failed to extract skills: {str(e)}")
 
+EMAIL_PATTERN = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_PATTERN = re.compile(r'(?:\+?\d[\d\s().-]{8,}\d)')
+
+def extract_contact_details(text: str) -> Dict[str, str]:
+    """Best-effort name, email and phone from resume text, without calling Gemini."""
+    email = EMAIL_PATTERN.search(text or '')
+    phone = PHONE_PATTERN.search(text or '')
+    name = ''
+    for line in (text or '').splitlines():
+        line = line.strip()
+        if line:
+            # Resumes usually open with the candidate's name
+            if len(line.split()) <= 4 and not any(ch.isdigit() or ch == '@' for ch in line):
+                name = line[:255]
+            break
+    return {
+        'name': name,
+        'email': email.group(0)[:254] if email else '',
+        'phone': phone.group(0).strip()[:20] if phone else '',
+    }
+
 def optimize_resume_for_ats(resume_text: str, job_description: str = "") -> str:
     """Optimize resume text for Applicant Tracking Systems."""
     try:
@@ -384,17 +502,6 @@ def optimize_resume_for_ats(resume_text: str, job_description: str = "") -> str:
 def calculate_user_readiness_score(user_profile) -> float:
     """Calculate a readiness score based on user's job search activity."""
     try:
-        score = 20.0  # Base score
-        
-        # Applications submitted
-        score += min(user_profile.total_applications * 2, 20)
-        
-        # Interviews attended
-        score += min(user_profile.interviews_attended * 5, 30)
-        
-        # Offers received
-        score += min(user_profile.offers_received * 10, 30)
-        
-        return min(score, 100.0)
+        return float(readiness_score(user_profile.applications, user_profile.interviews, user_profile.offers))
     except Exception as e:
         raise ValidationError(f"Failed to calculate readiness score: {str(e)}")
\ No newline at end of file
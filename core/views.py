@@ -1,36 +1,259 @@
-from rest_framework import status, viewsets
+from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.conf import settings
+from django.db import transaction
 from django.views.decorators.csrf import csrf_exempt
 import os
 import json
 import logging
 import tempfile
-from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport
+from .models import Resume, JobDescription, CoverLetter, OfferLetter, SkillGapReport, Task
 from .serializers import (
     ResumeSerializer, JobDescriptionSerializer, CoverLetterSerializer,
-    OfferLetterSerializer, SkillGapReportSerializer,
-    ResumeUploadSerializer, JobMatchSerializer, CoverLetterGenerateSerializer,
+    OfferLetterSerializer, SkillGapReportSerializer, TaskSerializer,
+    ResumeSummarySerializer, ResumeUploadSerializer, ResumeBulkItemSerializer, JobMatchSerializer,
+    JobRecommendationQuerySerializer, CandidateRankingQuerySerializer, TextSearchQuerySerializer,
+    FullTextSearchQuerySerializer,
+    CoverLetterGenerateSerializer,
     OfferLetterAnalyzeSerializer, ATSOptimizeSerializer
 )
 from .utils import (
     parse_resume_file, optimize_resume_for_ats,
     calculate_user_readiness_score, extract_skills_from_text, generate_cover_letter_with_gemini,
     analyze_offer_letter_with_gemini,
-    calculate_job_fit_with_gemini,
+    calculate_job_fit,
+    explain_job_fit_with_gemini,
     get_learning_resources_with_gemini,
     extract_text_from_file,
 )
+from .reports import upsert_skill_gap_report
+from .tasks import enqueue, enqueue_many
+from .llm_scheduler import INTERACTIVE
+from .concurrency import fan_out
+from .events import EventStreamRenderer, task_events
+from .indexing import (
+    index_job_descriptions, index_resumes, recommend_job_descriptions, matching_skills_for, rank_resumes_for_job
+)
+from .relevance import search_documents, text_relevance
+from .embeddings import semantic_search, cosine_similarity
+from .search import ANY_OWNER, SEARCH_KINDS, full_text_search, index_objects
+from accounts.models import UserProfile
+from accounts.permissions import IsRecruiter
+
+def task_links(task):
+    """Where clients can follow a queued task: polling status and live events"""
+    return {
+        'task_id': task.id,
+        'status_url': reverse('task-detail', args=[task.id]),
+        'events_url': reverse('task-events', args=[task.id]),
+    }
+
+def _split_fields(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+def _select_related_paths(related, prefix=''):
+    for name, nested in related.items():
+        path = f"{prefix}{name}"
+        children = list(_select_related_paths(nested, f"{path}__"))
+        yield from children or [path]
+
+class SparseFieldsetMixin:
+    """``?fields=a,b`` and ``?omit=c`` on list and detail responses.
+
+    Columns that no requested field needs are deferred in SQL and joins for
+    unrequested relations are dropped. Lists default to the compact
+    ``list_fields``; ``?fields=*`` returns every field.
+    """
+    list_fields = None
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """Field names to render for this request, or None for all of them"""
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            params = self.request.query_params
+            available = list(self.get_serializer_class()().fields)
+            requested = _split_fields(params.get('fields'))
+            omitted = _split_fields(params.get('omit'))
+            unknown = [name for name in requested + omitted if name not in available and name != '*']
+            if unknown:
+                raise serializers.ValidationError({'fields': [f"Unknown field: {name}" for name in unknown]})
+
+            if '*' in requested:
+                fields = available
+            elif requested:
+                fields = requested
+            elif self.action == 'list' and self.list_fields:
+                fields = list(self.list_fields)
+            else:
+                fields = available
+            fields = [name for name in fields if name not in omitted]
+            self._sparse_fields = None if fields == available else fields
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        # Pagination cursors read id and created_at, so those always load
+        keep = set(fields) | {'id', 'created_at'}
+        # Text attributes are read through their Document foreign keys
+        keep |= {fk for name, fk in getattr(queryset.model, 'document_fields', {}).items() if name in keep}
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            paths = [path for path in _select_related_paths(related) if path.split('__')[0] in keep]
+            queryset = queryset.select_related(None)
+            if paths:
+                queryset = queryset.select_related(*paths)
+        return queryset.defer(*[
+            field.name for field in queryset.model._meta.concrete_fields
+            if not field.primary_key and field.name not in keep and field.attname not in keep
+        ])
+
+def owned_by(queryset, user, owner_field='user'):
+    """Rows of ``user``, or the ownerless rows for an anonymous user"""
+    if not user.is_authenticated:
+        return queryset.filter(**{f"{owner_field}__isnull": True})
+    return queryset.filter(**{owner_field: user})
+
+class OwnerScopedMixin:
+    """Limit a viewset to the requesting user's rows; anonymous requests see ownerless rows.
+
+    The owner filter leads the (user, created_at, id) indexes, so a list
+    reads one user's rows instead of the whole table.
+    """
+    owner_field = 'user'
+
+    def get_queryset(self):
+        return owned_by(super().get_queryset(), self.request.user, self.owner_field)
+
+    def get_unscoped_queryset(self):
+        """Every row, for actions that deliberately work across users (posted job descriptions)"""
+        return super().get_queryset()
+
+# Rows per queued extract_skills task
+SKILL_EXTRACTION_BATCH = 100
+
+class BulkCreateMixin:
+    """``POST <list>/bulk/`` with a list of objects (or ``{"items": [...]}``).
+
+    Every item is validated first; the valid ones are written with one
+    ``bulk_create`` in one transaction and items without skills share
+    batched ``extract_skills`` tasks. Invalid items are reported by index
+    and do not hold back the rest.
+    """
+    bulk_serializer_class = None
+    search_kind = None
+    # Rows with all of these empty get an extract_skills task
+    skills_fields = ()
+    # Called with the created rows to update the skill index, e.g. staticmethod(index_resumes)
+    skill_indexer = None
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create many rows at once, reporting failures per item"""
+        items = request.data.get('items') if hasattr(request.data, 'get') else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'items': ['Expected a non-empty list of objects.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'items': [f"At most {settings.BULK_CREATE_MAX_ITEMS} items per request."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        model = self.get_queryset().model
+        user = request.user if request.user.is_authenticated else None
+        # One serializer validates every item, so its fields are only built once
+        validator = self.bulk_serializer_class()
+        positions, objects, errors = [], [], []
+        for index, item in enumerate(items):
+            try:
+                data = validator.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': serializers.as_serializer_error(exc)})
+                continue
+            positions.append(index)
+            objects.append(model(user=user, **data))
+
+        tasks = 0
+        if objects:
+            # bulk_create skips save() and post_save, so documents and indexes are written here
+            with transaction.atomic():
+                model.store_documents(objects)
+                objects = model.objects.bulk_create(objects)
+                if self.skill_indexer is not None:
+                    self.skill_indexer(objects)
+                index_objects(self.search_kind, objects)
+                pending = [
+                    obj.id for obj in objects
+                    if self.skills_fields and not any(getattr(obj, name) for name in self.skills_fields)
+                ]
+                tasks = enqueue_many('extract_skills', [
+                    {'kind': self.search_kind, 'ids': pending[start:start + SKILL_EXTRACTION_BATCH]}
+                    for start in range(0, len(pending), SKILL_EXTRACTION_BATCH)
+                ], user=request.user)
+
+        created = self.serializer_class(objects, many=True, fields=list(self.list_fields)).data
+        return Response({
+            'created': [{'index': index, **row} for index, row in zip(positions, created)],
+            'errors': errors,
+            'skill_extraction_tasks': tasks,
+        }, status=status.HTTP_201_CREATED if objects else status.HTTP_400_BAD_REQUEST)
+
+def text_search_response(request, kind, queryset, result_serializer, scoped=False):
+    """Run a BM25 or semantic search for a query, a resume's text and/or a JD's text.
+
+    A ``scoped`` search ranks only the queryset's rows, so the caller's own
+    matches are not pushed out of ``top_k`` by rows they cannot see.
+    """
+    serializer = TextSearchQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    params = serializer.validated_data
+    query = [params.get('q', '')]
+    if 'resume_id' in params:
+        query.append(get_object_or_404(owned_by(Resume.objects, request.user), id=params['resume_id']).parsed_text)
+    if 'job_description_id' in params:
+        jd = get_object_or_404(JobDescription, id=params['job_description_id'])
+        query.append(f"{jd.title} {jd.text}")
+
+    search = semantic_search if params['mode'] == 'semantic' else search_documents
+    doc_ids = set(queryset.values_list('id', flat=True)) if scoped else None
+    hits = search(kind, ' '.join(query), top_k=params['top_k'], doc_ids=doc_ids)
+    objects = queryset.in_bulk([doc_id for doc_id, _ in hits])
+    return Response({
+        'results': [
+            {kind: result_serializer(objects[doc_id]).data, 'score': score}
+            for doc_id, score in hits if doc_id in objects
+        ]
+    })
 
-class ResumeViewSet(viewsets.ModelViewSet):
-    queryset = Resume.objects.all()
+class ResumeViewSet(OwnerScopedMixin, SparseFieldsetMixin, BulkCreateMixin, viewsets.ModelViewSet):
+    queryset = Resume.objects.select_related('user', 'parsed_text_document')
     serializer_class = ResumeSerializer
+    bulk_serializer_class = ResumeBulkItemSerializer
+    search_kind = 'resume'
+    skills_fields = ('extracted_skills',)
+    skill_indexer = staticmethod(index_resumes)
+    list_fields = ('id', 'file', 'name', 'email', 'phone', 'extracted_skills', 'created_at', 'updated_at')
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
     @action(detail=False, methods=['post'])
@@ -40,26 +263,15 @@ class ResumeViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             resume = serializer.save(user=request.user)
             
-            # Parse the uploaded file if provided
+            # Parsing a file is slow, so it runs on the background worker
             if resume.file:
-                file_path = resume.file.path
-                parsed_data = parse_resume_file(file_path)
-                
-                # Update resume with parsed data
-                resume.parsed_text = parsed_data.get('parsed_text', '')
-                resume.name = parsed_data.get('name', '')
-                resume.email = parsed_data.get('email', '')
-                resume.phone = parsed_data.get('phone', '')
-                resume.extracted_skills = parsed_data.get('skills', [])
-                resume.education = parsed_data.get('education', [])
-                resume.experience = parsed_data.get('experience', [])
-                
-                # If no skills found, try to extract from text
-                if not resume.extracted_skills and resume.parsed_text:
-                    resume.extracted_skills = extract_skills_from_text(resume.parsed_text)
-                
-                resume.save()
-            elif resume.parsed_text and not resume.extracted_skills:
+                task = enqueue('parse_resume', {'resume_id': resume.id}, user=request.user)
+                return Response({
+                    **task_links(task),
+                    'resume': ResumeSerializer(resume).data,
+                }, status=status.HTTP_202_ACCEPTED)
+
+            if resume.parsed_text and not resume.extracted_skills:
                 # Extract skills from provided text
                 resume.extracted_skills = extract_skills_from_text(resume.parsed_text)
                 resume.save()
@@ -72,7 +284,7 @@ class ResumeViewSet(viewsets.ModelViewSet):
         """Generate ATS-optimized resume"""
         serializer = ATSOptimizeSerializer(data=request.data)
         if serializer.is_valid():
-            resume = get_object_or_404(Resume, id=serializer.validated_data['resume_id'])
+            resume = get_object_or_404(self.get_queryset(), id=serializer.validated_data['resume_id'])
             
             job_description_text = ""
             if 'job_description_id' in serializer.validated_data:
@@ -92,23 +304,105 @@ class ResumeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class JobDescriptionViewSet(viewsets.ModelViewSet):
-    queryset = JobDescription.objects.all()
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text or semantic (mode=semantic) search over resumes"""
+        return text_search_response(request, 'resume', self.get_queryset(), ResumeSummarySerializer, scoped=True)
+
+class JobDescriptionViewSet(OwnerScopedMixin, SparseFieldsetMixin, BulkCreateMixin, viewsets.ModelViewSet):
+    queryset = JobDescription.objects.select_related('user', 'text_document')
     serializer_class = JobDescriptionSerializer
+    bulk_serializer_class = JobDescriptionSerializer
+    search_kind = 'job_description'
+    skills_fields = ('required_skills', 'preferred_skills')
+    skill_indexer = staticmethod(index_job_descriptions)
+    list_fields = ('id', 'title', 'company', 'required_skills', 'preferred_skills', 'created_at')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class CoverLetterViewSet(viewsets.ModelViewSet):
-    queryset = CoverLetter.objects.all()
+    @action(detail=False, methods=['get'])
+    def recommended(self, request):
+        """Top job descriptions for a resume, ranked by the skill index"""
+        serializer = JobRecommendationQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            params = serializer.validated_data
+            resume = get_object_or_404(owned_by(Resume.objects, request.user), id=params['resume_id'])
+            offset, limit = params['offset'], params['limit']
+
+            ranked = list(recommend_job_descriptions(
+                resume.extracted_skills,
+                company=params.get('company'),
+                created_after=params.get('created_after'),
+                created_before=params.get('created_before')
+            )[offset:offset + limit + 1])
+            has_more = len(ranked) > limit
+            ranked = ranked[:limit]
+
+            jd_ids = [row['job_description_id'] for row in ranked]
+            # Recommendations cover every posted JD, not just the caller's
+            jds = self.get_unscoped_queryset().in_bulk(jd_ids)
+            matches = matching_skills_for(resume.extracted_skills, jd_ids)
+
+            return Response({
+                'resume_id': resume.id,
+                'next_offset': offset + limit if has_more else None,
+                'results': [
+                    {
+                        'job_description': JobDescriptionSerializer(jds[row['job_description_id']]).data,
+                        'fit_score': round(row['fit_score'], 2),
+                        'matching_skills': matches[row['job_description_id']],
+                    }
+                    for row in ranked if row['job_description_id'] in jds
+                ]
+            })
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text or semantic (mode=semantic) search over job descriptions"""
+        return text_search_response(request, 'job_description', self.get_unscoped_queryset(), JobDescriptionSerializer)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsRecruiter])
+    def candidates(self, request, pk=None):
+        """Top resumes for a job description, ranked locally without LLM calls"""
+        jd = self.get_object()
+        serializer = CandidateRankingQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            ranked = rank_resumes_for_job(
+                jd.required_skills,
+                jd.preferred_skills,
+                top_k=serializer.validated_data['top_k']
+            )
+            resumes = Resume.objects.in_bulk([resume_id for resume_id, _, _ in ranked])
+            return Response({
+                'job_description_id': jd.id,
+                'results': [
+                    {
+                        'resume': ResumeSummarySerializer(resumes[resume_id]).data,
+                        'fit_score': fit_score,
+                        'matching_skills': matching_skills,
+                    }
+                    for resume_id, fit_score, matching_skills in ranked if resume_id in resumes
+                ]
+            })
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class CoverLetterViewSet(OwnerScopedMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    # The serializer nests the resume, the JD, both owners and both texts
+    queryset = CoverLetter.objects.select_related(
+        'resume__user', 'resume__parsed_text_document', 'job_description__user', 'job_description__text_document'
+    )
+    owner_field = 'resume__user'
     serializer_class = CoverLetterSerializer
+    list_fields = ('id', 'resume_id', 'job_description_id', 'created_at')
 
     @action(detail=False, methods=['post'])
     def generate(self, request):
         """Generate cover letter"""
         serializer = CoverLetterGenerateSerializer(data=request.data)
         if serializer.is_valid():
-            resume = get_object_or_404(Resume, id=serializer.validated_data['resume_id'])
+            resume = get_object_or_404(owned_by(Resume.objects, request.user), id=serializer.validated_data['resume_id'])
             jd = get_object_or_404(JobDescription, id=serializer.validated_data['job_description_id'])
             custom_prompt = serializer.validated_data.get('custom_prompt', '')
             
@@ -129,9 +423,10 @@ class CoverLetterViewSet(viewsets.ModelViewSet):
             return Response(CoverLetterSerializer(cover_letter).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class OfferLetterViewSet(viewsets.ModelViewSet):
-    queryset = OfferLetter.objects.all()
+class OfferLetterViewSet(OwnerScopedMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = OfferLetter.objects.select_related('user', 'text_document')
     serializer_class = OfferLetterSerializer
+    list_fields = ('id', 'file', 'ctc', 'probation_period', 'notice_period', 'risk_flags', 'created_at')
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
     @action(detail=False, methods=['post'])
@@ -141,57 +436,69 @@ class OfferLetterViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             offer_letter = serializer.save(user=request.user)
             
-            # Extract text from file or use provided text
-            offer_text = offer_letter.text or ""
-            if offer_letter.file:
-                offer_text = extract_text_from_file(offer_letter.file.path)
-            
-            # Analyze offer letter using AI
-            analysis = analyze_offer_letter_with_gemini(offer_text)
-            
-            # Update offer letter with analysis
-            offer_letter.explanation = analysis.get('explanation', '')
-            offer_letter.risk_flags = analysis.get('risk_flags', [])
-            offer_letter.ctc = analysis.get('ctc', '')
-            offer_letter.probation_period = analysis.get('probation_period', '')
-            offer_letter.notice_period = analysis.get('notice_period', '')
-            offer_letter.save()
-            
-            return Response(OfferLetterSerializer(offer_letter).data, status=status.HTTP_201_CREATED)
+            # Text extraction and the Gemini call run on the background worker
+            task = enqueue('analyze_offer_letter', {'offer_letter_id': offer_letter.id}, user=request.user)
+            return Response({
+                **task_links(task),
+                'offer_letter': OfferLetterSerializer(offer_letter).data,
+            }, status=status.HTTP_202_ACCEPTED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class SkillGapReportViewSet(viewsets.ModelViewSet):
-    queryset = SkillGapReport.objects.all()
+class TaskViewSet(OwnerScopedMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Status, progress and result of background tasks"""
+    queryset = Task.objects.all()
+    serializer_class = TaskSerializer
+    list_fields = ('id', 'name', 'priority', 'status', 'stage', 'progress', 'created_at', 'finished_at')
+
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def events(self, request, pk=None):
+        """Server-sent events with the task's stage, progress and partial results"""
+        task = self.get_object()
+        response = StreamingHttpResponse(task_events(task.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+
+class SkillGapReportViewSet(OwnerScopedMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = SkillGapReport.objects.select_related(
+        'resume__user', 'resume__parsed_text_document', 'job_description__user', 'job_description__text_document'
+    )
+    owner_field = 'resume__user'
     serializer_class = SkillGapReportSerializer
+    list_fields = ('id', 'resume_id', 'job_description_id', 'fit_score', 'is_stale', 'created_at', 'updated_at')
 
     @action(detail=False, methods=['post'])
     def match(self, request):
         """Match resume with job description and calculate fit score"""
         serializer = JobMatchSerializer(data=request.data)
         if serializer.is_valid():
-            resume = get_object_or_404(Resume, id=serializer.validated_data['resume_id'])
-            jd = get_object_or_404(JobDescription, id=serializer.validated_data['job_description_id'])
-            
-            # Calculate job fit
-            fit_score, missing_skills, matching_skills = calculate_job_fit_with_gemini(
-                resume.extracted_skills, 
-                jd.required_skills + jd.preferred_skills
+            resume = get_object_or_404(
+                owned_by(Resume.objects.select_related('user').with_text(), request.user),
+                id=serializer.validated_data['resume_id']
+            )
+            jd = get_object_or_404(
+                JobDescription.objects.select_related('user').with_text(), id=serializer.validated_data['job_description_id']
             )
             
-            # Get learning resources for missing skills
-            suggested_resources = get_learning_resources_with_gemini(missing_skills)
-            
-            # Save skill gap report
-            skill_gap_report = SkillGapReport.objects.create(
-                resume=resume,
-                job_description=jd,
-                fit_score=fit_score,
-                missing_skills=missing_skills,
-                matching_skills=matching_skills,
-                suggested_resources=suggested_resources
+            # Reuse the stored report unless the resume/JD inputs changed
+            skill_gap_report, computed = upsert_skill_gap_report(
+                resume, jd, scorer=serializer.validated_data.get('scorer')
             )
             
-            return Response(SkillGapReportSerializer(skill_gap_report).data, status=status.HTTP_201_CREATED)
+            data = SkillGapReportSerializer(skill_gap_report).data
+            calls = [
+                lambda: text_relevance(resume.parsed_text, jd.text),
+                lambda: cosine_similarity(resume.parsed_text, jd.text),
+            ]
+            if serializer.validated_data.get('explain'):
+                calls.append(lambda: explain_job_fit_with_gemini(
+                    resume.extracted_skills, jd.text, skill_gap_report.fit_score,
+                    skill_gap_report.matching_skills, skill_gap_report.missing_skills
+                ))
+            data['text_relevance'], data['semantic_score'], *explanation = fan_out(calls)
+            if explanation:
+                data['explanation'] = explanation[0]
+            return Response(data, status=status.HTTP_201_CREATED if computed else status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
@@ -202,7 +509,7 @@ class SkillGapReportViewSet(viewsets.ModelViewSet):
         
         if resume_id and jd_id:
             try:
-                skill_gap_report = SkillGapReport.objects.get(
+                skill_gap_report = self.get_queryset().get(
                     resume_id=resume_id,
                     job_description_id=jd_id
                 )
@@ -226,11 +533,46 @@ def api_root(request):
         'resume_generate': '/resume/generate/',
         'cover_letter': '/cover-letter/generate/',
         'job_match': '/skill-gap-report/match/',
+        'job_recommendations': '/job-description/recommended/',
+        'job_search': '/job-description/search/',
+        'resume_search': '/resume/search/',
         'skills_gaps': '/skill-gap-report/gaps/',
         'offer_explain': '/offer-letter/explain/',
         'user_profile': '/user-profile/profile/',
+        'tasks': '/tasks/',
+        'search': '/search/',
     })
 
+@api_view(['GET'])
+def api_search(request):
+    """Ranked full-text search over job descriptions and the caller's resumes and offer letters"""
+    serializer = FullTextSearchQuerySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    params = serializer.validated_data
+    owner = request.user.id if request.user.is_authenticated else None
+    # Rows come back in compact list form; rank scores are only comparable within a kind
+    result_serializers = {
+        'resume': (ResumeSerializer, ResumeViewSet.list_fields),
+        'job_description': (JobDescriptionSerializer, JobDescriptionViewSet.list_fields),
+        'offer_letter': (OfferLetterSerializer, OfferLetterViewSet.list_fields),
+    }
+    results = {}
+    for kind, spec in SEARCH_KINDS.items():
+        if params.get('kind') and kind not in params['kind']:
+            continue
+        hits = full_text_search(
+            kind, params['q'], top_k=params['top_k'], user_id=owner if spec.owner_scoped else ANY_OWNER
+        )
+        result_serializer, fields = result_serializers[kind]
+        objects = spec.model.objects.only(*fields).in_bulk([pk for pk, _, _ in hits])
+        results[kind] = [
+            {kind: result_serializer(objects[pk], fields=fields).data, 'score': score, 'snippet': snippet}
+            for pk, score, snippet in hits if pk in objects
+        ]
+    return Response({'results': results})
+
 # Template Views
 def home(request):
     """Home page view"""
@@ -248,22 +590,14 @@ def resume_upload_view(request):
             return JsonResponse({"success": False, "message": "No file uploaded."})
 
         try:
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(resume_file.name)[-1]) as temp_file:
-                for chunk in resume_file.chunks():
-                    temp_file.write(chunk)
-                temp_file_path = temp_file.name
-
-            # Parse resume
-            parsed_data = parse_resume_file(temp_file_path)
-
-            # Delete temp file
-            os.remove(temp_file_path)
-
-            return JsonResponse({
-                "success": True,
-                "data": parsed_data
-            })
+            resume = Resume.objects.create(
+                user=request.user if request.user.is_authenticated else None,
+                file=resume_file
+            )
+            request.session['resume_id'] = resume.id
+            # The page follows the worker's progress through the task's event stream
+            task = enqueue('parse_resume', {'resume_id': resume.id}, user=request.user, priority=INTERACTIVE)
+            return JsonResponse({"success": True, "resume_id": resume.id, **task_links(task)})
 
         except Exception as e:
             return JsonResponse({
@@ -275,7 +609,6 @@ def resume_upload_view(request):
     else:
         return JsonResponse({"success": False, "message": "Invalid request method."})
 
-@csrf_exempt
 def job_matching_view(request):
     if request.method == 'GET':
         return render(request, 'core/job_matching.html')  # Load the HTML page on GET
@@ -285,29 +618,22 @@ def job_matching_view(request):
             data = request.POST
             jd_text = data.get("description", "")
 
-            # TODO: Fetch skills from session or temp Resume (for now hardcoded or fetched by latest)
-            resume = Resume.objects.last()
+            # The user's newest resume, or the one uploaded earlier in this session
+            if request.user.is_authenticated:
+                resume = Resume.objects.filter(user=request.user).first()
+            else:
+                resume = Resume.objects.filter(id=request.session.get('resume_id'), user__isnull=True).first()
             if not resume:
                 return JsonResponse({"success": False, "message": "No resume found"})
 
-            fit_score, matching_skills, missing_skills = calculate_job_fit_with_gemini(
-                resume.extracted_skills,
-                jd_text  # ✅ send full JD to Gemini
-            )
-
-            return JsonResponse({
-                "success": True,
-                "fit_score": fit_score,
-                "skills_match": fit_score,  # Optional
-                "experience_match": 0,
-                "education_match": 0,
-                "matching_skills": matching_skills,
-                "missing_skills": missing_skills,
-                "recommendations": {
-                    "skills_to_develop": missing_skills,
-                    "learning_resources": get_learning_resources_with_gemini(missing_skills)
-                }
-            })
+            # Scoring and learning resources run on the worker; the page renders
+            # the scores from the task's partial result as soon as they are ready
+            task = enqueue('match_job', {
+                'resume_id': resume.id,
+                'jd_text': jd_text,
+                'scorer': data.get("scorer") or None,
+            }, user=request.user, priority=INTERACTIVE)
+            return JsonResponse({"success": True, **task_links(task)})
 
         except Exception as e:
             return JsonResponse({"success": False, "message": str(e)})
@@ -408,10 +734,16 @@ def offer_analysis_view(request):
     else:
         return JsonResponse({"success": False, "message": "Only POST allowed."})
 
+def _stored_profile(request):
+    """The requesting user's profile row, with its stored readiness score"""
+    if not request.user.is_authenticated:
+        return None
+    return UserProfile.objects.filter(user=request.user).first()
+
 def dashboard(request):
     """Dashboard view"""
-    return render(request, 'core/dashboard.html')
+    return render(request, 'core/dashboard.html', {'profile': _stored_profile(request)})
 
 def profile(request):
     """User profile view"""
-    return render(request, 'core/profile.html')
\ No newline at end of file
+    return render(request, 'core/profile.html', {'profile': _stored_profile(request)})
\ No newline at end of file
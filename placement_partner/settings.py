@@ -48,6 +48,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.LLMPriorityMiddleware",
 ]
 
 ROOT_URLCONF = "placement_partner.urls"
@@ -78,13 +79,39 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.getenv('CONN_MAX_AGE', '600')),  # seconds; 0 = a new connection per request
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Production SQLite profile. WAL lets readers run alongside the single writer,
+# writers wait up to the busy timeout instead of failing, and IMMEDIATE
+# transactions take the write lock up front so a read-then-write transaction
+# cannot hit an unrecoverable "database is locked" when upgrading its lock.
+SQLITE_TUNED = os.getenv('SQLITE_TUNED', 'True').lower() == 'true'
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '20'))  # seconds
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA synchronous=NORMAL;"  # durable across crashes in WAL mode, only the last commit can be lost on power failure
+    "PRAGMA mmap_size=268435456;"  # 256 MB
+    "PRAGMA cache_size=-65536;"  # 64 MB
+    "PRAGMA temp_store=MEMORY;"
+)
+if SQLITE_TUNED:
+    DATABASES['default']['OPTIONS'] = {
+        'timeout': SQLITE_BUSY_TIMEOUT,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': SQLITE_PRAGMAS,
+    }
+
 # Use PostgreSQL in production
 if os.getenv('DATABASE_URL'):
     import dj_database_url
-    DATABASES['default'] = dj_database_url.parse(os.getenv('DATABASE_URL'))
+    DATABASES['default'] = dj_database_url.parse(
+        os.getenv('DATABASE_URL'),
+        conn_max_age=DATABASES['default']['CONN_MAX_AGE'],
+        conn_health_checks=True,
+    )
 
 
 # AUTH_USER
@@ -157,6 +184,33 @@ CORS_ALLOW_CREDENTIALS = True
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_FILE_TYPES = ['pdf', 'docx', 'doc']
 
+# Job fit scoring: 'local' (deterministic skill overlap) or 'gemini'
+JOB_FIT_SCORER = os.getenv('JOB_FIT_SCORER', 'local')
+
+# On-disk search indexes (memory-mapped by every worker)
+TEXT_INDEX_DIR = Path(os.getenv('TEXT_INDEX_DIR', BASE_DIR / 'indexes'))
+
+# Semantic search: optional local sentence-transformers model, else hashed vectors
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', '')
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '256'))
+SEMANTIC_NPROBE = int(os.getenv('SEMANTIC_NPROBE', '16'))
+
+# Background tasks (run with `python manage.py run_worker`)
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '3'))
+TASK_VISIBILITY_TIMEOUT = int(os.getenv('TASK_VISIBILITY_TIMEOUT', '300'))  # seconds
+TASK_RETRY_DELAY = int(os.getenv('TASK_RETRY_DELAY', '10'))  # seconds, doubled per attempt
+TASK_EVENTS_POLL_INTERVAL = float(os.getenv('TASK_EVENTS_POLL_INTERVAL', '0.5'))  # seconds between checks
+TASK_EVENTS_MAX_DURATION = float(os.getenv('TASK_EVENTS_MAX_DURATION', '120'))  # seconds before clients reconnect
+
+# Gemini call scheduling (per process): interactive requests, standard tasks, bulk jobs
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+LLM_RESERVED_INTERACTIVE = int(os.getenv('LLM_RESERVED_INTERACTIVE', '1'))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '0'))  # 0 = unlimited
+LLM_PRIORITY_WEIGHTS = {'interactive': 8, 'standard': 3, 'bulk': 1}
+LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '60'))  # seconds
+LLM_FANOUT_WORKERS = int(os.getenv('LLM_FANOUT_WORKERS', '8'))  # threads for parallel calls within a request
+LEARNING_RESOURCES_CHUNK_SIZE = int(os.getenv('LEARNING_RESOURCES_CHUNK_SIZE', '3'))  # skills per Gemini call
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -174,7 +228,18 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '20')),
 }
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))  # cap for ?page_size=
+BULK_CREATE_MAX_ITEMS = int(os.getenv('BULK_CREATE_MAX_ITEMS', '500'))  # cap for .../bulk/ requests
+
+# Document storage: resume, job description and offer letter text lives in the Document table
+DOCUMENT_COMPRESS_MIN_BYTES = int(os.getenv('DOCUMENT_COMPRESS_MIN_BYTES', '1024'))  # smaller bodies stay uncompressed
+
+# Retention (compact_data): older reports and letters are moved to gzipped JSONL archives
+DATA_RETENTION_DAYS = int(os.getenv('DATA_RETENTION_DAYS', '365'))
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', BASE_DIR / 'archive'))
 
 # Logging configuration
 LOGGING = {
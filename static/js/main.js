@@ -440,6 +440,69 @@ function throttle(func, limit) {
     }
 }
 
+// Background task progress
+// Follows a queued task through its server-sent event stream, falling back to
+// polling the status URL where EventSource is unavailable or the stream fails.
+// handlers: onProgress(task), onDone(task), onError(message)
+function watchTask(links, handlers, pollInterval = 1000) {
+    const onProgress = handlers.onProgress || function() {};
+    let finished = false;
+    let source = null;
+    let timer = null;
+
+    function handle(task) {
+        if (finished) return;
+        if (task.status === 'succeeded' || task.status === 'failed') {
+            finished = true;
+            if (source) source.close();
+            clearTimeout(timer);
+            onProgress(task);
+            if (task.status === 'succeeded') {
+                handlers.onDone && handlers.onDone(task);
+            } else {
+                handlers.onError && handlers.onError(task.error || 'The task failed.');
+            }
+        } else {
+            onProgress(task);
+        }
+    }
+
+    function poll() {
+        fetch(links.status_url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(task => {
+                handle(task);
+                if (!finished) timer = setTimeout(poll, pollInterval);
+            })
+            .catch(() => {
+                if (!finished) timer = setTimeout(poll, pollInterval * 2);
+            });
+    }
+
+    if (!window.EventSource || !links.events_url) {
+        poll();
+        return { close: () => { finished = true; clearTimeout(timer); } };
+    }
+
+    source = new EventSource(links.events_url);
+    source.addEventListener('progress', e => handle(JSON.parse(e.data)));
+    source.addEventListener('done', e => handle(JSON.parse(e.data)));
+    source.addEventListener('error', e => {
+        if (finished) return;
+        if (e.data) {
+            // Error event sent by the server, e.g. the task does not exist
+            finished = true;
+            source.close();
+            handlers.onError && handlers.onError(JSON.parse(e.data).detail || 'Could not follow the task.');
+        } else if (source.readyState === EventSource.CLOSED) {
+            // The stream could not be opened at all
+            poll();
+        }
+        // Otherwise the browser reconnects by itself
+    });
+    return { close: () => { finished = true; source.close(); clearTimeout(timer); } };
+}
+
 // Export functions for global use
 window.PlacementPartner = {
     showAlert,
@@ -449,5 +512,6 @@ window.PlacementPartner = {
     displayOfferAnalysis,
     submitForm,
     debounce,
-    throttle
+    throttle,
+    watchTask
 }; 
\ No newline at end of file